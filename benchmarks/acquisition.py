@@ -0,0 +1,179 @@
+"""Benchmark end-to-end contents acquisition, offline.
+
+A local HTTP server stands in for the origin sites (optionally with range support and per-connection throttling),
+and a local directory stands in for the mirror. Synthetic archives are made in the layouts of the presets.
+
+Scenarios:
+    forward     - origin (HTTP) -> mirror, then extraction (+ nested extraction for VCTK)
+    local       - extraction from the local mirror
+    http        - streaming extraction from the mirror served over HTTP (range support needed)
+
+Usage:
+    python -m benchmarks.acquisition --corpora JSUT LJ LiTTSR100 VCTK --items 500 --size 50000 --throttle 20
+"""
+
+import argparse
+import functools
+import http.server
+import io
+import os
+import re
+import tarfile
+import threading
+import time
+import zipfile
+from collections import defaultdict
+from pathlib import Path
+from shutil import rmtree
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+import speechcorpusy
+from speechcorpusy.interface import AbstractCorpus, ConfCorpus
+from speechcorpusy.helper.contents import to_members
+from speechcorpusy.helper.adress import ENV_CONTENTS_ROOT
+
+
+class OriginHandler(http.server.SimpleHTTPRequestHandler):
+    """File server with optional single-range request support and per-connection throttling."""
+
+    accept_ranges = True
+    throttle: float = 0.0 # [MB/s], 0 means unlimited
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def send_head(self):
+        path = self.translate_path(self.path)
+        if not os.path.isfile(path):
+            return super().send_head()
+        size = os.path.getsize(path)
+        file = open(path, "rb") # pylint: disable=consider-using-with
+        range_header = self.headers.get("Range") if self.accept_ranges else None
+        if range_header:
+            start, end = re.match(r"bytes=(\d+)-(\d*)", range_header).groups()
+            start, end = int(start), min(int(end), size - 1) if end else size - 1
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+            file.seek(start)
+            self.length = end - start + 1
+        else:
+            self.send_response(200)
+            self.length = size
+        self.send_header("Content-Length", str(self.length))
+        if self.accept_ranges:
+            self.send_header("Accept-Ranges", "bytes")
+            self.send_header("ETag", f'"{os.stat(path).st_mtime_ns}"')
+        self.end_headers()
+        return file
+
+    def copyfile(self, source, outputfile) -> None:
+        try:
+            self._copy_throttled(source, outputfile)
+        except (BrokenPipeError, ConnectionResetError):
+            # Client closes the connection after reading needed bytes (e.g. zip central directory)
+            pass
+
+    def _copy_throttled(self, source, outputfile) -> None:
+        remaining = self.length
+        chunk_size = 64 * 1024
+        start = time.monotonic()
+        sent = 0
+        while remaining > 0:
+            chunk = source.read(min(chunk_size, remaining))
+            if not chunk:
+                break
+            outputfile.write(chunk)
+            remaining -= len(chunk)
+            sent += len(chunk)
+            if self.throttle > 0:
+                wait = sent / (self.throttle * 1000 * 1000) - (time.monotonic() - start)
+                if wait > 0:
+                    time.sleep(wait)
+
+
+def make_archive(corpus: AbstractCorpus, path: Path, num_items: int, item_size: int) -> None:
+    """Make the synthetic archive of random items in the layout of the preset."""
+    # pylint: disable=protected-access
+    names = to_members(corpus.get_identities()[:num_items], corpus.get_item_path, corpus._path_contents)
+    inner_name = getattr(corpus, "_inner_archive_name", None)
+    if inner_name is not None:
+        # Nested (VCTK) - items are in the inner zip
+        buffer = io.BytesIO()
+        _write(buffer, "zip", names, item_size)
+        with zipfile.ZipFile(path, "w", zipfile.ZIP_STORED) as zfile:
+            zfile.writestr(inner_name, buffer.getvalue())
+        return
+    archive_format = "zip" if path.name.endswith(".zip") else ("bz2" if path.name.endswith(".bz2") else "gz")
+    with open(path, "wb") as file:
+        _write(file, archive_format, names, item_size)
+
+
+def _write(file, archive_format: str, names: list, item_size: int) -> None:
+    if archive_format == "zip":
+        with zipfile.ZipFile(file, "w", zipfile.ZIP_DEFLATED) as zfile:
+            for name in names:
+                zfile.writestr(name, os.urandom(item_size))
+    else:
+        with tarfile.open(fileobj=file, mode=f"w:{archive_format}") as tar:
+            for name in names:
+                info = tarfile.TarInfo(name)
+                info.size = item_size
+                tar.addfile(info, io.BytesIO(os.urandom(item_size)))
+
+
+def run(name: str, root: str, download: bool, origin: str) -> tuple:
+    """Acquire the contents, returning elapsed time and per-stage durations."""
+    corpus = speechcorpusy.load_preset(conf=ConfCorpus(name, root, download))
+    corpus._adress_origin = f"{origin}/{corpus._archive_name}" # pylint: disable=protected-access
+    stages: dict = defaultdict(float)
+    callback = lambda event: stages.__setitem__(event.stage, stages[event.stage] + event.duration)
+    speechcorpusy.add_metrics_callback(callback)
+    start = perf_counter()
+    corpus.get_contents()
+    elapsed = perf_counter() - start
+    speechcorpusy.remove_metrics_callback(callback)
+    return elapsed, dict(stages)
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--corpora", nargs="+", default=["JSUT", "LJ", "LiTTSR100", "VCTK"])
+    parser.add_argument("--items", type=int, default=500)
+    parser.add_argument("--size", type=int, default=50_000, help="Item size [byte]")
+    parser.add_argument("--throttle", type=float, default=0.0, help="Per-connection origin bandwidth [MB/s] (0: unlimited)")
+    parser.add_argument("--no-range", action="store_true", help="Disable range request support of the origin")
+    args = parser.parse_args()
+
+    with TemporaryDirectory() as tmpdir:
+        os.environ[ENV_CONTENTS_ROOT] = f"{tmpdir}/contents"
+        dir_origin, dir_mirror = Path(tmpdir) / "origin", f"{tmpdir}/mirror"
+        dir_origin.mkdir()
+
+        handler = type("Handler", (OriginHandler,), {"accept_ranges": not args.no_range, "throttle": args.throttle})
+        server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(handler, directory=tmpdir))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_port}"
+
+        for name in args.corpora:
+            corpus = speechcorpusy.load_preset(conf=ConfCorpus(name, dir_mirror, True))
+            path_archive = dir_origin / corpus._archive_name # pylint: disable=protected-access
+            make_archive(corpus, path_archive, args.items, args.size)
+            size_mb = path_archive.stat().st_size / 1000 / 1000
+            print(f"{name}: {args.items} items, archive {size_mb:.1f} MB")
+
+            scenarios = [("forward", dir_mirror, True), ("local", dir_mirror, False)]
+            if not args.no_range:
+                scenarios.append(("http", f"{url}/mirror", False))
+            for scenario, root, download in scenarios:
+                rmtree(f"{tmpdir}/contents", ignore_errors=True)
+                elapsed, stages = run(name, root, download, f"{url}/origin")
+                breakdown = ", ".join(f"{stage} {duration:.2f}" for stage, duration in stages.items())
+                print(f"    {scenario:>8}: {elapsed:7.2f} sec, {size_mb / elapsed:8.1f} MB/s  ({breakdown})")
+
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Benchmark zip extraction, serial vs parallel.
+
+Usage:
+    python -m benchmarks.extract_zip --items 10000 --size 100000 --workers 1 2 4 8
+"""
+
+import argparse
+import os
+import zipfile
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+from speechcorpusy.components.taudio import extract_archive
+
+
+def make_zip(path: Path, num_items: int, item_size: int) -> None:
+    """Make a JVS-like zip archive of random 'wav' items."""
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zfile:
+        for idx in range(num_items):
+            spk, uttr = divmod(idx, 100)
+            name = f"jvs_ver1/jvs{str(spk).zfill(3)}/parallel100/wav24kHz16bit/VOICEACTRESS100_{str(uttr).zfill(3)}.wav"
+            zfile.writestr(name, os.urandom(item_size))
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=2000)
+    parser.add_argument("--size", type=int, default=100_000, help="Item size [byte]")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    with TemporaryDirectory() as tmpdir:
+        path_archive = Path(tmpdir) / "archive.zip"
+        make_zip(path_archive, args.items, args.size)
+        total_mb = args.items * args.size / 1000 / 1000
+        print(f"archive: {args.items} items, {total_mb:.1f} MB")
+
+        for num_workers in args.workers:
+            start = perf_counter()
+            extract_archive(str(path_archive), f"{tmpdir}/extracted_{num_workers}", num_workers=num_workers)
+            elapsed = perf_counter() - start
+            mode = "serial" if num_workers == 1 else "parallel"
+            print(f"{mode:>8} (workers={num_workers:>2}): {elapsed:7.2f} sec, {total_mb / elapsed:8.1f} MB/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Microbenchmark `ItemId` dict/set lookup time and per-instance memory, against the plain frozen dataclass.
+
+Usage:
+    python -m benchmarks.item_id --corpus "LiTTSR100&VCTK&JVS&LJ" --repeat 5
+"""
+
+import argparse
+import gc
+import tracemalloc
+from dataclasses import dataclass
+from time import perf_counter
+
+import speechcorpusy
+from speechcorpusy.interface import ItemId
+
+
+@dataclass(frozen=True)
+class PlainItemId:
+    """Previous `ItemId`, a plain frozen dataclass."""
+    corpus:  str
+    subtype: str
+    speaker: str
+    name:    str
+
+
+def measure_memory(cls, fields: list) -> float:
+    """Memory [byte] per instance, including the field strings which are made per item (as handlers do)."""
+    gc.collect()
+    tracemalloc.start()
+    # Field strings are made per item, so they are not shared unless the class shares them.
+    items = [cls(*("".join(field) for field in item)) for item in fields]
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del items
+    return size / len(fields)
+
+
+def measure_lookup(items: list, repeat: int) -> float:
+    """Time [sec] per lookup in the dict keyed by the items, with equal-but-not-identical keys."""
+    table = {item: idx for idx, item in enumerate(items)}
+    keys = [item.__class__(item.corpus, item.subtype, item.speaker, item.name) for item in items]
+    start = perf_counter()
+    for _ in range(repeat):
+        for key in keys:
+            table[key] # pylint: disable=pointless-statement
+    return (perf_counter() - start) / repeat / len(keys)
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--corpus", default="LiTTSR100&VCTK&JVS&LJ")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    fields = [(list(item.corpus), list(item.subtype), list(item.speaker), list(item.name)) for item in speechcorpusy.load_preset(args.corpus).get_identities()]
+    print(f"{args.corpus}: {len(fields)} items")
+    for cls in (PlainItemId, ItemId):
+        memory = measure_memory(cls, fields)
+        items = [cls(*("".join(field) for field in item)) for item in fields]
+        lookup = measure_lookup(items, args.repeat)
+        print(f"    {cls.__name__:>11}: {memory:6.1f} byte/item, {lookup * 1e9:6.1f} ns/lookup")
+
+
+if __name__ == "__main__":
+    main()
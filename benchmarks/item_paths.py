@@ -0,0 +1,52 @@
+"""Microbenchmark batched `get_item_paths` against per-item `get_item_path`.
+
+Usage:
+    python -m benchmarks.item_paths --corpus "LiTTSR100&VCTK&JVS&LJ" --repeat 5
+"""
+
+import argparse
+from time import perf_counter
+from typing import Callable
+
+import speechcorpusy
+
+
+def measure(run: Callable[[], list], repeat: int) -> float:
+    """Best time [sec] of the runs."""
+    elapsed = []
+    for _ in range(repeat):
+        start = perf_counter()
+        run()
+        elapsed.append(perf_counter() - start)
+    return min(elapsed)
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--corpus", default="LiTTSR100&VCTK&JVS&LJ")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    corpus = speechcorpusy.load_preset(args.corpus)
+    items = list(corpus.get_identities())
+    print(f"{args.corpus}: {len(items)} items")
+
+    scenarios = {
+        "per-item Path": lambda: [corpus.get_item_path(item) for item in items],
+        "per-item str": lambda: [str(corpus.get_item_path(item)) for item in items],
+        "batched str": lambda: corpus.get_item_paths(items),
+        "batched Path": lambda: corpus.get_item_paths(items, as_str=False),
+    }
+    try:
+        import numpy # pylint: disable=import-outside-toplevel,unused-import
+        scenarios["batched array"] = lambda: corpus.get_item_paths(items, as_array=True)
+    except ImportError:
+        pass
+    for scenario, run in scenarios.items():
+        elapsed = measure(run, args.repeat)
+        print(f"    {scenario:>14}: {elapsed * 1e3:8.1f} msec, {elapsed / len(items) * 1e9:7.1f} ns/item")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Benchmark item identities as `ItemId` list vs columnar `ItemTable`, memory and filter time.
+
+Usage:
+    python -m benchmarks.item_table --corpus "LiTTSR100&VCTK&JVS&LJ" --speakers 20
+"""
+
+import argparse
+import gc
+import tracemalloc
+from time import perf_counter
+
+import speechcorpusy
+from speechcorpusy import ItemTable
+
+
+def measure_memory(build) -> tuple:
+    """Retained memory [byte] of the built object."""
+    gc.collect()
+    tracemalloc.start()
+    built = build()
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return built, size
+
+
+def measure_time(run, repeat: int) -> float:
+    """Mean time [sec] per run."""
+    start = perf_counter()
+    for _ in range(repeat):
+        run()
+    return (perf_counter() - start) / repeat
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--corpus", default="LiTTSR100&VCTK&JVS&LJ")
+    parser.add_argument("--speakers", type=int, default=20, help="The number of speakers selected by the filter")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    ItemTable.from_items([]) # numpy import, outside the measurement
+    # Fresh instances, so identities are built (not memoized) inside the measurement
+    items, size_items = measure_memory(lambda: list(speechcorpusy.load_preset(args.corpus).get_identities()))
+    table, size_table = measure_memory(lambda: ItemTable.from_items(iter(items)))
+    print(f"{args.corpus}: {len(items)} items")
+    print(f"    memory  ItemId: {size_items / 1e6:7.1f} MB, ItemTable: {size_table / 1e6:7.1f} MB ({size_items / size_table:.1f}x)")
+
+    speakers = sorted({item.speaker for item in items})[::max(1, len(set(item.speaker for item in items)) // args.speakers)][:args.speakers]
+    wanted = set(speakers)
+    time_items = measure_time(lambda: [item for item in items if item.speaker in wanted], args.repeat)
+    time_table = measure_time(lambda: table.filter(speaker=speakers), args.repeat)
+    print(f"    filter  ItemId: {time_items * 1e3:7.2f} ms, ItemTable: {time_table * 1e3:7.2f} ms ({time_items / time_table:.1f}x)")
+
+    time_items = measure_time(lambda: {speaker: [item for item in items if item.speaker == speaker] for speaker in speakers}, args.repeat)
+    time_table = measure_time(lambda: table.group_by("speaker"), args.repeat)
+    print(f"    group   ItemId: {time_items * 1e3:7.2f} ms, ItemTable: {time_table * 1e3:7.2f} ms ({time_items / time_table:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,5 @@
 """speechcorpusy"""
 
 from .loader import load_preset # pylint: disable=unused-import
+from .components.metrics import StageEvent, add_metrics_callback, remove_metrics_callback # pylint: disable=unused-import
+from .components.itemtable import ItemTable # pylint: disable=unused-import
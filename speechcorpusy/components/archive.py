@@ -1,24 +1,54 @@
 """Archive and contents handlers"""
 
 
+import os
+import zipfile
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from tempfile import NamedTemporaryFile, TemporaryDirectory
+from typing import Collection, Deque, Iterator, List, Mapping, Optional, Tuple
 from hashlib import md5
-from shutil import make_archive
+from shutil import rmtree
 
 import fsspec
+from fsspec.core import url_to_fs
 from fsspec.utils import get_protocol
 
-from speechcorpusy.components.taudio import extract_archive
+from speechcorpusy.components.taudio import extract_archive, extract_archive_stream
+from speechcorpusy.components.metrics import measure
+from speechcorpusy.components.transfer import Pipe, fetch_resumable, write_stream
+from speechcorpusy.components.checksum import Digest, Hasher, HashingReader
 
 
-def try_to_acquire_archive_contents(pull_from: str, extract_to: Path) -> bool:
+# Already-compressed (or incompressible) audio, which is stored without compression
+_AUDIO_SUFFIXES = {".wav", ".flac", ".mp3", ".ogg", ".opus", ".m4a"}
+# Files larger than this are streamed from disk instead of read ahead
+_PREFETCH_SIZE = 16 * 1024 * 1024
+
+
+def try_to_acquire_archive_contents(
+    pull_from: str,
+    extract_to: Path,
+    stream: bool = True,
+    num_workers: int = 1,
+    members: Optional[Collection[str]] = None,
+    digest: Digest = Digest(),
+    tag: str = "",
+) -> bool:
     """Try to acquire the contents of the archive.
 
     Priority:
       1. (already extracted) local contents
       2. adress-specified (local|remote) archive through fsspec
 
+    Args:
+        pull_from: Archive file adress.
+        extract_to: Contents directory, to which archive is extracted.
+        stream: Whether to extract directly from the archive stream (no local archive copy).
+        num_workers: The number of processes for zip extraction from local archive.
+        members: Archive member names to be acquired (default: all members).
+        digest: Expected archive digest. Size is checked before the transfer, hash is verified on the bytes flowing from the adress.
+        tag: Extraction identifier, needed when multiple archives are extracted into the same directory (e.g. shards).
     Returns:
         True if success_acquisition else False
     """
@@ -28,14 +58,16 @@ def try_to_acquire_archive_contents(pull_from: str, extract_to: Path) -> bool:
         msg = f"contents ({str(extract_to)}) should be directory or empty, but it is file."
         raise RuntimeError(msg)
 
-    # contents directory already exists.
-    if extract_to.exists():
+    # contents already exist (placed only after extraction).
+    if is_acquired(extract_to, members, tag):
         return True
     else:
         file_system: fsspec.AbstractFileSystem = fsspec.filesystem(get_protocol(pull_from))
-        # todo: get_protocol with cache
-        archive_exists = file_system.exists(pull_from)
-        archive_is_file = file_system.isfile(pull_from)
+        with measure("probe", pull_from) as probe:
+            # todo: get_protocol with cache
+            archive_exists = file_system.exists(pull_from)
+            archive_is_file = file_system.isfile(pull_from)
+            probe.nbytes = file_system.size(pull_from) if archive_is_file else None
 
         # No corresponding archive. Failed to acquire.
         if not archive_exists:
@@ -45,53 +77,306 @@ def try_to_acquire_archive_contents(pull_from: str, extract_to: Path) -> bool:
             if not archive_is_file:
                 msg = f"Archive ({pull_from}) should be file or empty, but is directory."
                 raise RuntimeError(msg)
+            digest.check_size(probe.nbytes, pull_from)
 
             # A dataset file exists, so pull and extract.
-            pull_from_with_cache = f"simplecache::{pull_from}"
-            extract_to.mkdir(parents=True, exist_ok=True)
-            print("Accessing the archive in the adress...")
-            with fsspec.open(pull_from_with_cache, "rb") as archive:
-                with NamedTemporaryFile("ab") as tmp:
-                    print("Reading the archive in the adress...")
-                    while True:
-                        # Read every 100 MB for large corpus.
-                        d = archive.read(100*1000*1000)
-                        if d:
-                            tmp.write(d)
-                        else:
-                            break
-                    tmp.seek(0)
-                    print("Read.")
-
-                    print("Extracting...")
-                    extract_archive(tmp.name, str(extract_to))
+            targets = _missing_members(extract_to, members)
+            staging, journal = _prepare_staging(extract_to, tag)
+            # Local archive needs neither stream nor copy, so it is directly extracted (in parallel if zip).
+            if get_protocol(pull_from) == "file":
+                _, path_archive = url_to_fs(pull_from)
+                # Parallel extraction reads the archive non-sequentially, so the hash is checked by its own pass, before any extraction.
+                if digest.sha256 is not None:
+                    with measure("verify", pull_from) as verification:
+                        hasher = Hasher(digest, pull_from)
+                        hasher.update_file(Path(path_archive))
+                        hasher.verify()
+                        verification.nbytes = probe.nbytes
+                print("Extracting the local archive...")
+                with measure("extract", pull_from) as extraction:
+                    extraction.nbytes = probe.nbytes
+                    extraction.items = len(extract_archive(path_archive, str(staging), num_workers=num_workers, journal_path=journal, members=targets))
+                print("Extracted.")
+            # Zip is read non-sequentially from the stream, so archive with declared hash is pulled (hashed inline) instead.
+            elif stream and not (digest.sha256 is not None and pull_from.endswith(".zip")):
+                print("Accessing the archive in the adress...")
+                with fsspec.open(pull_from, "rb") as archive:
+                    print("Extracting from the archive stream...")
+                    # Archive is hashed while extracted (re-read on verification if read non-sequentially).
+                    reader = HashingReader(archive, Hasher(digest, pull_from)) if digest else archive
+                    # Read and extraction are overlapped, so the extraction throughput includes the read.
+                    with measure("extract", pull_from) as extraction:
+                        extraction.nbytes = probe.nbytes
+                        extraction.items = len(extract_archive_stream(reader, str(staging), journal_path=journal, members=targets))
+                    if isinstance(reader, HashingReader):
+                        _verify_staging(reader, extract_to, tag)
                     print("Extracted.")
+            else:
+                # Pulled archive persists until extraction, so interrupted pull is resumed in the next run.
+                path_pulled = extract_to.parent / f"{extract_to.name}{tag}.archive"
+                print("Reading the archive in the adress...")
+                with measure("read", pull_from) as read:
+                    read.nbytes = fetch_resumable(pull_from, path_pulled, digest=digest)
+                print("Read.")
+
+                print("Extracting...")
+                with measure("extract", pull_from) as extraction:
+                    extraction.nbytes = probe.nbytes
+                    extraction.items = len(extract_archive(str(path_pulled), str(staging), num_workers=num_workers, journal_path=journal, members=targets))
+                print("Extracted.")
+                path_pulled.unlink()
+            _place_staging(extract_to, members is not None, tag)
+            _check_members(extract_to, members, pull_from)
             return True
 
 
-def save_archive(path_contents: Path, adress_archive: str) -> None:
+def acquire_shards(
+    shards: Mapping[str, Tuple[str, List[str], Digest]],
+    extract_to: Path,
+    full: bool,
+    stream: bool = True,
+    num_parallel: int = 8,
+) -> None:
+    """Acquire the contents from the sharded archives, in parallel.
+
+    Args:
+        shards: Shard name -> (archive adress, member names to be acquired, expected archive digest).
+        extract_to: Contents directory, into which all shards are merged.
+        full: Whether the shards cover the full contents (then the directory is marked as full contents).
+        stream: Whether to extract directly from the archive stream (no local archive copy).
+        num_parallel: The number of concurrent shard acquisitions.
+    """
+
+    # Design Notes:
+    #   Each shard has its own (tagged) staging, so shards are extracted concurrently into the same directory.
+    #   Shard members are always explicit, so acquisition of each shard is judged by its member files.
+    #   Partially merged directory should not be seen as full contents, so it is marked as subset until all shards are placed.
+    _, _, marker = _state_of(extract_to)
+    if not is_acquired(extract_to):
+        extract_to.parent.mkdir(parents=True, exist_ok=True)
+        marker.touch()
+    with ThreadPoolExecutor(max_workers=num_parallel) as executor:
+        futures = {
+            name: executor.submit(try_to_acquire_archive_contents, adress, extract_to, stream, 1, members, digest, f".{name}")
+            for name, (adress, members, digest) in shards.items()
+        }
+        for name, future in futures.items():
+            if not future.result():
+                raise RuntimeError(f"Shard `{name}` ({shards[name][0]}) cannot be acquired.")
+    for name in shards:
+        _state_of(extract_to, f".{name}")[2].unlink(missing_ok=True)
+    if full:
+        marker.unlink(missing_ok=True)
+
+
+def extract_archive_staged(
+    from_path: str,
+    extract_to: Path,
+    num_workers: int = 1,
+    members: Optional[Collection[str]] = None,
+    tag: str = "",
+) -> None:
+    """Extract the local archive into the directory through resumable staging.
+
+    Contents are placed only after extraction. If `extract_to` already exists, contents are merged into it.
+
+    Args:
+        from_path: Local archive path.
+        extract_to: Directory, to which archive is extracted.
+        num_workers: The number of processes for zip extraction.
+        members: Archive member names to be extracted (default: all members).
+        tag: Extraction identifier, needed when multiple archives are extracted into the same directory.
+    """
+    targets = _missing_members(extract_to, members)
+    staging, journal = _prepare_staging(extract_to, tag)
+    # Directory-sharing (tagged) archive is nested in the contents
+    with measure("nested-extract" if tag else "extract", from_path) as extraction:
+        extraction.nbytes = os.path.getsize(from_path)
+        extraction.items = len(extract_archive(from_path, str(staging), num_workers=num_workers, journal_path=journal, members=targets))
+    _place_staging(extract_to, members is not None, tag)
+    _check_members(extract_to, members, from_path)
+
+
+def is_acquired(extract_to: Path, members: Optional[Collection[str]] = None, tag: str = "") -> bool:
+    """Whether the contents (all, or specified members) are already acquired in the directory.
+
+    Args:
+        extract_to: Contents directory.
+        members: Archive member names to be checked (default: all members).
+        tag: Extraction identifier, needed when multiple archives are extracted into the same directory.
+    """
+
+    # Design Notes:
+    #   Each member is placed atomically, so existence of member files means the member is acquired.
+    #   Directory with a subset of members has the 'subset' marker, so existence of unmarked directory means full contents.
+    #   Full contents of a directory-sharing (tagged) archive cannot be judged from the directory, so caller should check its contents.
+    if members is not None:
+        return all((extract_to / member).is_file() for member in members)
+    staging, _, subset = _state_of(extract_to, tag)
+    return extract_to.exists() and not subset.exists() and not staging.exists()
+
+
+def _missing_members(extract_to: Path, members: Optional[Collection[str]]) -> Optional[List[str]]:
+    """Select not-yet-acquired members."""
+    if members is None:
+        return None
+    return [member for member in members if not (extract_to / member).is_file()]
+
+
+def _check_members(extract_to: Path, members: Optional[Collection[str]], adress: str) -> None:
+    """Check that all the requested members are acquired, which fails if some of them are not in the archive."""
+    absent = _missing_members(extract_to, members)
+    if absent:
+        raise RuntimeError(f"{len(absent)} requested members are not in the archive ({adress}), e.g. {absent[:3]}.")
+
+
+def _state_of(extract_to: Path, tag: str = "") -> Tuple[Path, str, Path]:
+    """Get the staging directory, the journal and the subset marker of extraction toward the directory."""
+    base = f"{extract_to.name}{tag}"
+    staging = extract_to.parent / f"{base}.partial"
+    return staging, f"{staging}.journal", extract_to.parent / f"{base}.subset"
+
+
+def _prepare_staging(extract_to: Path, tag: str = "") -> Tuple[Path, str]:
+    """Prepare the staging directory, which may contain the previously interrupted extraction."""
+
+    # Design Notes:
+    #   Half-extracted contents should not be seen as contents, so extraction goes into the staging directory first.
+    #   The journal, which records extracted members, enables resumption after interruption (e.g. killed pod).
+    #   Staging is a sibling of the contents, so final placement is just a rename in the same filesystem (atomic).
+    staging, journal, _ = _state_of(extract_to, tag)
+    if staging.exists():
+        print("Resuming the interrupted extraction...")
+    else:
+        # Journal without staging is stale (crashed after the staging removal)
+        Path(journal).unlink(missing_ok=True)
+    staging.mkdir(parents=True, exist_ok=True)
+    return staging, journal
+
+
+def _verify_staging(reader: HashingReader, extract_to: Path, tag: str = "") -> None:
+    """Verify the archive stream extracted into the staging, discarding the staging on mismatch."""
+    try:
+        reader.verify()
+    except RuntimeError:
+        staging, journal, _ = _state_of(extract_to, tag)
+        rmtree(staging)
+        Path(journal).unlink(missing_ok=True)
+        raise
+
+
+def _place_staging(extract_to: Path, subset: bool, tag: str = "") -> None:
+    """Place the extracted staging contents at the directory."""
+
+    staging, journal, marker = _state_of(extract_to, tag)
+
+    # Subset is marked before its placement, so it is never seen as full contents.
+    if subset:
+        marker.touch()
+
+    if not subset and not extract_to.exists():
+        # Full contents - Staging itself become the contents.
+        # The journal is removed first, so stale journal never skip members of future extraction.
+        Path(journal).unlink(missing_ok=True)
+        staging.rename(extract_to)
+    else:
+        # Merge - Only journaled (completely extracted) members are moved, so interrupted leftovers are never placed.
+        extract_to.mkdir(parents=True, exist_ok=True)
+        if os.path.exists(journal):
+            with open(journal, "r", encoding="utf-8") as journal_file:
+                names = journal_file.read().splitlines()
+            for name in names:
+                src, dst = staging / name, extract_to / name
+                if src.is_file():
+                    dst.parent.mkdir(parents=True, exist_ok=True)
+                    os.replace(src, dst)
+        rmtree(staging)
+        Path(journal).unlink(missing_ok=True)
+
+    if not subset:
+        marker.unlink(missing_ok=True)
+
+
+def save_archive(path_contents: Path, adress_archive: str, num_workers: int = 8, members: Optional[Collection[str]] = None) -> Digest:
     """Save contents as a ZIP archive.
 
     Save contents of specified local path as ZIP archive in the specified adress through `fsspec`.
+    Archive is streamed into the adress while written (multipart upload for object store), without local archive file.
+    Audio is stored without compression, other files are deflated.
 
     Args:
         path_contents: Contents root directory path.
         adress_archive: Saved adress.
+        num_workers: The number of concurrent member reads and part uploads.
+        members: Member names (file paths relative to the contents root) to be saved (default: all files and directories).
+    Returns:
+        Digest of the saved archive, computed during the write (e.g. for preset declaration).
+    """
+
+    # Design Notes:
+    #   Audio (wav/flac) barely shrinks with deflate, so compression is just CPU cost. Stored members are also directly readable by `ZipIndex`.
+    #   `zipfile` pushes bytes while upload pulls them, so they are connected by a bounded pipe in another thread.
+    #   The pipe is not seekable, so `zipfile` writes members in streaming form (data descriptor).
+    entries = _list_members(path_contents, members)
+    hasher = Hasher(Digest(), adress_archive)
+    pipe = Pipe()
+    print("Archiving & Writing archive...")
+    with ThreadPoolExecutor(max_workers=num_workers + 1) as executor:
+        upload = executor.submit(write_stream, HashingReader(pipe, hasher), adress_archive, num_workers) # type: ignore
+        upload.add_done_callback(lambda future: pipe.abort() if future.exception() is not None else None)
+        try:
+            with zipfile.ZipFile(pipe, "w") as zfile: # type: ignore
+                for name, path, data in _prefetch(executor, entries, num_workers * 4):
+                    compress_type = zipfile.ZIP_STORED if path.suffix.lower() in _AUDIO_SUFFIXES else zipfile.ZIP_DEFLATED
+                    if data is None:
+                        zfile.write(path, name, compress_type)
+                    else:
+                        info = zipfile.ZipInfo.from_file(path, name)
+                        info.compress_type = compress_type
+                        zfile.writestr(info, data)
+        except BaseException:
+            pipe.close(failed=True)
+            raise
+        pipe.close()
+        upload.result()
+    print("Wrote.")
+    digest = hasher.digest()
+    print(f"Archive digest: sha256={digest.sha256}, size={digest.size}")
+    return digest
+
+
+def _list_members(path_contents: Path, selected: Optional[Collection[str]] = None) -> List[Tuple[str, Path]]:
+    """List (member name, path) of directories and files under the contents directory (or the selected ones), in deterministic order."""
+    if selected is not None:
+        return [(member, path_contents / member) for member in selected]
+    members = []
+    for dirpath, dirnames, filenames in os.walk(path_contents):
+        dirnames.sort()
+        for name in [*dirnames, *sorted(filenames)]:
+            path = Path(dirpath) / name
+            members.append((path.relative_to(path_contents).as_posix(), path))
+    return members
+
+
+def _prefetch(executor: ThreadPoolExecutor, members: List[Tuple[str, Path]], window: int) -> Iterator[Tuple[str, Path, Optional[bytes]]]:
+    """Read members ahead in parallel, yielding (name, path, data) in order.
+
+    Directory and large file are not read ahead (data is None), so memory usage is bounded by the window.
     """
+    def read(path: Path) -> Optional[bytes]:
+        if path.is_dir() or path.stat().st_size > _PREFETCH_SIZE:
+            return None
+        return path.read_bytes()
 
-    # TempDir for garbage-less upload
-    with TemporaryDirectory() as tmpdir:
-        # zip with deflate compression
-        print("Archiving...")
-        make_archive(f"{tmpdir}/tmp", "zip", root_dir=path_contents)
-        print("Archived.")
-
-        # write (==upload) the archive
-        with fsspec.open(f"simplecache::{adress_archive}", "wb") as destination:
-            with open(f"{tmpdir}/tmp.zip", "rb") as archive:
-                print("Writing archive...")
-                destination.write(archive.read())
-                print("Wrote.")
+    futures: Deque[Tuple[str, Path, Future]] = deque()
+    for name, path in members:
+        futures.append((name, path, executor.submit(read, path)))
+        if len(futures) >= window:
+            name_done, path_done, future = futures.popleft()
+            yield name_done, path_done, future.result()
+    while futures:
+        name_done, path_done, future = futures.popleft()
+        yield name_done, path_done, future.result()
 
 
 def hash_args(*args) -> str:
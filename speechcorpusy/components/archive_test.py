@@ -0,0 +1,276 @@
+"""Test archive handlers."""
+
+import hashlib
+import io
+import os
+import threading
+import time
+import tarfile
+import zipfile
+from pathlib import Path
+from shutil import rmtree
+
+import fsspec
+import pytest
+
+from . import archive
+from .archive import acquire_shards, is_acquired, save_archive, try_to_acquire_archive_contents
+from .checksum import Digest, Hasher, HashingReader
+
+
+MEMBERS = {"corpus/spk1/uttr1.wav": b"uttr1" * 100, "corpus/spk2/uttr2.wav": b"uttr2" * 100}
+
+
+def _zip_bytes() -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as zfile:
+        for name, data in MEMBERS.items():
+            zfile.writestr(name, data)
+    return buffer.getvalue()
+
+
+def _targz_bytes() -> bytes:
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz") as tar:
+        for name, data in MEMBERS.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+    return buffer.getvalue()
+
+
+def _assert_contents(extract_to: Path) -> None:
+    for name, data in MEMBERS.items():
+        assert (extract_to / name).read_bytes() == data
+
+
+def test_acquire_stream_zip(tmp_path: Path):
+    """Test streaming acquisition of a zip archive in remote-like (memory) filesystem."""
+
+    adress = "memory://mirror/test_stream_zip/archive.zip"
+    with fsspec.open(adress, "wb") as archive:
+        archive.write(_zip_bytes())
+
+    assert try_to_acquire_archive_contents(adress, tmp_path / "contents", stream=True)
+    _assert_contents(tmp_path / "contents")
+
+
+def test_acquire_stream_targz(tmp_path: Path):
+    """Test streaming acquisition of a tar.gz archive in local filesystem."""
+
+    adress = tmp_path / "archive.tar.gz"
+    adress.write_bytes(_targz_bytes())
+
+    assert try_to_acquire_archive_contents(str(adress), tmp_path / "contents", stream=True)
+    _assert_contents(tmp_path / "contents")
+
+
+def test_acquire_cached(tmp_path: Path):
+    """Test non-streaming (cached copy) acquisition."""
+
+    adress = tmp_path / "archive.zip"
+    adress.write_bytes(_zip_bytes())
+
+    assert try_to_acquire_archive_contents(str(adress), tmp_path / "contents", stream=False)
+    _assert_contents(tmp_path / "contents")
+
+
+def test_acquire_no_archive(tmp_path: Path):
+    """Test acquisition failure without archive."""
+
+    assert not try_to_acquire_archive_contents(str(tmp_path / "none.zip"), tmp_path / "contents")
+
+
+def test_acquire_resume(tmp_path: Path):
+    """Test resumption of the interrupted extraction."""
+
+    adress = tmp_path / "archive.zip"
+    adress.write_bytes(_zip_bytes())
+    extract_to = tmp_path / "contents"
+
+    # Interrupted state: 1st member is extracted & journaled, 2nd member is half-written.
+    name_1, name_2 = list(MEMBERS.keys())
+    staging = tmp_path / "contents.partial"
+    (staging / name_1).parent.mkdir(parents=True)
+    (staging / name_1).write_bytes(b"journaled")
+    (staging / name_2).parent.mkdir(parents=True)
+    (staging / name_2).write_bytes(b"half")
+    (tmp_path / "contents.partial.journal").write_text(f"{name_1}\n", encoding="utf-8")
+
+    assert try_to_acquire_archive_contents(str(adress), extract_to)
+
+    # Journaled member is not re-extracted, half-written one is re-extracted.
+    assert (extract_to / name_1).read_bytes() == b"journaled"
+    assert (extract_to / name_2).read_bytes() == MEMBERS[name_2]
+    assert not staging.exists()
+    assert not (tmp_path / "contents.partial.journal").exists()
+
+
+def test_acquire_selective(tmp_path: Path):
+    """Test selective acquisition of the specified members, then full acquisition."""
+
+    adress = tmp_path / "archive.tar.gz"
+    adress.write_bytes(_targz_bytes())
+    extract_to = tmp_path / "contents"
+    name_1, name_2 = list(MEMBERS.keys())
+
+    # Subset
+    assert try_to_acquire_archive_contents(str(adress), extract_to, members=[name_1])
+    assert (extract_to / name_1).read_bytes() == MEMBERS[name_1]
+    assert not (extract_to / name_2).exists()
+
+    # Full, following the subset
+    assert try_to_acquire_archive_contents(str(adress), extract_to)
+    _assert_contents(extract_to)
+    assert not (tmp_path / "contents.subset").exists()
+
+
+def test_acquire_absent_member(tmp_path: Path):
+    """Test selective acquisition of a member which is not in the archive."""
+
+    adress = tmp_path / "archive.zip"
+    adress.write_bytes(_zip_bytes())
+    name_1 = list(MEMBERS.keys())[0]
+
+    with pytest.raises(RuntimeError, match="not in the archive"):
+        try_to_acquire_archive_contents(str(adress), tmp_path / "contents", members=[name_1, "corpus/spk9/none.wav"])
+    # Existing members are still placed
+    assert (tmp_path / "contents" / name_1).read_bytes() == MEMBERS[name_1]
+
+
+def test_acquire_digest(tmp_path: Path):
+    """Test archive digest verification during streaming acquisition."""
+
+    data = _targz_bytes()
+    adress = "memory://mirror/test_digest/archive.tar.gz"
+    with fsspec.open(adress, "wb") as archive:
+        archive.write(data)
+
+    # Mismatch - Nothing is placed
+    with pytest.raises(RuntimeError):
+        try_to_acquire_archive_contents(adress, tmp_path / "contents", digest=Digest(sha256="0" * 64))
+    assert not (tmp_path / "contents").exists()
+    assert not (tmp_path / "contents.partial").exists()
+    with pytest.raises(RuntimeError):
+        try_to_acquire_archive_contents(adress, tmp_path / "contents", digest=Digest(size=len(data) + 1))
+
+    # Match
+    digest = Digest(sha256=hashlib.sha256(data).hexdigest(), size=len(data))
+    assert try_to_acquire_archive_contents(adress, tmp_path / "contents", digest=digest)
+    _assert_contents(tmp_path / "contents")
+
+
+def test_acquire_digest_zip(tmp_path: Path):
+    """Test archive digest verification of zip, which is read non-sequentially."""
+
+    data = _zip_bytes()
+    digest = Digest(sha256=hashlib.sha256(data).hexdigest(), size=len(data))
+    local = tmp_path / "archive.zip"
+    local.write_bytes(data)
+    remote = "memory://mirror/test_digest_zip/archive.zip"
+    with fsspec.open(remote, "wb") as archive:
+        archive.write(data)
+
+    for adress in (str(local), remote):
+        # Mismatch - Nothing is placed
+        with pytest.raises(RuntimeError):
+            try_to_acquire_archive_contents(adress, tmp_path / "contents", digest=Digest(sha256="0" * 64))
+        assert not (tmp_path / "contents").exists()
+        # Match
+        assert try_to_acquire_archive_contents(adress, tmp_path / "contents", digest=digest)
+        _assert_contents(tmp_path / "contents")
+        rmtree(tmp_path / "contents")
+
+    # Non-sequential read is re-read for verification, not skipped
+    reader = HashingReader(io.BytesIO(data), Hasher(Digest(sha256="0" * 64), "archive.zip"))
+    with zipfile.ZipFile(reader) as zfile: # type: ignore
+        zfile.read(list(MEMBERS)[0])
+    assert not reader.sequential
+    with pytest.raises(RuntimeError):
+        reader.verify()
+    reader = HashingReader(io.BytesIO(data), Hasher(digest, "archive.zip"))
+    with zipfile.ZipFile(reader) as zfile: # type: ignore
+        zfile.read(list(MEMBERS)[0])
+    reader.verify()
+
+
+def test_save_archive(tmp_path: Path):
+    """Test streaming archive save, with stored audio and deflated text."""
+
+    contents = tmp_path / "contents"
+    (contents / "wavs").mkdir(parents=True)
+    (contents / "wavs" / "a.wav").write_bytes(b"RIFF" * 1000)
+    (contents / "readme.txt").write_bytes(b"text" * 1000)
+
+    adress = "memory://mirror/test_save/archive.zip"
+    digest = save_archive(contents, adress, num_workers=2)
+
+    with fsspec.open(adress, "rb") as archive:
+        data = archive.read()
+    assert digest == Digest(hashlib.sha256(data).hexdigest(), len(data))
+    with zipfile.ZipFile(io.BytesIO(data)) as zfile:
+        assert zfile.getinfo("wavs/a.wav").compress_type == zipfile.ZIP_STORED
+        assert zfile.getinfo("readme.txt").compress_type == zipfile.ZIP_DEFLATED
+        assert zfile.read("wavs/a.wav") == b"RIFF" * 1000
+        assert zfile.read("readme.txt") == b"text" * 1000
+        assert "wavs/" in zfile.namelist()
+
+    # Round trip
+    assert try_to_acquire_archive_contents(adress, tmp_path / "extracted")
+    assert (tmp_path / "extracted" / "wavs" / "a.wav").read_bytes() == b"RIFF" * 1000
+
+
+def test_save_archive_upload_failure(tmp_path: Path, monkeypatch):
+    """Test that upload failure in the middle of the stream fails the save, without hang."""
+
+    contents = tmp_path / "contents"
+    contents.mkdir()
+    for idx in range(8):
+        (contents / f"{idx}.wav").write_bytes(os.urandom(1024 * 1024))
+
+    def failing_upload(source, _adress, _num_workers):
+        source.read(1024)
+        # Writer fills the pipe meanwhile
+        time.sleep(0.5)
+        raise OSError("Upload is failed.")
+    monkeypatch.setattr(archive, "write_stream", failing_upload)
+
+    errors = []
+    def save():
+        try:
+            save_archive(contents, "memory://mirror/test_save_failure/archive.zip", num_workers=2)
+        except Exception as err: # pylint: disable=broad-except
+            errors.append(err)
+    thread = threading.Thread(target=save, daemon=True)
+    thread.start()
+    thread.join(timeout=10)
+    assert not thread.is_alive()
+    assert len(errors) == 1
+
+
+def test_acquire_shards(tmp_path: Path):
+    """Test parallel acquisition of the needed shards into the same contents."""
+
+    shards = {}
+    for speaker in ["spk1", "spk2", "spk3"]:
+        adress = f"memory://mirror/test_shards/{speaker}.zip"
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w") as zfile:
+            for i in range(3):
+                zfile.writestr(f"wavs/{speaker}/{i}.wav", f"{speaker}{i}".encode())
+        with fsspec.open(adress, "wb") as archive:
+            archive.write(buffer.getvalue())
+        shards[speaker] = (adress, [f"wavs/{speaker}/{i}.wav" for i in range(3)], Digest())
+    extract_to = tmp_path / "contents"
+
+    # Subset - Only the needed shards, never seen as full contents
+    acquire_shards({"spk2": shards["spk2"]}, extract_to, full=False)
+    assert (extract_to / "wavs" / "spk2" / "1.wav").read_bytes() == b"spk21"
+    assert not (extract_to / "wavs" / "spk1").exists()
+    assert not is_acquired(extract_to)
+
+    # Full - Remaining shards are merged
+    acquire_shards(shards, extract_to, full=True)
+    assert (extract_to / "wavs" / "spk3" / "2.wav").read_bytes() == b"spk32"
+    assert is_acquired(extract_to)
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["contents"]
@@ -0,0 +1,134 @@
+"""Shared contents cache with LRU eviction"""
+
+
+from __future__ import annotations
+import json
+import os
+import re
+import time
+from pathlib import Path
+from shutil import rmtree
+from typing import Optional
+
+from speechcorpusy.components.lock import FileLock
+
+
+_UNITS = {"": 0, "K": 1, "M": 2, "G": 3, "T": 4}
+# e.g. '500G', '500GB', '1.5TiB', '10g', '1000000'
+_SIZE_PATTERN = re.compile(r"(\d+(?:\.\d*)?|\.\d+)\s*(?:([KMGT])(I)?)?B?", re.IGNORECASE)
+# Contents directory name in an entry, which is the only evicted part (archives are kept)
+_CONTENTS = "contents"
+
+
+class ContentsCache:
+    """Size-bounded cache of corpus contents, shared by all processes/projects using the same contents root.
+
+    Each cache entry is a `corpuses/{corpus_name}/{variant_type}` directory under the root.
+    Registry (`cache.json` under the root) tracks contents size and last access of entries,
+    and least-recently-used contents are evicted when total size exceeds the budget.
+    Only `contents/` is evicted, so archives in the entry (e.g. local mirror, pulled archive) are kept.
+    """
+
+    def __init__(self, root: Path, budget: Optional[int] = None) -> None:
+        """
+        Args:
+            root: Contents root directory.
+            budget: Maximum total size [byte] of cached contents (None: unlimited).
+        """
+        self._root = root
+        self._budget = budget
+        self._path_registry = root / "cache.json"
+
+    def access(self, entry_dir: Path, updated: bool) -> None:
+        """Record the access to the entry, then evict LRU entries if over the budget.
+
+        Args:
+            entry_dir: Entry directory (`corpuses/{corpus_name}/{variant_type}`).
+            updated: Whether the entry contents are updated (size is re-measured).
+        """
+        key = entry_dir.resolve().relative_to(self._root.resolve()).as_posix()
+        with FileLock(self._root / "cache.lock"):
+            registry = self._load()
+            if updated or key not in registry:
+                size = _size_of(entry_dir / _CONTENTS)
+            else:
+                size = registry[key]["size"]
+            registry[key] = {"size": size, "last_access": time.time()}
+            self._evict(registry, key)
+            self._save(registry)
+
+    def _evict(self, registry: dict[str, dict], keep: str) -> None:
+        """Evict least-recently-used entries until total size fits the budget."""
+        if self._budget is None:
+            return
+        total = sum(map(lambda entry: entry["size"], registry.values()))
+        for key in sorted(registry.keys(), key=lambda key: registry[key]["last_access"]):
+            if total <= self._budget:
+                break
+            if key == keep:
+                continue
+            if _remove_entry(self._root / key):
+                print(f"Evicted {key} from the contents cache.")
+                total -= registry.pop(key)["size"]
+
+    def _load(self) -> dict[str, dict]:
+        if not self._path_registry.exists():
+            return {}
+        with open(self._path_registry, "r", encoding="utf-8") as file:
+            return json.load(file)
+
+    def _save(self, registry: dict[str, dict]) -> None:
+        tmp = self._path_registry.with_name(f"{self._path_registry.name}.tmp")
+        with open(tmp, "w", encoding="utf-8") as file:
+            json.dump(registry, file, indent=1)
+        os.replace(tmp, self._path_registry)
+
+
+def parse_size(size: str) -> int:
+    """Parse size string into bytes.
+
+    Units are case-insensitive K/M/G/T (decimal) or Ki/Mi/Gi/Ti (binary), with optional `B` (e.g. '500G', '500GB', '1.5TiB', '10g', '1000000').
+    """
+    matched = _SIZE_PATTERN.fullmatch(size.strip())
+    if matched is None:
+        raise ValueError(f"Invalid size '{size}', which should be a number with optional unit (e.g. '500G', '1.5TiB', '1000000').")
+    number, unit, binary = matched.groups()
+    base = 1024 if binary else 1000
+    return int(float(number) * base ** _UNITS[(unit or "").upper()])
+
+
+def _size_of(directory: Path) -> int:
+    """Total file size under the directory."""
+    total = 0
+    for dirpath, _, filenames in os.walk(directory):
+        for filename in filenames:
+            total += os.lstat(os.path.join(dirpath, filename)).st_size
+    return total
+
+
+def _remove_entry(entry_dir: Path) -> bool:
+    """Remove the entry contents (`contents/` and its extraction state) if no process holds the contents lock.
+
+    Returns:
+        Whether the contents are removed.
+    """
+    if not entry_dir.exists():
+        return True
+    # Busy entry (someone holding the contents lock) is skipped. Lock file itself is kept for lock waiters.
+    lock = FileLock(entry_dir / f"{_CONTENTS}.lock", timeout=0)
+    try:
+        lock.acquire()
+    except TimeoutError:
+        return False
+    try:
+        # Extraction state (staging, journal, subset marker) is removed with the contents, so it never outlives them.
+        for child in [entry_dir / _CONTENTS, *entry_dir.glob(f"{_CONTENTS}.*")]:
+            if child.suffix == ".lock" or not child.exists():
+                continue
+            if child.is_dir():
+                rmtree(child)
+            else:
+                child.unlink()
+    finally:
+        lock.release()
+    return True
@@ -0,0 +1,82 @@
+"""Test the shared contents cache."""
+
+from pathlib import Path
+
+import pytest
+
+from .cache import ContentsCache, parse_size
+from .lock import FileLock
+from ..helper.adress import ENV_CONTENTS_BUDGET, ENV_CONTENTS_ROOT
+from ..helper.contents import track_contents
+
+
+def _put_entry(root: Path, name: str, size: int) -> Path:
+    entry_dir = root / "corpuses" / name / "default"
+    (entry_dir / "contents").mkdir(parents=True)
+    (entry_dir / "contents" / "data.wav").write_bytes(b"0" * size)
+    return entry_dir
+
+
+def test_lru_eviction(tmp_path: Path):
+    """Test that least-recently-used entry is evicted over the budget."""
+
+    cache = ContentsCache(tmp_path, budget=250)
+    entry_a = _put_entry(tmp_path, "A", 100)
+    cache.access(entry_a, updated=True)
+    entry_b = _put_entry(tmp_path, "B", 100)
+    cache.access(entry_b, updated=True)
+    # Re-access A, so B becomes the LRU entry
+    cache.access(entry_a, updated=False)
+
+    entry_c = _put_entry(tmp_path, "C", 100)
+    cache.access(entry_c, updated=True)
+
+    assert (entry_a / "contents").exists()
+    assert not (entry_b / "contents").exists()
+    assert (entry_c / "contents").exists()
+
+
+def test_eviction_scope(tmp_path: Path):
+    """Test that eviction removes only contents, and skips the entry whose contents lock is held."""
+
+    cache = ContentsCache(tmp_path, budget=150)
+    entry_a = _put_entry(tmp_path, "A", 100)
+    (entry_a / "archive").mkdir()
+    (entry_a / "archive" / "archive.zip").write_bytes(b"0" * 1000)
+    cache.access(entry_a, updated=True)
+    entry_b = _put_entry(tmp_path, "B", 100)
+
+    # A is in use, so it is kept even over the budget
+    with FileLock(entry_a / "contents.lock"):
+        cache.access(entry_b, updated=True)
+    assert (entry_a / "contents").exists()
+
+    # A is released, so its contents (only) are evicted
+    entry_c = _put_entry(tmp_path, "C", 10)
+    cache.access(entry_c, updated=True)
+    assert not (entry_a / "contents").exists()
+    assert (entry_a / "archive" / "archive.zip").exists()
+
+
+def test_parse_size():
+    """Test size string parsing."""
+
+    assert parse_size("1000") == 1000
+    assert parse_size("1.5K") == 1500
+    assert parse_size("500GB") == 500 * 1000**3
+    assert parse_size("10g") == 10 * 1000**3
+    assert parse_size("10GiB") == 10 * 1024**3
+    assert parse_size("1.5 ti") == int(1.5 * 1024**4)
+    for invalid in ["", "G", "10X", "10iB", "ten"]:
+        with pytest.raises(ValueError):
+            parse_size(invalid)
+
+
+def test_invalid_budget(tmp_path: Path, monkeypatch):
+    """Test that invalid budget names the environment variable."""
+
+    monkeypatch.setenv(ENV_CONTENTS_ROOT, str(tmp_path))
+    monkeypatch.setenv(ENV_CONTENTS_BUDGET, "ten gigabytes")
+    entry_a = _put_entry(tmp_path, "A", 100)
+    with pytest.raises(ValueError, match=ENV_CONTENTS_BUDGET):
+        track_contents(entry_a / "contents", updated=True)
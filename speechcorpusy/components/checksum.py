@@ -0,0 +1,138 @@
+"""Streaming archive checksum"""
+
+
+from __future__ import annotations
+import hashlib
+import logging
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Optional
+
+
+_CHUNK_SIZE = 8 * 1024 * 1024
+
+
+@dataclass(frozen=True)
+class Digest:
+    """Archive digest. `None` field is not checked."""
+    sha256: Optional[str] = None
+    size: Optional[int] = None
+
+    def __bool__(self) -> bool:
+        return self.sha256 is not None or self.size is not None
+
+    def check_size(self, size: Optional[int], name: str) -> None:
+        """Check the size known beforehand (e.g. from probe), which fails before any transfer."""
+        if self.size is not None and size is not None and size != self.size:
+            raise RuntimeError(f"Size mismatch of {name}: expected {self.size} bytes, but {size} bytes.")
+
+
+class Hasher:
+    """Incremental hash and size over the flowing bytes, checked against the expected digest."""
+
+    def __init__(self, expected: Digest, name: str) -> None:
+        """
+        Args:
+            expected: Expected digest.
+            name: Name of the hashed file, for error message.
+        """
+        self._expected = expected
+        self._name = name
+        self._sha256 = hashlib.sha256()
+        self._size = 0
+
+    @property
+    def expected(self) -> Digest:
+        """Expected digest."""
+        return self._expected
+
+    def reset(self) -> None:
+        """Discard the hashed bytes, e.g. before re-hashing the whole file."""
+        self._sha256 = hashlib.sha256()
+        self._size = 0
+
+    def update(self, data: bytes) -> None:
+        """Hash the bytes, failing fast when the size exceeds the expected one."""
+        self._sha256.update(data)
+        self._size += len(data)
+        if self._expected.size is not None and self._size > self._expected.size:
+            raise RuntimeError(f"Size mismatch of {self._name}: expected {self._expected.size} bytes, but exceeded.")
+
+    def update_file(self, path: Path, size: Optional[int] = None) -> None:
+        """Hash the local file (first `size` bytes), e.g. already-transferred part of the resumed transfer."""
+        with open(path, "rb") as file:
+            remaining = os.path.getsize(path) if size is None else size
+            while remaining > 0:
+                chunk = file.read(min(_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                self.update(chunk)
+                remaining -= len(chunk)
+
+    def digest(self) -> Digest:
+        """Digest of the hashed bytes."""
+        return Digest(self._sha256.hexdigest(), self._size)
+
+    def verify(self) -> None:
+        """Verify the hashed bytes against the expected digest."""
+        actual = self.digest()
+        self._expected.check_size(actual.size, self._name)
+        if self._expected.sha256 is not None and actual.sha256 != self._expected.sha256.lower():
+            raise RuntimeError(f"SHA-256 mismatch of {self._name}: expected {self._expected.sha256}, but {actual.sha256}.")
+
+
+class HashingReader:
+    """Binary reader which hashes the bytes read through it.
+
+    Only sequential read is hashed. Once the reader seeks elsewhere (e.g. zip central directory access),
+    hash cannot be computed from the flow, so the whole file is re-read for verification.
+    """
+
+    def __init__(self, fileobj: BinaryIO, hasher: Hasher) -> None:
+        self._fileobj = fileobj
+        self._hasher = hasher
+        self._position = 0
+        self.sequential = True
+
+    def read(self, size: int = -1) -> bytes:
+        """Read and hash."""
+        data = self._fileobj.read(size)
+        if self.sequential:
+            self._hasher.update(data)
+        self._position += len(data)
+        return data
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        """Seek, which disables hashing if it breaks the sequential read."""
+        position = self._fileobj.seek(offset, whence)
+        if position != self._position:
+            self.sequential = False
+        self._position = position
+        return position
+
+    def tell(self) -> int:
+        """Current position."""
+        return self._position
+
+    def seekable(self) -> bool:
+        """Whether the underlying file is seekable."""
+        return self._fileobj.seekable()
+
+    def verify(self) -> None:
+        """Hash the unread tail (e.g. tar end-of-archive padding), then verify.
+
+        After non-sequential read, the declared SHA-256 is verified by an extra full read of the file.
+        Size-only digest is not re-read, because the size is known without read (checked by the caller beforehand).
+        """
+        if not self.sequential:
+            if self._hasher.expected.sha256 is None:
+                return
+            logging.warning("Archive is read non-sequentially, so the whole archive is read again for its checksum.")
+            self._fileobj.seek(0)
+            self._position = 0
+            self._hasher.reset()
+            self.sequential = True
+        while self.read(_CHUNK_SIZE):
+            pass
+        self._hasher.verify()
@@ -1,19 +1,33 @@
 """Corpus download handlers"""
 
 
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import Callable, List, Optional, Tuple
 
 from tqdm import tqdm
 import requests
+from requests.adapters import HTTPAdapter
+
+from speechcorpusy.components.checksum import Digest, Hasher
+from speechcorpusy.components.transfer import CHECKPOINT_SIZE, TransferState
+
+
+# Ranged download is worth only for large file
+_MIN_RANGED_SIZE = 16 * 1024 * 1024
+_CHUNK_SIZE = 1024 * 1024
+# Pooled session for Google Drive, per thread (`requests.Session` is not guaranteed to be thread-safe)
+_LOCAL = threading.local()
 
 
 def download_gdrive_large_contents(
     item_id: str,
     path_archive_local: Path,
-    total_size_gb: float
+    total_size_gb: float,
+    digest: Digest = Digest(),
 ) -> None:
-    """Download large contents in Google Drive.
+    """Download large contents in Google Drive, resuming the interrupted download if exists.
 
     Large contents in Google Drive needs special handling for virus check procedure.
     This utility wrap the procedure.
@@ -21,32 +35,244 @@ def download_gdrive_large_contents(
     Args:
         id: Google Drive contents ID.
         path_archive_local: Contents will be saved in this path.
-        total_size_GB: Estimated contents size specified by yourself (hacky way).
+        total_size_GB: Estimated contents size specified by yourself, used only when the server does not tell it.
+        digest: Expected digest of the contents, verified on the flowing bytes before the placement.
     """
     path_archive_local.parent.mkdir(parents=True, exist_ok=True)
 
-    # Request cookies for big file download.
+    # Resumption - Interrupted download is continued with range request (restarted if range is not served or the file is changed).
+    state = TransferState(path_archive_local)
+    saved_validator = state.saved_validator()
+    progress = state.load(saved_validator)
+    offset = progress["offset"] if progress is not None else 0
+    # Validator is `{ETag or Last-Modified}/{size}`, whose former part is the condition of the range request.
+    if_range = saved_validator.rsplit("/", 1)[0] if offset > 0 and saved_validator is not None else None
+    res, file_size = open_gdrive_contents(item_id, offset, if_range)
+    validator = _validator_of(res, file_size)
+    if offset > 0 and res.status_code == 206 and validator == saved_validator:
+        print(f"Resuming the interrupted download from {offset} bytes...")
+    else:
+        offset = 0
+    hasher = Hasher(digest, f"gdrive://{item_id}")
+    if digest:
+        digest.check_size(file_size, f"gdrive://{item_id}")
+        # Already-downloaded part is hashed locally.
+        if offset > 0:
+            hasher.update_file(state.part, offset)
+
+    with res:
+        pbar = tqdm(total=file_size or int(total_size_gb*1000*1000*1000), initial=offset, unit="B", unit_scale=True)
+        with open(state.part, mode="r+b" if offset > 0 else "wb") as file:
+            file.truncate(offset)
+            file.seek(offset)
+            checkpoint = offset
+            for chunk in res.iter_content(chunk_size=_CHUNK_SIZE):
+                if digest:
+                    hasher.update(chunk)
+                file.write(chunk)
+                offset += len(chunk)
+                pbar.update(len(chunk))
+                if offset - checkpoint >= CHECKPOINT_SIZE:
+                    state.save(validator, {"offset": offset}, file)
+                    checkpoint = offset
+            pbar.close()
+    if digest:
+        state.verify(hasher)
+    state.complete()
+
+
+def open_gdrive_contents(item_id: str, offset: int = 0, if_range: Optional[str] = None) -> Tuple[requests.Response, Optional[int]]:
+    """Open the streaming response of contents in Google Drive.
+
+    Args:
+        item_id: Google Drive contents ID.
+        offset: Start position [byte] (range request, which may not be served).
+        if_range: Validator (ETag or Last-Modified) of the already-downloaded part. If the file is changed, range is not served.
+    Returns:
+        Streaming response (206 if range is served, else 200 from the beginning) and the file size if the server tells it.
+    """
+    session = _gdrive_session()
+
+    # Small contents are served directly, large contents need the confirmation code of the virus check.
     url_for_cookies = f"https://drive.google.com/uc?export=download&id={item_id}"
-    res_dl = requests.get(url_for_cookies)
+    res_dl = session.get(url_for_cookies, stream=True)
+    res_dl.raise_for_status()
     code: Optional[str] = None
     for cookie in res_dl.cookies:
         if "download_warning" in cookie.name:
             code = cookie.value
     if code is None:
-        raise RuntimeError("download code is `None`. Please make issue in GitHub.")
-
-    # Request corpus with cookies.
-    url = f"{url_for_cookies}&confirm={code}"
-    # Auto content-length acquisition do not work in GDrive.
-    # file_size = int(requests.head(url, cookies=r.cookies).headers["content-length"])
-    file_size = int(total_size_gb*1000*1000*1000)
-    res = requests.get(url, cookies=res_dl.cookies, stream=True)
-    pbar = tqdm(total=file_size, unit="B", unit_scale=True)
-    with open(path_archive_local, mode="wb") as file:
-        for chunk in res.iter_content(chunk_size=1024):
-            file.write(chunk)
-            pbar.update(len(chunk))
+        if res_dl.headers.get("Content-Type", "").startswith("text/html"):
+            res_dl.close()
+            raise RuntimeError("download code is `None`. Please make issue in GitHub.")
+        if offset == 0:
+            return res_dl, _size_of_response(res_dl)
+        # Directly-served contents are resumed by the range request of the same URL.
+        url = url_for_cookies
+    else:
+        # Request corpus with cookies (held by the session).
+        url = f"{url_for_cookies}&confirm={code}"
+    res_dl.close()
+
+    headers = {"Range": f"bytes={offset}-"} if offset > 0 else {}
+    if offset > 0 and if_range is not None:
+        headers["If-Range"] = if_range
+    res = session.get(url, headers=headers, stream=True)
+    res.raise_for_status()
+    return res, _size_of_response(res)
+
+
+def _size_of_response(res: requests.Response) -> Optional[int]:
+    """Full file size in the response headers, if exists."""
+    if res.status_code == 206 and "/" in res.headers.get("Content-Range", ""):
+        total = res.headers["Content-Range"].rsplit("/", 1)[1]
+        return int(total) if total.isdigit() else None
+    length = res.headers.get("Content-Length")
+    # Encoded (e.g. gzip-ed transfer) length is not the file size
+    if length is None or "Content-Encoding" in res.headers:
+        return None
+    return int(length)
+
+
+def _validator_of(res: requests.Response, size: Optional[int]) -> Optional[str]:
+    """Validator of the file (ETag or Last-Modified, with the size), which changes when the file is replaced."""
+    tag = res.headers.get("ETag") or res.headers.get("Last-Modified")
+    if tag is None:
+        return None
+    return f"{tag}/{size}"
+
+
+def _gdrive_session() -> requests.Session:
+    """Get the pooled session of this thread, which reuses connections over requests and downloads."""
+    session: Optional[requests.Session] = getattr(_LOCAL, "session", None)
+    if session is None:
+        session = requests.Session()
+        session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+        _LOCAL.session = session
+    return session
+
+
+def download_ranged(url: str, path_local: Path, num_connections: int = 8, digest: Digest = Digest()) -> int:
+    """Download the HTTP(S) file with concurrent range requests, resuming the interrupted download if exists.
+
+    File size and range support are probed first, then byte ranges are fetched concurrently into the preallocated partial file.
+    Progress of each range is checkpointed with the file validator (ETag/Last-Modified), so the next run resumes from it.
+    If the server does not support range request (or the size is unknown), the file is downloaded with a single stream.
+
+    Args:
+        url: File URL.
+        path_local: The file will be saved in this path.
+        num_connections: The number of concurrent range requests.
+        digest: Expected digest of the file. Size is checked before the download.
+            Ranges arrive out of order, so hash is verified with a local read of the downloaded file before the placement.
+    Returns:
+        The number of downloaded bytes in this call.
+    """
+
+    # Design Notes:
+    #   Origin servers often throttle per connection, so multiple connections multiply the throughput.
+    path_local.parent.mkdir(parents=True, exist_ok=True)
+    state = TransferState(path_local)
+    size, accept_ranges, validator = _probe(url)
+    hasher = Hasher(digest, url)
+    digest.check_size(size, url)
+    if size is None or not accept_ranges:
+        total = _download_single(url, state.part, size, hasher if digest else None)
+        if digest:
+            state.verify(hasher)
+        state.complete()
+        return total
+
+    # Ranges - [start, end, next_offset] of each connection, restored from the interrupted download if exists
+    ranges = state.load(validator)
+    if ranges is None:
+        num_ranges = num_connections if size >= _MIN_RANGED_SIZE else 1
+        range_size = max(-(-size // num_ranges), 1)
+        ranges = [[start, min(start + range_size, size) - 1, start] for start in range(0, size, range_size)]
+        # Preallocation - Each range is written at its offset, so the file should have the full size beforehand.
+        with open(state.part, "wb") as file:
+            file.truncate(size)
+    else:
+        print("Resuming the interrupted download...")
+
+    total_remaining = sum(end + 1 - offset for _, end, offset in ranges)
+    pbar = tqdm(total=size, initial=size - total_remaining, unit="B", unit_scale=True)
+    lock = threading.Lock()
+    with open(state.part, "r+b") as checkpoint_file:
+        def checkpoint() -> None:
+            state.save(validator, ranges, checkpoint_file)
+        with ThreadPoolExecutor(max_workers=num_connections) as executor:
+            futures = [executor.submit(_download_range, url, state.part, range_, validator, pbar, lock, checkpoint) for range_ in ranges if range_[2] <= range_[1]]
+            for future in futures:
+                future.result()
+    pbar.close()
+    if digest.sha256 is not None:
+        hasher.update_file(state.part)
+        state.verify(hasher)
+    state.complete()
+    return total_remaining
+
+
+def _probe(url: str) -> Tuple[Optional[int], bool, Optional[str]]:
+    """Probe the file size, range request support and validator (ETag or Last-Modified) of the URL."""
+    res = requests.head(url, allow_redirects=True)
+    res.raise_for_status()
+    length = res.headers.get("Content-Length")
+    # Encoded (e.g. gzip-ed transfer) length is not the file size
+    if length is None or "Content-Encoding" in res.headers:
+        return None, False, None
+    accept_ranges = res.headers.get("Accept-Ranges", "").lower() == "bytes"
+    validator = res.headers.get("ETag") or res.headers.get("Last-Modified")
+    return int(length), accept_ranges, validator
+
+
+def _download_single(url: str, path_local: Path, size: Optional[int], hasher: Optional[Hasher] = None) -> int:
+    """Download the file with a single stream, hashing the flowing bytes if hasher is given."""
+    total = 0
+    with requests.get(url, stream=True) as res:
+        res.raise_for_status()
+        pbar = tqdm(total=size, unit="B", unit_scale=True)
+        with open(path_local, mode="wb") as file:
+            for chunk in res.iter_content(chunk_size=_CHUNK_SIZE):
+                if hasher is not None:
+                    hasher.update(chunk)
+                file.write(chunk)
+                total += len(chunk)
+                pbar.update(len(chunk))
         pbar.close()
+    return total
+
+
+def _download_range(url: str, path_local: Path, range_: List[int], validator: Optional[str], pbar: tqdm, lock: threading.Lock, checkpoint: Callable[[], None]) -> None:
+    """Download the remaining part of the byte range into the file at the offset, updating the range progress (thread-pool worker)."""
+    start, end = range_[2], range_[1]
+    headers = {"Range": f"bytes={start}-{end}"}
+    # File change during resumption results in full response (200), not mixed contents.
+    if validator is not None:
+        headers["If-Range"] = validator
+    with requests.get(url, headers=headers, stream=True) as res:
+        if res.status_code != 206:
+            raise RuntimeError(f"Range request to {url} is not served (status {res.status_code}).")
+        with open(path_local, "r+b") as file:
+            file.seek(start)
+            since_checkpoint = 0
+            for chunk in res.iter_content(chunk_size=_CHUNK_SIZE):
+                file.write(chunk)
+                since_checkpoint += len(chunk)
+                with lock:
+                    pbar.update(len(chunk))
+                if since_checkpoint >= CHECKPOINT_SIZE:
+                    file.flush()
+                    with lock:
+                        range_[2] += since_checkpoint
+                        checkpoint()
+                    since_checkpoint = 0
+            file.flush()
+            with lock:
+                range_[2] += since_checkpoint
+                checkpoint()
+    if range_[2] != end + 1:
+        raise RuntimeError(f"Range {start}-{end} of {url} is truncated.")
 
 
 if __name__ == "__main__":
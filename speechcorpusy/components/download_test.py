@@ -0,0 +1,185 @@
+"""Test download handlers."""
+
+import functools
+import http.server
+import os
+import re
+import threading
+from pathlib import Path
+
+import pytest
+
+from . import download
+from .download import download_ranged
+from .transfer import TransferState
+
+
+class _RangeHandler(http.server.SimpleHTTPRequestHandler):
+    """File server with single-range request support."""
+
+    def log_message(self, *args):
+        pass
+
+    def send_head(self):
+        path = self.translate_path(self.path)
+        size = os.path.getsize(path)
+        file = open(path, "rb") # pylint: disable=consider-using-with
+        range_header = self.headers.get("Range")
+        if range_header:
+            start, end = map(int, re.match(r"bytes=(\d+)-(\d+)", range_header).groups())
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+            file.seek(start)
+            self.length = end - start + 1
+        else:
+            self.send_response(200)
+            self.length = size
+        self.send_header("Content-Length", str(self.length))
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("ETag", '"v1"')
+        self.end_headers()
+        return file
+
+    def copyfile(self, source, outputfile):
+        outputfile.write(source.read(self.length))
+
+
+@pytest.fixture(name="serve")
+def fixture_serve(tmp_path: Path):
+    """Serve the directory over HTTP."""
+    servers = []
+
+    def serve(handler):
+        server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(handler, directory=str(tmp_path)))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_port}"
+
+    yield serve
+    for server in servers:
+        server.shutdown()
+
+
+@pytest.mark.parametrize("handler", [_RangeHandler, http.server.SimpleHTTPRequestHandler])
+def test_download_ranged(tmp_path: Path, serve, monkeypatch, handler):
+    """Test ranged download, and single-stream fallback without range support."""
+
+    monkeypatch.setattr(download, "_MIN_RANGED_SIZE", 0)
+    data = os.urandom(1000 * 1000 + 7)
+    (tmp_path / "archive.zip").write_bytes(data)
+
+    url = serve(handler)
+    assert download_ranged(f"{url}/archive.zip", tmp_path / "dl" / "archive.zip", num_connections=4) == len(data)
+    assert (tmp_path / "dl" / "archive.zip").read_bytes() == data
+
+
+def test_download_ranged_resume(tmp_path: Path, serve):
+    """Test resumption of the interrupted ranged download."""
+
+    data = os.urandom(1000 * 1000)
+    (tmp_path / "archive.zip").write_bytes(data)
+    url = serve(_RangeHandler)
+
+    # Interrupted state: 1st range is done, 2nd range is half done
+    path_local = tmp_path / "dl" / "archive.zip"
+    path_local.parent.mkdir()
+    state = TransferState(path_local)
+    with open(state.part, "wb") as part:
+        part.write(data[:750000] + bytes(250000))
+        state.save('"v1"', [[0, 499999, 500000], [500000, 999999, 750000]], part)
+
+    assert download_ranged(f"{url}/archive.zip", path_local, num_connections=2) == 250000
+    assert path_local.read_bytes() == data
+
+
+class _GdriveResponse:
+    """Streaming response of Google Drive, served from the bytes."""
+
+    def __init__(self, data: bytes, offset: int, etag: str):
+        self.status_code = 206 if offset > 0 else 200
+        self.headers = {"ETag": etag, "Content-Length": str(len(data) - offset)}
+        if offset > 0:
+            self.headers["Content-Range"] = f"bytes {offset}-{len(data) - 1}/{len(data)}"
+        self._data = data[offset:]
+
+    def iter_content(self, chunk_size: int):
+        for start in range(0, len(self._data), chunk_size):
+            yield self._data[start:start + chunk_size]
+
+    cookies: list = []
+
+    def raise_for_status(self):
+        pass
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+
+@pytest.mark.parametrize("changed", [False, True])
+def test_download_gdrive_resume(tmp_path: Path, monkeypatch, changed):
+    """Test resumption of the interrupted Google Drive download, restarted if the file is replaced."""
+
+    old, new = os.urandom(1000), os.urandom(1000)
+    data, etag = (new, '"v2"') if changed else (old, '"v1"')
+
+    def open_contents(_, offset, if_range):
+        # Server serves the range only for the unchanged file
+        return _GdriveResponse(data, offset if if_range == etag else 0, etag), len(data)
+    monkeypatch.setattr(download, "open_gdrive_contents", open_contents)
+
+    # Interrupted state: the first half of the old file
+    path_local = tmp_path / "dl" / "archive.zip"
+    path_local.parent.mkdir()
+    state = TransferState(path_local)
+    with open(state.part, "wb") as part:
+        part.write(old[:500])
+        state.save(f'"v1"/{len(old)}', {"offset": 500}, part)
+
+    download.download_gdrive_large_contents("id", path_local, 0.001)
+    assert path_local.read_bytes() == data
+
+
+def test_download_gdrive_direct_resume(tmp_path: Path, monkeypatch):
+    """Test resumption of the directly-served (no virus check confirmation) Google Drive download."""
+
+    data = os.urandom(1000)
+    requests_range = []
+
+    class Session:
+        """Google Drive which directly serves the contents, with the range request."""
+        def get(self, url, headers=None, stream=False): # pylint: disable=unused-argument
+            assert "confirm=" not in url
+            requests_range.append((headers or {}).get("Range"))
+            offset = int(headers["Range"][6:-1]) if headers and headers.get("If-Range") == '"v1"' else 0
+            return _GdriveResponse(data, offset, '"v1"')
+    monkeypatch.setattr(download, "_gdrive_session", Session)
+
+    # Interrupted state: the first half of the file
+    path_local = tmp_path / "dl" / "archive.zip"
+    path_local.parent.mkdir()
+    state = TransferState(path_local)
+    with open(state.part, "wb") as part:
+        part.write(data[:500])
+        state.save(f'"v1"/{len(data)}', {"offset": 500}, part)
+
+    download.download_gdrive_large_contents("id", path_local, 0.001)
+    assert path_local.read_bytes() == data
+    # Probe, then the range request of the rest
+    assert requests_range == [None, "bytes=500-"]
+
+
+def test_gdrive_session_per_thread():
+    """Test that each thread has its own pooled session."""
+
+    sessions = []
+    thread = threading.Thread(target=lambda: sessions.append(download._gdrive_session())) # pylint: disable=protected-access
+    thread.start()
+    thread.join()
+    assert download._gdrive_session() is download._gdrive_session() # pylint: disable=protected-access
+    assert download._gdrive_session() is not sessions[0] # pylint: disable=protected-access
@@ -0,0 +1,172 @@
+"""Columnar item identity table"""
+
+
+from __future__ import annotations
+from array import array
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional, Union, overload
+
+from speechcorpusy.interface import ItemId
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+# Dictionary-encoded attributes (a few distinct values shared by many items)
+CODED_ATTRIBUTES = ("corpus", "subtype", "speaker")
+
+
+def _import_numpy() -> Any:
+    """Import numpy, which is an optional dependency."""
+    try:
+        import numpy # pylint: disable=import-outside-toplevel
+    except ImportError as err:
+        raise ImportError("`ItemTable` needs numpy. Install it with `pip install numpy` (or `pip install speechcorpusy[table]`).") from err
+    return numpy
+
+
+class ItemTable:
+    """Array-backed table of item identities.
+
+    corpus/subtype/speaker are dictionary-encoded integer columns, and names are packed into a single UTF-8 buffer.
+    Filtering, grouping and slicing are vectorized, and they return tables which share the columns (only row indices are new).
+    `ItemId` is made only when an item is accessed.
+    """
+
+    # Design Notes:
+    #   A merged corpus has >100k items, which are >100k objects with four strings each as `ItemId`.
+    #   Attributes have few distinct values, so integer codes are far smaller and comparison of them is vectorized.
+
+    def __init__(self, categories: Dict[str, List[str]], codes: Dict[str, np.ndarray], names: bytes, offsets: np.ndarray, rows: Optional[np.ndarray] = None) -> None:
+        """
+        Args:
+            categories: Attribute name -> distinct values, indexed by code.
+            codes: Attribute name -> code column.
+            names: Packed UTF-8 names.
+            offsets: Name boundaries in `names`, [start of row 0, ..., end of the last row].
+            rows: Column indices of the rows in this table (default: all rows of the columns).
+        """
+        self._categories = categories
+        self._codes = codes
+        self._names = names
+        self._offsets = offsets
+        self._rows = rows
+
+    @classmethod
+    def from_items(cls, items: Iterable[ItemId]) -> ItemTable:
+        """Build the table from item identities, in a single pass."""
+        np = _import_numpy()
+        lookups: Dict[str, Dict[str, int]] = {attribute: {} for attribute in CODED_ATTRIBUTES}
+        codes = {attribute: array("L") for attribute in CODED_ATTRIBUTES}
+        names = bytearray()
+        offsets = array("Q", [0])
+        for item in items:
+            for attribute in CODED_ATTRIBUTES:
+                lookup = lookups[attribute]
+                value = getattr(item, attribute)
+                code = lookup.get(value)
+                if code is None:
+                    code = lookup[value] = len(lookup)
+                codes[attribute].append(code)
+            names += item.name.encode("utf-8")
+            offsets.append(len(names))
+
+        return cls(
+            {attribute: list(lookup) for attribute, lookup in lookups.items()},
+            {attribute: np.asarray(codes[attribute], dtype=_uint_dtype(np, len(lookups[attribute]))) for attribute in CODED_ATTRIBUTES},
+            bytes(names),
+            np.asarray(offsets, dtype=_uint_dtype(np, len(names))),
+        )
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1 if self._rows is None else len(self._rows)
+
+    @overload
+    def __getitem__(self, index: int) -> ItemId: ...
+    @overload
+    def __getitem__(self, index: Union[slice, np.ndarray, List[int]]) -> ItemTable: ...
+    def __getitem__(self, index):
+        """Item at the position, or the table of the rows selected by slice/index array/boolean mask."""
+        np = _import_numpy()
+        if isinstance(index, (int, np.integer)):
+            return self._item(range(len(self))[index] if self._rows is None else int(self._rows[index]))
+        return self._select(np.arange(len(self))[index] if self._rows is None else self._rows[index])
+
+    def __iter__(self) -> Iterator[ItemId]:
+        # Columns are gathered at once, so per-item work is only lookups in Python lists.
+        corpuses, subtypes, speakers = (
+            [self._categories[attribute][code] for code in self._column(attribute).tolist()]
+            for attribute in CODED_ATTRIBUTES
+        )
+        offsets = self._offsets.tolist()
+        for corpus, subtype, speaker, row in zip(corpuses, subtypes, speakers, self._indices()):
+            yield ItemId(corpus, subtype, speaker, self._names[offsets[row]:offsets[row + 1]].decode("utf-8"))
+
+    def to_items(self) -> List[ItemId]:
+        """Convert all rows into item identities."""
+        return list(self)
+
+    def values(self, attribute: str) -> np.ndarray:
+        """Values of the attribute in each row (names are decoded, so it is slower than the coded attributes)."""
+        np = _import_numpy()
+        if attribute == "name":
+            return np.array([self._name(row) for row in self._indices()], dtype=object)
+        return np.asarray(self._categories[attribute], dtype=object)[self._column(attribute)]
+
+    def mask(self, attribute: str, values: Union[str, Iterable[str]]) -> np.ndarray:
+        """Boolean mask of the rows whose attribute is one of the values."""
+        np = _import_numpy()
+        wanted = {values} if isinstance(values, str) else set(values)
+        if attribute == "name":
+            return np.fromiter((self._name(row) in wanted for row in self._indices()), dtype=bool, count=len(self))
+        # Code -> selected lookup table, so each row needs only a gather
+        selected = np.fromiter((value in wanted for value in self._categories[attribute]), dtype=bool, count=len(self._categories[attribute]))
+        return selected[self._column(attribute)]
+
+    def filter(self, **conditions: Union[str, Iterable[str]]) -> ItemTable:
+        """Select the rows which match all the conditions, e.g. `table.filter(corpus="JVS", speaker=["jvs001", "jvs002"])`."""
+        np = _import_numpy()
+        selected = np.ones(len(self), dtype=bool)
+        for attribute, values in conditions.items():
+            selected &= self.mask(attribute, values)
+        return self[selected]
+
+    def group_by(self, attribute: str) -> Dict[str, ItemTable]:
+        """Group the rows by the coded attribute (corpus/subtype/speaker), ordered by the attribute value."""
+        np = _import_numpy()
+        codes = self._column(attribute)
+        # Stable sort keeps the original order in each group
+        order = np.argsort(codes, kind="stable")
+        starts = np.flatnonzero(np.diff(codes[order])) + 1
+        groups = {
+            self._categories[attribute][int(codes[positions[0]])]: self._select(positions if self._rows is None else self._rows[positions])
+            for positions in np.split(order, starts) if len(positions) > 0
+        }
+        return dict(sorted(groups.items()))
+
+    def _column(self, attribute: str) -> np.ndarray:
+        """Codes of the attribute in each row."""
+        codes = self._codes[attribute]
+        return codes if self._rows is None else codes[self._rows]
+
+    def _indices(self) -> Union[range, List[int]]:
+        """Column indices of the rows."""
+        return range(len(self)) if self._rows is None else self._rows.tolist()
+
+    def _select(self, rows: np.ndarray) -> ItemTable:
+        """Table of the rows, which shares the columns."""
+        return ItemTable(self._categories, self._codes, self._names, self._offsets, rows)
+
+    def _name(self, row: int) -> str:
+        return self._names[int(self._offsets[row]):int(self._offsets[row + 1])].decode("utf-8")
+
+    def _item(self, row: int) -> ItemId:
+        corpus, subtype, speaker = (self._categories[attribute][int(self._codes[attribute][row])] for attribute in CODED_ATTRIBUTES)
+        return ItemId(corpus, subtype, speaker, self._name(row))
+
+
+def _uint_dtype(np: Any, max_value: int) -> Any:
+    """The smallest unsigned integer type which holds the values up to `max_value`."""
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if max_value <= np.iinfo(dtype).max:
+            return dtype
+    return np.uint64
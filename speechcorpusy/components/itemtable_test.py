@@ -0,0 +1,44 @@
+"""Test columnar item table."""
+
+import pytest
+
+from speechcorpusy.interface import ItemId
+
+np = pytest.importorskip("numpy")
+from .itemtable import ItemTable # pylint: disable=wrong-import-position
+
+
+ITEMS = [
+    ItemId(corpus, "sub", f"{corpus}_spk{spk}", f"uttr{uttr}")
+    for corpus in ["A", "B"]
+    for spk in range(3)
+    for uttr in range(4)
+]
+
+
+def test_round_trip():
+    """Test lazy conversion into the same items."""
+
+    table = ItemTable.from_items(ITEMS)
+    assert len(table) == len(ITEMS)
+    assert table.to_items() == ITEMS
+    assert table[5] == ITEMS[5]
+    assert table[-1] == ITEMS[-1]
+    assert table[3:7].to_items() == ITEMS[3:7]
+    assert table[np.array([0, 13])].to_items() == [ITEMS[0], ITEMS[13]]
+
+
+def test_filter_group():
+    """Test vectorized filter and group-by."""
+
+    table = ItemTable.from_items(ITEMS)
+
+    filtered = table.filter(corpus="B", speaker=["B_spk0", "B_spk2", "A_spk1"])
+    assert filtered.to_items() == [item for item in ITEMS if item.corpus == "B" and item.speaker in ("B_spk0", "B_spk2")]
+    assert table.filter(name="uttr3", corpus="A").to_items() == [item for item in ITEMS if item.corpus == "A" and item.name == "uttr3"]
+    assert len(table.filter(speaker="not_exist")) == 0
+
+    groups = filtered.group_by("speaker")
+    assert list(groups) == ["B_spk0", "B_spk2"]
+    assert groups["B_spk2"].to_items() == [item for item in ITEMS if item.speaker == "B_spk2"]
+    assert list(table.values("corpus")[[0, -1]]) == ["A", "B"]
@@ -0,0 +1,88 @@
+"""Cross-process lock"""
+
+
+from __future__ import annotations
+import os
+import time
+from pathlib import Path
+from types import TracebackType
+from typing import Optional, Type
+
+try:
+    import fcntl
+except ImportError: # Windows
+    fcntl = None # type: ignore
+    import msvcrt # pylint: disable=import-error
+
+
+class FileLock:
+    """Exclusive lock over processes, based on a lock file.
+
+    Processes sharing the filesystem (e.g. data-parallel ranks on a node) are serialized.
+    Lock is released by OS when the process dies, so killed holder never blocks others forever.
+    """
+
+    def __init__(self, path: Path, timeout: Optional[float] = None, interval: float = 0.5) -> None:
+        """
+        Args:
+            path: Lock file path.
+            timeout: Maximum waiting time [sec] (None: wait forever, 0: non-blocking try).
+            interval: Polling interval [sec].
+        """
+        self._path = path
+        self._timeout = timeout
+        self._interval = interval
+        self._fd: Optional[int] = None
+
+    def acquire(self) -> None:
+        """Acquire the lock, blocking until acquisition or timeout."""
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self._path, os.O_RDWR | os.O_CREAT, 0o666)
+        start = time.monotonic()
+        waiting = False
+        while not _try_lock(fd):
+            # Timeout is checked before waiting, so `timeout=0` is a non-blocking try.
+            elapsed = time.monotonic() - start
+            if self._timeout is not None and elapsed >= self._timeout:
+                os.close(fd)
+                raise TimeoutError(f"Failed to acquire the lock {self._path} in {self._timeout} sec.")
+            if not waiting:
+                print("Waiting for another process...")
+                waiting = True
+            time.sleep(self._interval if self._timeout is None else min(self._interval, self._timeout - elapsed))
+        self._fd = fd
+
+    def release(self) -> None:
+        """Release the lock."""
+        if self._fd is not None:
+            _unlock(self._fd)
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self) -> FileLock:
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type: Optional[Type[BaseException]], exc: Optional[BaseException], traceback: Optional[TracebackType]) -> None:
+        self.release()
+
+
+def _try_lock(fd: int) -> bool:
+    """Try to lock the file without blocking."""
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+        return True
+    except OSError:
+        return False
+
+
+def _unlock(fd: int) -> None:
+    """Unlock the file."""
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    else:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
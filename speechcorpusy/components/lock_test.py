@@ -0,0 +1,34 @@
+"""Test cross-process lock."""
+
+import time
+from pathlib import Path
+
+import pytest
+
+from .lock import FileLock
+
+
+def test_file_lock_timeout(tmp_path: Path):
+    """Test lock exclusion and timeout."""
+
+    path_lock = tmp_path / "contents.lock"
+    with FileLock(path_lock):
+        # Other lock holder (other open file) is blocked
+        with pytest.raises(TimeoutError):
+            FileLock(path_lock, timeout=0.2, interval=0.05).acquire()
+
+    # Released
+    with FileLock(path_lock, timeout=0.2):
+        pass
+
+
+def test_file_lock_nonblocking(tmp_path: Path, capsys):
+    """Test non-blocking try with zero timeout."""
+
+    path_lock = tmp_path / "contents.lock"
+    with FileLock(path_lock):
+        start = time.monotonic()
+        with pytest.raises(TimeoutError):
+            FileLock(path_lock, timeout=0, interval=10.0).acquire()
+        assert time.monotonic() - start < 1.0
+    assert "Waiting" not in capsys.readouterr().out
@@ -0,0 +1,75 @@
+"""Acquisition metrics"""
+
+
+from __future__ import annotations
+import logging
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Iterator, Optional
+
+
+logger = logging.getLogger("speechcorpusy.metrics")
+
+_callbacks: list[Callable[[StageEvent], None]] = []
+
+
+@dataclass
+class StageEvent:
+    """Metrics of an acquisition stage.
+
+    Stages:
+        probe - Archive existence/size check in the adress
+        download - Download from the origin (e.g. Google Drive)
+        forward - Forward from the origin to the adress
+        read - Archive read (pull) from the adress
+        verify - Digest check of the local archive by its own read pass, before the parallel extraction
+        extract - Archive extraction
+        nested-extract - Extraction of the archive in the contents (e.g. VCTK's inner zip)
+    """
+    stage: str
+    adress: str
+    duration: float = 0.0      # [sec]
+    nbytes: Optional[int] = None
+    items: Optional[int] = None
+
+    @property
+    def throughput(self) -> Optional[float]:
+        """Throughput [byte/sec]."""
+        if self.nbytes is None or self.duration <= 0:
+            return None
+        return self.nbytes / self.duration
+
+
+def add_metrics_callback(callback: Callable[[StageEvent], None]) -> None:
+    """Register the callback, which is called with every acquisition stage event.
+
+    Events are also logged to `speechcorpusy.metrics` logger (INFO level), so attaching a log handler works too.
+    """
+    _callbacks.append(callback)
+
+
+def remove_metrics_callback(callback: Callable[[StageEvent], None]) -> None:
+    """Unregister the callback."""
+    _callbacks.remove(callback)
+
+
+@contextmanager
+def measure(stage: str, adress: str) -> Iterator[StageEvent]:
+    """Measure the stage duration, then emit the event.
+
+    Fill `nbytes` and `items` of the yielded event in the stage. Event is emitted only when the stage succeeds.
+    """
+    event = StageEvent(stage, adress)
+    start = time.perf_counter()
+    yield event
+    event.duration = time.perf_counter() - start
+    emit(event)
+
+
+def emit(event: StageEvent) -> None:
+    """Deliver the event to the logger and the registered callbacks."""
+    throughput = f"{event.throughput / 1e6:.1f} MB/s" if event.throughput is not None else "-"
+    logger.info("%s %s: %.2f sec, %s bytes, %s items, %s", event.stage, event.adress, event.duration, event.nbytes, event.items, throughput)
+    for callback in _callbacks:
+        callback(event)
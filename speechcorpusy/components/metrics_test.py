@@ -0,0 +1,28 @@
+"""Test acquisition metrics."""
+
+import zipfile
+from pathlib import Path
+
+from .archive import try_to_acquire_archive_contents
+from .metrics import StageEvent, add_metrics_callback, remove_metrics_callback
+
+
+def test_acquisition_events(tmp_path: Path):
+    """Test per-stage events of an acquisition."""
+
+    adress = tmp_path / "archive.zip"
+    with zipfile.ZipFile(adress, "w") as zfile:
+        zfile.writestr("corpus/uttr1.wav", b"uttr1" * 100)
+        zfile.writestr("corpus/uttr2.wav", b"uttr2" * 100)
+
+    events: list[StageEvent] = []
+    add_metrics_callback(events.append)
+    try:
+        assert try_to_acquire_archive_contents(str(adress), tmp_path / "contents")
+    finally:
+        remove_metrics_callback(events.append)
+
+    assert [event.stage for event in events] == ["probe", "extract"]
+    assert events[0].nbytes == adress.stat().st_size
+    assert events[1].items == 2
+    assert events[1].throughput is not None
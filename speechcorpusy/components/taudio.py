@@ -3,15 +3,20 @@
 
 import logging
 import os
+import posixpath
 import tarfile
 import zipfile
-from typing import List, Optional
+from concurrent.futures import ProcessPoolExecutor
+from typing import BinaryIO, Collection, List, Optional, Set
 
 
 def extract_archive(
     from_path: str,
     to_path: Optional[str] = None,
-    overwrite: bool = False
+    overwrite: bool = False,
+    num_workers: int = 1,
+    journal_path: Optional[str] = None,
+    members: Optional[Collection[str]] = None,
 ) -> List[str]:
     """Extract archive.
 
@@ -24,6 +29,9 @@ def extract_archive(
         to_path (str or None, optional): the root path
             of the extraced files (directory of from_path)
         overwrite (bool, optional): overwrite existing files (Default: ``False``)
+        num_workers (int, optional): the number of processes for zip extraction (Default: ``1``)
+        journal_path (str or None, optional): the path of the extraction journal for resumption (Default: ``None``)
+        members (collection of str or None, optional): the member names to be extracted (Default: ``None``, all members)
     Returns:
         list: List of paths to extracted files even if not overwritten.
     Examples:
@@ -41,18 +49,7 @@ def extract_archive(
         with tarfile.open(from_path, "r") as tar:
             msg = f"Opened tar file {from_path}."
             logging.info(msg)
-            files = []
-            for file_ in tar:  # type: Any
-                file_path = os.path.join(to_path, file_.name)
-                if file_.isfile():
-                    files.append(file_path)
-                    if os.path.exists(file_path):
-                        msg = f"{file_path} already extracted."
-                        logging.info(msg)
-                        if not overwrite:
-                            continue
-                tar.extract(file_, to_path)
-            return files
+            return _extract_tar(tar, to_path, overwrite, journal_path, members)
     except tarfile.ReadError:
         pass
 
@@ -60,17 +57,190 @@ def extract_archive(
         with zipfile.ZipFile(from_path, "r") as zfile:
             msg = f"Opened zip file {from_path}."
             logging.info(msg)
-            files = zfile.namelist()
-            for file_ in files:
-                file_path = os.path.join(to_path, file_)
-                if os.path.exists(file_path):
-                    msg = f"{file_path} already extracted."
-                    logging.info(msg)
-                    if not overwrite:
-                        continue
-                zfile.extract(file_, to_path)
-        return files
+            if num_workers > 1:
+                return _extract_zip_parallel(from_path, zfile, to_path, overwrite, num_workers, journal_path, members)
+            return _extract_zip(zfile, to_path, overwrite, journal_path, members)
     except zipfile.BadZipFile:
         pass
 
     raise NotImplementedError("We currently only support tar.gz, tgz, and zip achives.")
+
+
+def extract_archive_stream(
+    fileobj: BinaryIO,
+    to_path: str,
+    overwrite: bool = False,
+    journal_path: Optional[str] = None,
+    members: Optional[Collection[str]] = None,
+) -> List[str]:
+    """Extract archive directly from a file object, without intermediate copy.
+
+    tar (plain/gz/bz2/xz) is extracted in a single forward pass.
+    zip needs random access to its central directory, so `fileobj` should be seekable in this case.
+
+    Args:
+        fileobj: Opened binary file object of the archive (e.g. `fsspec.open(...)` file)
+        to_path: The root path of the extraced files
+        overwrite: overwrite existing files
+        journal_path: The path of the extraction journal for resumption
+        members: The member names to be extracted (default: all members)
+    Returns:
+        List of paths to extracted files even if not overwritten.
+    """
+
+    # Design Notes:
+    #   Tar's stream mode ('r|*') do not seek, so even forward-only stream (e.g. HTTP) can be extracted.
+    #   On failure it consumes only the first header block, so we can rewind and retry as zip.
+    try:
+        with tarfile.open(fileobj=fileobj, mode="r|*") as tar:
+            logging.info("Opened tar stream.")
+            return _extract_tar(tar, to_path, overwrite, journal_path, members)
+    except tarfile.ReadError:
+        pass
+
+    if not fileobj.seekable():
+        raise RuntimeError("zip archive stream should be seekable. Disable the streaming acquisition.")
+    fileobj.seek(0)
+    try:
+        with zipfile.ZipFile(fileobj, "r") as zfile:
+            logging.info("Opened zip stream.")
+            return _extract_zip(zfile, to_path, overwrite, journal_path, members)
+    except zipfile.BadZipFile:
+        pass
+
+    raise NotImplementedError("We currently only support tar.gz, tgz, and zip achives.")
+
+
+class _Journal:
+    """Append-only record of the completely extracted members.
+
+    A member is recorded just after its extraction, so a member which is not in the journal may be half-written.
+    With a journal, members are skipped only if recorded, and others are (over)written.
+    """
+
+    def __init__(self, path: Optional[str]) -> None:
+        self._file = None
+        self.done: Set[str] = set()
+        if path is not None:
+            if os.path.exists(path):
+                with open(path, "r", encoding="utf-8") as journal:
+                    self.done = set(journal.read().splitlines())
+            self._file = open(path, "a", encoding="utf-8") # pylint: disable=consider-using-with
+
+    def skip(self, name: str, file_path: str, overwrite: bool) -> bool:
+        """Whether to skip the member extraction."""
+        if self._file is not None:
+            return name in self.done
+        if os.path.exists(file_path):
+            msg = f"{file_path} already extracted."
+            logging.info(msg)
+            return not overwrite
+        return False
+
+    def record(self, name: str) -> None:
+        """Record the member as extracted."""
+        if self._file is not None:
+            # Single-line append is atomic, so multiple processes can share the journal.
+            self._file.write(f"{name}\n")
+            self._file.flush()
+
+    def close(self) -> None:
+        """Close the journal file."""
+        if self._file is not None:
+            self._file.close()
+
+
+def _extract_tar(tar: tarfile.TarFile, to_path: str, overwrite: bool, journal_path: Optional[str] = None, members: Optional[Collection[str]] = None) -> List[str]:
+    """Extract all (or specified) members of the opened tar file, in member order."""
+    journal = _Journal(journal_path)
+    targets = _normalize(members)
+    files = []
+    for file_ in tar:  # type: Any
+        if targets is not None and posixpath.normpath(file_.name) not in targets:
+            continue
+        file_path = os.path.join(to_path, file_.name)
+        if file_.isfile():
+            files.append(file_path)
+            if journal.skip(file_.name, file_path, overwrite):
+                continue
+        tar.extract(file_, to_path)
+        if file_.isfile():
+            journal.record(file_.name)
+    journal.close()
+    return files
+
+
+def _extract_zip(zfile: zipfile.ZipFile, to_path: str, overwrite: bool, journal_path: Optional[str] = None, members: Optional[Collection[str]] = None) -> List[str]:
+    """Extract all (or specified) members of the opened zip file."""
+    files = _select_zip_names(zfile, members)
+    _extract_zip_names(zfile, files, to_path, overwrite, journal_path)
+    return files
+
+
+def _extract_zip_names(zfile: zipfile.ZipFile, members: List[str], to_path: str, overwrite: bool, journal_path: Optional[str]) -> None:
+    """Extract specified members of the opened zip file."""
+    journal = _Journal(journal_path)
+    for file_ in members:
+        file_path = os.path.join(to_path, file_)
+        if journal.skip(file_, file_path, overwrite):
+            continue
+        zfile.extract(file_, to_path)
+        journal.record(file_)
+    journal.close()
+
+
+def _extract_zip_parallel(from_path: str, zfile: zipfile.ZipFile, to_path: str, overwrite: bool, num_workers: int, journal_path: Optional[str] = None, members: Optional[Collection[str]] = None) -> List[str]:
+    """Extract all (or specified) members of the zip file with a process pool.
+
+    The central directory is split into contiguous chunks of balanced size, and each worker extracts its chunks.
+    """
+
+    files = _select_zip_names(zfile, members)
+    infos = list(map(zfile.getinfo, files))
+
+    # Directories are made beforehand, because concurrent `makedirs` of the same parent races.
+    # Unsafe names (absolute or '..') are left to the sanitization of `ZipFile.extract`.
+    for info in infos:
+        if os.path.isabs(info.filename) or ".." in info.filename.split("/"):
+            continue
+        parent = os.path.dirname(os.path.join(to_path, info.filename.rstrip("/")))
+        os.makedirs(parent, exist_ok=True)
+
+    # Chunking - a few chunks per worker for load balancing, split by accumulated compressed size
+    num_chunks = num_workers * 4
+    chunk_size = sum(info.compress_size for info in infos) / num_chunks + 1
+    chunks: List[List[str]] = [[]]
+    accum = 0
+    for info in infos:
+        if accum >= chunk_size * len(chunks):
+            chunks.append([])
+        chunks[-1].append(info.filename)
+        accum += info.compress_size
+
+    with ProcessPoolExecutor(max_workers=num_workers) as executor:
+        futures = [executor.submit(_extract_zip_members, from_path, chunk, to_path, overwrite, journal_path) for chunk in chunks]
+        for future in futures:
+            future.result()
+
+    return files
+
+
+def _extract_zip_members(from_path: str, members: List[str], to_path: str, overwrite: bool, journal_path: Optional[str]) -> None:
+    """Extract specified members of the zip file (process-pool worker)."""
+    with zipfile.ZipFile(from_path, "r") as zfile:
+        _extract_zip_names(zfile, members, to_path, overwrite, journal_path)
+
+
+def _normalize(members: Optional[Collection[str]]) -> Optional[Set[str]]:
+    """Normalize member names (e.g. './a/b.wav' -> 'a/b.wav') for matching."""
+    if members is None:
+        return None
+    return set(map(posixpath.normpath, members))
+
+
+def _select_zip_names(zfile: zipfile.ZipFile, members: Optional[Collection[str]]) -> List[str]:
+    """Select the names of all (or specified) members in the zip file, in central directory order."""
+    targets = _normalize(members)
+    if targets is None:
+        return zfile.namelist()
+    return [name for name in zfile.namelist() if posixpath.normpath(name) in targets]
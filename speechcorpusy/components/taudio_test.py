@@ -0,0 +1,23 @@
+"""Test archive extraction."""
+
+import zipfile
+from pathlib import Path
+
+from .taudio import extract_archive
+
+
+def test_extract_archive_zip_parallel(tmp_path: Path):
+    """Test parallel zip extraction yields the same contents as serial one."""
+
+    members = {f"corpus/spk{spk}/uttr{uttr}.wav": bytes([spk, uttr]) * 1000 for spk in range(4) for uttr in range(10)}
+    path_archive = tmp_path / "archive.zip"
+    with zipfile.ZipFile(path_archive, "w", zipfile.ZIP_DEFLATED) as zfile:
+        for name, data in members.items():
+            zfile.writestr(name, data)
+
+    files_serial = extract_archive(str(path_archive), str(tmp_path / "serial"))
+    files_parallel = extract_archive(str(path_archive), str(tmp_path / "parallel"), num_workers=3)
+
+    assert files_serial == files_parallel
+    for name, data in members.items():
+        assert (tmp_path / "parallel" / name).read_bytes() == data
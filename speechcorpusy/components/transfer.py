@@ -0,0 +1,369 @@
+"""Bounded-memory file transfer"""
+
+
+from __future__ import annotations
+import json
+import os
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import BinaryIO, Optional, Union
+
+import fsspec
+from fsspec.core import url_to_fs
+from fsspec.utils import get_protocol
+
+from speechcorpusy.components.checksum import Digest, Hasher, HashingReader
+
+try:
+    import fcntl
+except ImportError: # Windows
+    fcntl = None # type: ignore
+
+
+# Copy buffer size, large enough for throughput and small enough for memory
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
+# Multipart upload part size (S3 minimum is 5 MiB)
+DEFAULT_PART_SIZE = 64 * 1024 * 1024
+# Object stores with S3-style multipart upload
+_MULTIPART_PROTOCOLS = ("s3", "s3a")
+# Progress is checkpointed at every this size, which is the maximum re-transfer after interruption
+CHECKPOINT_SIZE = 64 * 1024 * 1024
+# `ioctl` request of Linux reflink (`_IOW(0x94, 9, int)`)
+_FICLONE = 0x40049409
+
+
+class TransferState:
+    """Partial-transfer file (`<file>.part`) and its sidecar state (`<file>.part.json`), for resumable transfer.
+
+    State holds the source validator (e.g. ETag, Last-Modified, fsspec `ukey`) and the transfer progress.
+    Progress is saved only after the data is flushed to the partial file, so saved progress never exceeds the data.
+    If the source is changed (validator mismatch), the transfer restarts from scratch.
+    """
+
+    def __init__(self, path_local: Path) -> None:
+        """
+        Args:
+            path_local: Final local file path.
+        """
+        self.path = path_local
+        self.part = Path(f"{path_local}.part")
+        self._sidecar = Path(f"{path_local}.part.json")
+
+    def saved_validator(self) -> Optional[str]:
+        """Source validator of the interrupted transfer, if it exists (e.g. for conditional range request)."""
+        if not self.part.exists() or not self._sidecar.exists():
+            return None
+        with open(self._sidecar, "r", encoding="utf-8") as file:
+            return json.load(file)["validator"]
+
+    def load(self, validator: Optional[str]) -> Optional[dict]:
+        """Load the progress of the interrupted transfer of the same source, if it exists."""
+        if validator is None or not self.part.exists() or not self._sidecar.exists():
+            return None
+        with open(self._sidecar, "r", encoding="utf-8") as file:
+            state = json.load(file)
+        return state["progress"] if state["validator"] == validator else None
+
+    def save(self, validator: Optional[str], progress: dict, partial_file: BinaryIO) -> None:
+        """Save the progress after syncing the partial file."""
+        if validator is None:
+            return
+        partial_file.flush()
+        os.fsync(partial_file.fileno())
+        tmp = self._sidecar.with_name(f"{self._sidecar.name}.tmp")
+        with open(tmp, "w", encoding="utf-8") as file:
+            json.dump({"validator": validator, "progress": progress}, file)
+        os.replace(tmp, self._sidecar)
+
+    def verify(self, hasher: Hasher) -> None:
+        """Verify the transferred bytes, discarding the partial transfer on mismatch."""
+        try:
+            hasher.verify()
+        except RuntimeError:
+            self.part.unlink(missing_ok=True)
+            self._sidecar.unlink(missing_ok=True)
+            raise
+
+    def complete(self) -> None:
+        """Place the partial file as the final file."""
+        os.replace(self.part, self.path)
+        self._sidecar.unlink(missing_ok=True)
+
+
+class Pipe:
+    """Bounded in-memory pipe, which connects a pushing writer (e.g. `zipfile`) to a pulling reader (e.g. `write_stream`) in another thread.
+
+    Writer blocks while the pipe is full, so memory usage is bounded.
+    """
+
+    def __init__(self, max_chunks: int = 16) -> None:
+        """
+        Args:
+            max_chunks: Maximum number of written-but-unread chunks.
+        """
+        self._queue: queue.Queue = queue.Queue(max_chunks)
+        self._buffer = bytearray()
+        self._eof = False
+        self._aborted = threading.Event()
+
+    def write(self, data: bytes) -> int:
+        """Write the bytes, blocking while the pipe is full."""
+        if data and not self._put(bytes(data)):
+            raise RuntimeError("Pipe reader is aborted.")
+        return len(data)
+
+    def flush(self) -> None:
+        """Nothing to flush (for file-like interface)."""
+
+    def close(self, failed: bool = False) -> None:
+        """Close the writer side. Reader gets EOF, or error if the writer failed (nothing is sent to the aborted reader)."""
+        self._put(RuntimeError("Pipe writer is failed.") if failed else None)
+
+    def _put(self, chunk: Union[bytes, Exception, None]) -> bool:
+        """Put the chunk, blocking while the pipe is full. Aborted reader never reads again, so it gives up (returns False)."""
+        while not self._aborted.is_set():
+            try:
+                self._queue.put(chunk, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def abort(self) -> None:
+        """Abort from the reader side, which makes the blocked writer fail."""
+        self._aborted.set()
+
+    def read(self, size: int = -1) -> bytes:
+        """Read the bytes, blocking until `size` bytes or EOF."""
+        while (size < 0 or len(self._buffer) < size) and not self._eof:
+            chunk = self._queue.get()
+            if chunk is None:
+                self._eof = True
+            elif isinstance(chunk, Exception):
+                raise chunk
+            else:
+                self._buffer.extend(chunk)
+        size = len(self._buffer) if size < 0 else size
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+
+def write_stream(source: BinaryIO, target_adress: str, num_workers: int = 4, digest: Digest = Digest()) -> int:
+    """Write the source stream to the adress with constant memory.
+
+    Object store target is uploaded with parallel multipart upload, others are written with buffered copy.
+
+    Args:
+        source: Opened binary source file object.
+        target_adress: Destination adress.
+        num_workers: The number of concurrent part uploads.
+        digest: Expected digest of the stream, verified on the flowing bytes. Target is removed on mismatch.
+    Returns:
+        The number of written bytes.
+    """
+    # Hash only if needed, because hashing costs CPU even on fast links.
+    reader = HashingReader(source, Hasher(digest, target_adress)) if digest else None
+    try:
+        if get_protocol(target_adress) in _MULTIPART_PROTOCOLS and num_workers > 1:
+            file_system, path = url_to_fs(target_adress)
+            total = upload_multipart(reader or source, file_system, path, num_workers=num_workers) # type: ignore
+        else:
+            with fsspec.open(target_adress, "wb") as target:
+                total = copy_stream(reader or source, target) # type: ignore
+        if reader is not None:
+            reader.verify()
+    except RuntimeError:
+        file_system, path = url_to_fs(target_adress)
+        if file_system.exists(path):
+            file_system.rm(path)
+        raise
+    return total
+
+
+def fetch_resumable(adress: str, path_local: Path, chunk_size: int = DEFAULT_CHUNK_SIZE, digest: Digest = Digest()) -> int:
+    """Fetch the file in the adress into the local path, resuming the interrupted fetch if exists.
+
+    Args:
+        adress: Source file adress.
+        path_local: Destination local path.
+        chunk_size: Read size.
+        digest: Expected digest of the file, verified on the flowing bytes before the placement.
+    Returns:
+        The number of fetched bytes in this call.
+    """
+    path_local.parent.mkdir(parents=True, exist_ok=True)
+    file_system, path = url_to_fs(adress)
+    validator = str(file_system.ukey(path))
+    state = TransferState(path_local)
+    progress = state.load(validator)
+    offset = progress["offset"] if progress is not None else 0
+    if offset > 0:
+        print(f"Resuming the interrupted transfer from {offset} bytes...")
+    hasher = Hasher(digest, adress)
+    if digest:
+        digest.check_size(file_system.size(path), adress)
+        # Already-transferred part is hashed locally.
+        if offset > 0:
+            hasher.update_file(state.part, offset)
+
+    total = 0
+    with fsspec.open(adress, "rb") as source, open(state.part, "r+b" if offset > 0 else "wb") as target:
+        # Data beyond the checkpoint may be broken, so it is discarded.
+        target.truncate(offset)
+        target.seek(offset)
+        source.seek(offset)
+        checkpoint = offset
+        while True:
+            chunk = source.read(chunk_size)
+            if not chunk:
+                break
+            if digest:
+                hasher.update(chunk)
+            target.write(chunk)
+            offset += len(chunk)
+            total += len(chunk)
+            if offset - checkpoint >= CHECKPOINT_SIZE:
+                state.save(validator, {"offset": offset}, target)
+                checkpoint = offset
+    if digest:
+        state.verify(hasher)
+    state.complete()
+    return total
+
+
+def copy_native(source_adress: str, target_adress: str) -> Optional[str]:
+    """Copy the file with the backend-native method, without pulling bytes through this process.
+
+    Local file is hardlinked, reflinked or copied in kernel (`copy_file_range`), remote file in the same filesystem is copied in the server.
+
+    Args:
+        source_adress: Source file adress.
+        target_adress: Destination adress.
+    Returns:
+        Used method name, or None if no native method is available (caller should stream).
+    """
+    fs_source, path_source = url_to_fs(source_adress)
+    fs_target, path_target = url_to_fs(target_adress)
+    if get_protocol(source_adress) == "file" and get_protocol(target_adress) == "file":
+        return _copy_local(Path(path_source), Path(path_target))
+    if fs_source == fs_target:
+        # e.g. S3 CopyObject
+        fs_target.copy(path_source, path_target)
+        return "server-side copy"
+    return None
+
+
+def _copy_local(path_source: Path, path_target: Path) -> Optional[str]:
+    """Copy the local file with hardlink, reflink or `copy_file_range`, in order of preference."""
+    path_target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path_target.with_name(f"{path_target.name}.tmp")
+    tmp.unlink(missing_ok=True)
+
+    # Hardlink - Archive is never modified in place, so sharing the inode is safe.
+    try:
+        os.link(path_source, tmp)
+        os.replace(tmp, path_target)
+        return "hardlink"
+    except OSError:
+        pass
+
+    method: Optional[str] = None
+    with open(path_source, "rb") as source, open(tmp, "wb") as target:
+        # Reflink - Copy-on-write clone (e.g. btrfs, XFS)
+        if fcntl is not None:
+            try:
+                fcntl.ioctl(target.fileno(), _FICLONE, source.fileno())
+                method = "reflink"
+            except OSError:
+                pass
+        # In-kernel copy
+        if method is None and hasattr(os, "copy_file_range"):
+            try:
+                remaining = os.fstat(source.fileno()).st_size
+                while remaining > 0:
+                    copied = os.copy_file_range(source.fileno(), target.fileno(), min(remaining, 1024**3))
+                    if copied == 0:
+                        break
+                    remaining -= copied
+                method = "copy_file_range" if remaining == 0 else None
+            except OSError:
+                pass
+    if method is None:
+        tmp.unlink()
+        return None
+    os.replace(tmp, path_target)
+    return method
+
+
+def copy_stream(source: BinaryIO, target: BinaryIO, chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """Copy the stream chunk by chunk, so memory usage is bounded by the chunk size.
+
+    Returns:
+        The number of copied bytes.
+    """
+    total = 0
+    while True:
+        chunk = source.read(chunk_size)
+        if not chunk:
+            return total
+        target.write(chunk)
+        total += len(chunk)
+
+
+def upload_multipart(
+    source: BinaryIO,
+    file_system: fsspec.AbstractFileSystem,
+    path: str,
+    part_size: int = DEFAULT_PART_SIZE,
+    num_workers: int = 4,
+) -> int:
+    """Upload the stream to S3-compatible object store with parallel multipart upload.
+
+    Memory usage is bounded by `(num_workers + 1) * part_size`, because the source read waits for a free upload slot.
+
+    Args:
+        source: Opened binary source file object.
+        file_system: `s3fs` filesystem.
+        path: Destination path in the filesystem.
+        part_size: Part size [byte].
+        num_workers: The number of concurrent part uploads.
+    Returns:
+        The number of uploaded bytes.
+    """
+
+    # Small file is just put.
+    chunk = source.read(part_size)
+    if len(chunk) < part_size:
+        file_system.pipe_file(path, chunk)
+        return len(chunk)
+
+    bucket, key, _ = file_system.split_path(path)
+    upload_id = file_system.call_s3("create_multipart_upload", Bucket=bucket, Key=key)["UploadId"]
+    slots = threading.BoundedSemaphore(num_workers)
+    futures: list[Future] = []
+    total = 0
+    try:
+        with ThreadPoolExecutor(max_workers=num_workers) as executor:
+            while chunk:
+                slots.acquire() # pylint: disable=consider-using-with
+                future = executor.submit(_upload_part, file_system, bucket, key, upload_id, len(futures) + 1, chunk)
+                future.add_done_callback(lambda _: slots.release())
+                futures.append(future)
+                total += len(chunk)
+                chunk = source.read(part_size)
+            parts = [future.result() for future in futures]
+        file_system.call_s3("complete_multipart_upload", Bucket=bucket, Key=key, UploadId=upload_id, MultipartUpload={"Parts": parts})
+    except BaseException:
+        file_system.call_s3("abort_multipart_upload", Bucket=bucket, Key=key, UploadId=upload_id)
+        raise
+    file_system.invalidate_cache(path)
+    return total
+
+
+def _upload_part(file_system: fsspec.AbstractFileSystem, bucket: str, key: str, upload_id: str, number: int, data: bytes) -> dict:
+    """Upload a part (thread-pool worker)."""
+    res = file_system.call_s3("upload_part", Bucket=bucket, Key=key, UploadId=upload_id, PartNumber=number, Body=data)
+    return {"PartNumber": number, "ETag": res["ETag"]}
@@ -0,0 +1,101 @@
+"""Test bounded-memory transfer."""
+
+import io
+from pathlib import Path
+
+import fsspec
+
+from .transfer import TransferState, copy_native, copy_stream, fetch_resumable, upload_multipart, write_stream
+
+
+def test_copy_stream():
+    """Test chunked copy with a chunk smaller than the data."""
+
+    data = bytes(range(256)) * 100
+    target = io.BytesIO()
+    assert copy_stream(io.BytesIO(data), target, chunk_size=1000) == len(data)
+    assert target.getvalue() == data
+
+
+def test_write_stream(tmp_path: Path):
+    """Test stream write into an adress."""
+
+    data = b"archive" * 1000
+    assert write_stream(io.BytesIO(data), str(tmp_path / "archive.zip")) == len(data)
+    assert (tmp_path / "archive.zip").read_bytes() == data
+
+
+def test_fetch_resumable(tmp_path: Path):
+    """Test resumption of the interrupted fetch, discarding the data beyond the checkpoint."""
+
+    data = bytes(range(256)) * 100
+    adress = "memory://mirror/test_fetch_resumable/archive.zip"
+    with fsspec.open(adress, "wb") as file:
+        file.write(data)
+
+    # Interrupted state: checkpointed at 10000 bytes, followed by unsaved garbage
+    path_local = tmp_path / "archive.zip"
+    state = TransferState(path_local)
+    with open(state.part, "wb") as part:
+        part.write(data[:10000] + b"garbage")
+        state.save(str(fsspec.filesystem("memory").ukey("/mirror/test_fetch_resumable/archive.zip")), {"offset": 10000}, part)
+
+    assert fetch_resumable(adress, path_local) == len(data) - 10000
+    assert path_local.read_bytes() == data
+    assert not state.part.exists()
+
+
+class _FakeS3:
+    """Minimal S3-style multipart API over memory."""
+
+    def __init__(self):
+        self.parts = {}
+        self.objects = {}
+
+    def split_path(self, path):
+        bucket, key = path.split("/", 1)
+        return bucket, key, None
+
+    def call_s3(self, method, **kwargs):
+        if method == "create_multipart_upload":
+            return {"UploadId": "id"}
+        if method == "upload_part":
+            self.parts[kwargs["PartNumber"]] = kwargs["Body"]
+            return {"ETag": f"etag{kwargs['PartNumber']}"}
+        if method == "complete_multipart_upload":
+            numbers = [part["PartNumber"] for part in kwargs["MultipartUpload"]["Parts"]]
+            self.objects[kwargs["Key"]] = b"".join(self.parts[number] for number in numbers)
+        return {}
+
+    def pipe_file(self, path, data):
+        self.objects[self.split_path(path)[1]] = data
+
+    def invalidate_cache(self, path):
+        pass
+
+
+def test_upload_multipart():
+    """Test that parallel multipart upload preserves the part order."""
+
+    data = bytes(range(256)) * 1000
+    file_system = _FakeS3()
+    assert upload_multipart(io.BytesIO(data), file_system, "bucket/archive.zip", part_size=10000, num_workers=4) == len(data)
+    assert file_system.objects["archive.zip"] == data
+    assert len(file_system.parts) == 26
+
+
+def test_copy_native(tmp_path: Path):
+    """Test native copy in local filesystem and in the same remote-like (memory) filesystem."""
+
+    data = b"archive" * 1000
+    (tmp_path / "source.zip").write_bytes(data)
+    assert copy_native(str(tmp_path / "source.zip"), str(tmp_path / "target" / "archive.zip")) is not None
+    assert (tmp_path / "target" / "archive.zip").read_bytes() == data
+
+    with fsspec.open("memory://mirror/test_copy_native/source.zip", "wb") as file:
+        file.write(data)
+    assert copy_native("memory://mirror/test_copy_native/source.zip", "memory://mirror/test_copy_native/archive.zip") == "server-side copy"
+    assert fsspec.filesystem("memory").cat("/mirror/test_copy_native/archive.zip") == data
+
+    # Different filesystems need streaming
+    assert copy_native("memory://mirror/test_copy_native/source.zip", str(tmp_path / "archive.zip")) is None
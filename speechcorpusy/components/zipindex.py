@@ -0,0 +1,159 @@
+"""Random access into zip archive without extraction"""
+
+
+from __future__ import annotations
+import io
+import json
+import os
+import struct
+import threading
+import zipfile
+import zlib
+from pathlib import Path
+from typing import BinaryIO, Optional
+
+import fsspec
+from fsspec.core import url_to_fs
+
+
+# Local file header: signature, version, flag, method, time, date, crc, sizes, name length, extra length
+_LOCAL_HEADER = struct.Struct("<4s5H3L2H")
+_LOCAL_SIGNATURE = b"PK\003\004"
+# Over-read for local name/extra, which enables single read per member in most cases
+_HEADER_SLACK = 1024
+
+
+class ZipIndex:
+    """Member index of a zip archive, which serves member bytes by seeking into the archive.
+
+    Index is built from the central directory once, and is persisted as JSON for later access.
+    Archive can be in any `fsspec` adress. For remote archive, central directory and members are read with range requests,
+    so only accessed members are transferred.
+    """
+
+    def __init__(self, adress_archive: str, members: dict[str, list[int]], stamp: str) -> None:
+        """
+        Args:
+            adress_archive: Adress of the archive file.
+            members: Member name to [header_offset, compress_size, file_size, compress_type, crc].
+            stamp: Archive identity when the index was built.
+        """
+        self._adress_archive = adress_archive
+        self._members = members
+        self._stamp = stamp
+        # Per-process archive handle (shared by threads under the lock)
+        self._handle: Optional[BinaryIO] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def build(cls, adress_archive: str) -> ZipIndex:
+        """Build the index from the central directory of the archive."""
+        with _open(adress_archive) as archive:
+            with zipfile.ZipFile(archive, "r") as zfile:
+                members = {
+                    info.filename: [info.header_offset, info.compress_size, info.file_size, info.compress_type, info.CRC]
+                    for info in zfile.infolist() if not info.is_dir()
+                }
+        return cls(adress_archive, members, _stamp_of(adress_archive))
+
+    @classmethod
+    def load_or_build(cls, adress_archive: str, path_index: Path) -> ZipIndex:
+        """Load the persisted index if it is up to date, else build and persist it."""
+        if path_index.exists():
+            with open(path_index, "r", encoding="utf-8") as file:
+                serialized = json.load(file)
+            if serialized["stamp"] == _stamp_of(adress_archive):
+                return cls(adress_archive, serialized["members"], serialized["stamp"])
+
+        print("Indexing the archive...")
+        index = cls.build(adress_archive)
+        index.save(path_index)
+        print("Indexed.")
+        return index
+
+    def save(self, path_index: Path) -> None:
+        """Persist the index as JSON."""
+        path_index.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path_index.with_name(f"{path_index.name}.tmp")
+        with open(tmp, "w", encoding="utf-8") as file:
+            json.dump({"stamp": self._stamp, "members": self._members}, file)
+        os.replace(tmp, path_index)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._members
+
+    def __getstate__(self) -> dict:
+        # Handle and lock are per-process, so they are not pickled (e.g. for DataLoader workers).
+        state = self.__dict__.copy()
+        state.update({"_handle": None, "_pid": None, "_lock": None})
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def names(self) -> list[str]:
+        """Get all member names."""
+        return list(self._members.keys())
+
+    def read(self, name: str) -> bytes:
+        """Read the member bytes.
+
+        Args:
+            name: Member name.
+        Returns:
+            Decompressed member bytes.
+        """
+
+        if name not in self._members:
+            raise KeyError(f"{name} is not in the archive {self._adress_archive}.")
+        header_offset, compress_size, file_size, compress_type, crc = self._members[name]
+
+        with self._lock:
+            archive = self._archive()
+
+            # Only stored/deflated members are served directly, others go through `zipfile`.
+            if compress_type not in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED):
+                with zipfile.ZipFile(archive, "r") as zfile:
+                    return zfile.read(name)
+
+            # Single read of header & data (local name/extra length can differ from the central directory ones)
+            archive.seek(header_offset)
+            chunk = archive.read(_LOCAL_HEADER.size + _HEADER_SLACK + compress_size)
+            header = _LOCAL_HEADER.unpack(chunk[:_LOCAL_HEADER.size])
+            if header[0] != _LOCAL_SIGNATURE:
+                raise RuntimeError(f"Broken local header of {name} in {self._adress_archive}.")
+            data_start = _LOCAL_HEADER.size + header[-2] + header[-1]
+            data = chunk[data_start : data_start + compress_size]
+            if len(data) < compress_size:
+                data += archive.read(compress_size - len(data))
+
+        if compress_type == zipfile.ZIP_DEFLATED:
+            data = zlib.decompress(data, -zlib.MAX_WBITS, file_size)
+        if zlib.crc32(data) != crc:
+            raise RuntimeError(f"CRC mismatch of {name} in {self._adress_archive}.")
+        return data
+
+    def open(self, name: str) -> BinaryIO:
+        """Open the member as a binary file object."""
+        return io.BytesIO(self.read(name))
+
+    def _archive(self) -> BinaryIO:
+        """Get the archive handle of this process."""
+        if self._pid != os.getpid():
+            self._handle = _open(self._adress_archive)
+            self._pid = os.getpid()
+        return self._handle
+
+
+def _open(adress_archive: str) -> BinaryIO:
+    """Open the archive for random access."""
+    # No read-ahead cache, so only requested ranges are transferred.
+    return fsspec.open(adress_archive, "rb", cache_type="none").open()
+
+
+def _stamp_of(adress_archive: str) -> str:
+    """Get the archive identity (e.g. size & mtime/ETag) for index staleness check."""
+    file_system, path = url_to_fs(adress_archive)
+    return file_system.ukey(path)
@@ -0,0 +1,43 @@
+"""Test zip random access."""
+
+import zipfile
+from pathlib import Path
+
+import fsspec
+
+from .zipindex import ZipIndex
+
+
+def test_zip_index(tmp_path: Path):
+    """Test member read through the persisted index, for stored and deflated members."""
+
+    members = {"a/stored.wav": b"stored" * 100, "a/deflated.wav": b"deflated" * 100}
+    path_archive = tmp_path / "archive.zip"
+    with zipfile.ZipFile(path_archive, "w") as zfile:
+        zfile.writestr("a/stored.wav", members["a/stored.wav"], zipfile.ZIP_STORED)
+        zfile.writestr("a/deflated.wav", members["a/deflated.wav"], zipfile.ZIP_DEFLATED)
+    path_index = tmp_path / "archive.zip.index.json"
+
+    index = ZipIndex.load_or_build(str(path_archive), path_index)
+    assert path_index.exists()
+    index_reloaded = ZipIndex.load_or_build(str(path_archive), path_index)
+
+    for name, data in members.items():
+        assert index.read(name) == data
+        with index_reloaded.open(name) as item:
+            assert item.read() == data
+
+
+def test_zip_index_remote(tmp_path: Path):
+    """Test member read from remote-like (memory filesystem) archive, without pull."""
+
+    adress_archive = "memory://mirror/test_zip_index_remote/archive.zip"
+    with fsspec.open(adress_archive, "wb") as archive:
+        with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as zfile:
+            zfile.writestr("a/uttr1.wav", b"uttr1" * 100)
+            zfile.writestr("a/uttr2.wav", b"uttr2" * 100)
+
+    index = ZipIndex.load_or_build(adress_archive, tmp_path / "archive.zip.index.json")
+
+    assert index.read("a/uttr2.wav") == b"uttr2" * 100
+    assert index.read("a/uttr1.wav") == b"uttr1" * 100
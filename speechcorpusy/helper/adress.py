@@ -1,10 +1,16 @@
 """Corpus adress handling helpers"""
 
 
+import os
 from pathlib import Path
 from typing import Optional, Tuple
 
 
+# Machine-wide contents cache configuration (shared by all projects on the machine)
+ENV_CONTENTS_ROOT = "SPEECHCORPUSY_CONTENTS_ROOT"
+ENV_CONTENTS_BUDGET = "SPEECHCORPUSY_CONTENTS_BUDGET"
+
+
 def get_adress(
     adress_archive_root: Optional[str],
     corpus_name: str,
@@ -29,8 +35,9 @@ def get_adress(
     #         archive/{archive_name}
     #         contents/{actual_data_here}
 
-    # Contents: Placed under default local directory
-    contents_root = local_root = "./tmp"
+    # Contents: Placed under the machine-wide contents root (default: local directory)
+    local_root = "./tmp"
+    contents_root = get_contents_root()
     # Archive: Placed under given adress or default local directory
     archive_root = adress_archive_root or local_root
 
@@ -46,3 +53,16 @@ def extract_name_and_variant(name_andor_variant: str, default_variant: str) -> t
     corpus_name = corpus_name_and_var[0]
     corpus_variant = default_variant if len(corpus_name_and_var) == 1 else corpus_name_and_var[1]
     return corpus_name, corpus_variant
+
+
+def get_contents_root() -> str:
+    """Get the contents root directory, configurable with `SPEECHCORPUSY_CONTENTS_ROOT` environment variable."""
+    return os.environ.get(ENV_CONTENTS_ROOT, "./tmp")
+
+
+def to_prefix(directory: Path) -> str:
+    """Get the string prefix of paths under the directory, for batched path formatting without per-item `Path` operations.
+
+    `f"{to_prefix(directory)}{name}"` is equal to `str(directory / name)` for a plain file name.
+    """
+    return f"{directory}{os.sep}"
@@ -1,21 +1,42 @@
 """Corpus contents handling helpers"""
 
 
-from typing import Callable
+from __future__ import annotations
+from typing import Callable, Iterable, Optional
 from pathlib import Path
+import os
+import zipfile
 
-from speechcorpusy.components.archive import try_to_acquire_archive_contents
+from fsspec.core import url_to_fs
+from fsspec.utils import get_protocol
+
+from speechcorpusy.interface import ItemId
+from speechcorpusy.components.archive import try_to_acquire_archive_contents, is_acquired
+from speechcorpusy.components.zipindex import ZipIndex
+from speechcorpusy.components.lock import FileLock
+from speechcorpusy.components.cache import ContentsCache, parse_size
+from speechcorpusy.components.checksum import Digest
+from speechcorpusy.components.metrics import measure
+from speechcorpusy.components.transfer import fetch_resumable
+from speechcorpusy.helper.adress import ENV_CONTENTS_BUDGET, get_contents_root
+from speechcorpusy.helper.shards import get_sharded_contents, load_manifest
 
 
 def get_contents(
     adress_archive_file: str,
     adress_contents_dir: Path,
     download_origin: bool,
-    forwarder: Callable[[], None]
+    forwarder: Callable[[], None],
+    stream: bool = True,
+    num_workers: int = 1,
+    members: Optional[list[str]] = None,
+    lock_timeout: Optional[float] = None,
+    digest: Digest = Digest(),
 ) -> None:
     """Get the archive and extract the contents from adress or origin.
 
     Try to get contents from the archive in the `fsspec`-compatible adress.
+    If the adress has the sharded mirror (see `save_shards`), only the shards which contain the members are acquired.
     If cannot get, forward original archive to the adress, then retry get process.
 
     Args:
@@ -23,23 +44,156 @@ def get_contents(
         adress_contents_dir: Contents directory, to which archive is extracted.
         download_origin: Whether to forward origin when the archive adress is empty.
         fallback_forward: Forward original archive to the adress.
+        stream: Whether to extract directly from the archive stream, without local archive copy.
+        num_workers: The number of processes for zip extraction.
+        members: Archive member names to be acquired (default: all members), see `to_members`.
+        lock_timeout: Maximum waiting time [sec] for other processes acquiring the same contents (None: wait forever).
+        digest: Expected archive digest, verified during the acquisition.
     """
 
     # Design Notes:
     #   Forwarding is corpus-specific parts, so it is separated as forwarder callback.
     #     e.g. 'S3 through fsspec' vs 'large Google Drive file'
+    #   Multiple processes (e.g. data-parallel ranks) can call this at the same time.
+    #   Lock serializes them, so one process acquires the contents and the others reuse it.
+    with lock_contents(adress_contents_dir, lock_timeout):
+        updated = not is_acquired(adress_contents_dir, members)
+        manifest = load_manifest(adress_archive_file) if updated else None
+        if manifest is not None:
+            get_sharded_contents(adress_archive_file, adress_contents_dir, manifest, members, stream)
+            track_contents(adress_contents_dir, updated)
+            return
+        acquired = try_to_acquire_archive_contents(adress_archive_file, adress_contents_dir, stream, num_workers, members, digest)
+        if not acquired:
+            if download_origin:
+                forwarder()
+                acquired_in_retry = try_to_acquire_archive_contents(
+                    adress_archive_file,
+                    adress_contents_dir,
+                    stream,
+                    num_workers,
+                    members,
+                    digest,
+                )
+                if not acquired_in_retry:
+                    raise RuntimeError("Failed to acquire contents from the adress & origin.")
+            else:
+                m_1 = f"Specified corpus archive (`{adress_archive_file}`) cannot be acquired."
+                m_2 = "Enable `download`"
+                raise RuntimeError(f"{m_1} {m_2}")
+        track_contents(adress_contents_dir, updated)
+
+
+def to_members(
+    items: Optional[Iterable[ItemId]],
+    get_item_path: Callable[[ItemId], Path],
+    adress_contents_dir: Path,
+) -> Optional[list[str]]:
+    """Convert items into the archive member names, for selective contents acquisition.
+
+    Args:
+        items: Items whose contents are needed (`None` means all items).
+        get_item_path: Item path getter of the corpus handler.
+        adress_contents_dir: Contents directory, to which archive is extracted.
+    Returns:
+        Archive member names (`None` means all members).
+    """
+
+    # Design Notes:
+    #   Archive is extracted under the contents directory, so relative item path is the member name.
+    if items is None:
+        return None
+    return [get_item_path(item).relative_to(adress_contents_dir).as_posix() for item in items]
+
+
+def get_archive(
+    adress_archive_file: str,
+    adress_contents_dir: Path,
+    download_origin: bool,
+    forwarder: Callable[[], None],
+    pull: bool = True,
+    digest: Digest = Digest(),
+) -> ZipIndex:
+    """Get the zip archive as-is (without extraction) from adress or origin, for direct item access.
+
+    Args:
+        adress_archive_file: Archive file adress.
+        adress_contents_dir: Contents directory, beside which the local archive and its index are placed.
+        download_origin: Whether to forward origin when the archive adress is empty.
+        forwarder: Forward original archive to the adress.
+        pull: Whether to pull the remote archive into local. If False, items are read from the remote archive with range requests.
+        digest: Expected archive digest. Size is always checked, hash is verified during the pull.
+    Returns:
+        Member index of the archive.
+    """
+
+    # Design Notes:
+    #   Extraction of tens of thousands of small files is slow, especially on network filesystems.
+    #   Zip has the central directory, so items can be read by seeking into the archive without extraction.
+    #   Seek is also possible in remote archive (range request), so even the archive pull is optional.
+
+    with lock_contents(adress_contents_dir):
+        file_system, path_archive = url_to_fs(adress_archive_file)
+        if not file_system.exists(path_archive):
+            if download_origin:
+                forwarder()
+            else:
+                m_1 = f"Specified corpus archive (`{adress_archive_file}`) cannot be acquired."
+                m_2 = "Enable `download`"
+                raise RuntimeError(f"{m_1} {m_2}")
+        digest.check_size(file_system.size(path_archive), adress_archive_file)
 
-    acquired = try_to_acquire_archive_contents(adress_archive_file, adress_contents_dir)
-    if not acquired:
-        if download_origin:
-            forwarder()
-            acquired_in_retry = try_to_acquire_archive_contents(
-                adress_archive_file,
-                adress_contents_dir
-            )
-            if not acquired_in_retry:
-                raise RuntimeError("Failed to acquire contents from the adress & origin.")
+        # Remote archive is pulled into the local archive directory (`corpuses/{corpus_name}/{variant_type}/archive/`)
+        dir_local_archive = adress_contents_dir.parent / "archive"
+        updated = False
+        if get_protocol(adress_archive_file) == "file" or not pull:
+            adress_access = adress_archive_file
         else:
-            m_1 = f"Specified corpus archive (`{adress_archive_file}`) cannot be acquired."
-            m_2 = "Enable `download`"
-            raise RuntimeError(f"{m_1} {m_2}")
+            adress_access = str(dir_local_archive / Path(path_archive).name)
+            if not os.path.exists(adress_access):
+                print("Pulling the archive...")
+                with measure("read", adress_archive_file) as read:
+                    read.nbytes = fetch_resumable(adress_archive_file, Path(adress_access), digest=digest)
+                print("Pulled.")
+                updated = True
+
+        try:
+            index = ZipIndex.load_or_build(adress_access, dir_local_archive / f"{Path(path_archive).name}.index.json")
+        except zipfile.BadZipFile as err:
+            raise RuntimeError(f"Direct archive access supports only zip archive, but {adress_archive_file} is not.") from err
+        track_contents(adress_contents_dir, updated)
+        return index
+
+
+def lock_contents(adress_contents_dir: Path, timeout: Optional[float] = None) -> FileLock:
+    """Get the cross-process lock of the contents directory.
+
+    Use it as context manager around handler-specific contents processing (e.g. nested archive extraction).
+
+    Args:
+        adress_contents_dir: Contents directory.
+        timeout: Maximum waiting time [sec] (None: wait forever).
+    """
+    return FileLock(adress_contents_dir.parent / f"{adress_contents_dir.name}.lock", timeout)
+
+
+def track_contents(adress_contents_dir: Path, updated: bool) -> None:
+    """Record the contents access in the shared contents cache, then evict LRU contents over the budget.
+
+    Budget [byte] is configured with `SPEECHCORPUSY_CONTENTS_BUDGET` environment variable (e.g. '500G', default: unlimited).
+    Contents outside the contents root (e.g. explicitly specified directory) are not tracked.
+
+    Args:
+        adress_contents_dir: Contents directory.
+        updated: Whether the contents are updated (size is re-measured).
+    """
+    root = Path(get_contents_root()).resolve()
+    entry_dir = adress_contents_dir.parent.resolve()
+    if root not in entry_dir.parents:
+        return
+    budget = os.environ.get(ENV_CONTENTS_BUDGET)
+    try:
+        budget_bytes = parse_size(budget) if budget else None
+    except ValueError as err:
+        raise ValueError(f"Invalid `{ENV_CONTENTS_BUDGET}`: {err}") from err
+    ContentsCache(root, budget_bytes).access(entry_dir, updated)
@@ -2,55 +2,126 @@
 
 
 from pathlib import Path
-from tempfile import NamedTemporaryFile
+from tempfile import gettempdir
 
 import fsspec
+from fsspec.core import url_to_fs
+from fsspec.utils import get_protocol
 
-from speechcorpusy.components.download import download_gdrive_large_contents
+from speechcorpusy.components.download import download_gdrive_large_contents, download_ranged, open_gdrive_contents
+from speechcorpusy.components.metrics import measure
+from speechcorpusy.components.transfer import copy_native, fetch_resumable, write_stream
+from speechcorpusy.components.archive import hash_args
+from speechcorpusy.components.checksum import Digest
 
 
-def forward(source_adress: str, target_adress: str) -> None:
-    """Forward the file at the source adress to the target adress with cache.
+def forward(source_adress: str, target_adress: str, num_workers: int = 4, num_connections: int = 8, digest: Digest = Digest()) -> None:
+    """Forward the file at the source adress to the target adress with constant memory.
 
     Forward any_adress -> any_adress through fsspec (e.g. local, S3, GCP).
+    HTTP(S) origin is downloaded with concurrent range requests.
+    Transfer into local file (target or staging) is resumed after interruption.
     Args:
         source_adress: The Forward origin adress.
         target_adrsss: Forward distination adress.
+        num_workers: The number of concurrent part uploads for object store target.
+        num_connections: The number of concurrent range requests for HTTP(S) origin.
+        digest: Expected digest of the file, verified during the transfer.
     """
-    adress_cached_source = f"simplecache::{source_adress}"
-    adress_cached_target = f"simplecache::{target_adress}"
 
-    print("Forward: Reading from the adress...")
-    with fsspec.open(adress_cached_source, "rb") as source:
-        file = source.read()
-    print("Forward: Read")
-
-    print("Forward: Writing to the adress...")
-    with fsspec.open(adress_cached_target, "wb") as target:
-        target.write(file)
-    print("Forward: Written")
-
-
-def forward_from_gdrive(id_gdrive_contents: str, target_adress: str, size_gb: float) -> None:
+    # Design Notes:
+    #   Origin archive can be larger than memory (e.g. VCTK ~11GB), so it is streamed chunk by chunk, never held whole.
+    #   Remote-to-remote forward is streamed without local disk, so it is not resumable.
+    #   In the same filesystem, native copy (server-side copy, hardlink, reflink) is far faster than streaming.
+    #   There bytes never flow through this process, so it is used only when hash verification is not required.
+    if get_protocol(source_adress) in ("http", "https"):
+        _forward_http(source_adress, target_adress, num_workers, num_connections, digest)
+        return
+
+    with measure("forward", source_adress) as forwarding:
+        if digest.sha256 is None:
+            file_system, path_source = url_to_fs(source_adress)
+            size = file_system.size(path_source)
+            digest.check_size(size, source_adress)
+            method = copy_native(source_adress, target_adress)
+            if method is not None:
+                forwarding.nbytes = size
+                print(f"Forward: Copied with {method}")
+                return
+        if get_protocol(target_adress) == "file":
+            print("Forward: Fetching from the adress...")
+            forwarding.nbytes = fetch_resumable(source_adress, Path(url_to_fs(target_adress)[1]), digest=digest)
+        else:
+            print("Forward: Streaming from the adress to the adress...")
+            with fsspec.open(source_adress, "rb") as source:
+                forwarding.nbytes = write_stream(source, target_adress, num_workers, digest)
+        print("Forward: Written")
+
+
+def _forward_http(source_url: str, target_adress: str, num_workers: int, num_connections: int, digest: Digest) -> None:
+    """Forward the HTTP(S) origin file, downloaded with concurrent range requests."""
+
+    print("Forward: Downloading from the origin...")
+    with measure("download", source_url) as download:
+        download.nbytes = download_ranged(source_url, _download_path(target_adress), num_connections, digest)
+    _upload_staging(source_url, target_adress, num_workers)
+
+
+def forward_from_gdrive(id_gdrive_contents: str, target_adress: str, size_gb: float, digest: Digest = Digest()) -> None:
     """Forward a file in Google Drive to specified adress.
 
     Forward GoogleDrive -> any_adress through fsspec (e.g. local, S3, GCP).
+    Local target is downloaded into with resumption, remote target is directly streamed into with constant memory.
 
     Args:
         id_gdrive_contents: Google Drive contents ID
         target_adress: forward distination adress
-        size_gb: File size [GB]
+        size_gb: Estimated file size [GB], used only for progress when Google Drive does not tell the size
+        digest: Expected digest of the file, verified during the transfer.
+    """
+
+    adress_origin = f"gdrive://{id_gdrive_contents}"
+    if get_protocol(target_adress) == "file":
+        path_target = _download_path(target_adress)
+        print("Forward: Downloading from Google Drive...")
+        with measure("download", adress_origin) as download:
+            download_gdrive_large_contents(id_gdrive_contents, path_target, size_gb, digest)
+            download.nbytes = path_target.stat().st_size
+        print("Forward: Written")
+        return
+
+    print("Forward: Streaming from Google Drive to the adress...")
+    with measure("forward", adress_origin) as forwarding:
+        res, _ = open_gdrive_contents(id_gdrive_contents)
+        with res:
+            # Raw stream with transfer-decoding, which is read in large chunks
+            res.raw.decode_content = True
+            forwarding.nbytes = write_stream(res.raw, target_adress, digest=digest)
+    print("Forward: Written")
+
+
+def _download_path(target_adress: str) -> Path:
+    """Local download path for the target - local target itself, or the staging for remote target.
+
+    Staging persists over processes (not a temporary file), so interrupted download can be resumed.
     """
+    if get_protocol(target_adress) == "file":
+        return Path(url_to_fs(target_adress)[1])
+    return Path(gettempdir()) / "speechcorpusy" / "forward" / hash_args(target_adress)
 
-    adress_cache_target = f"simplecache::{target_adress}"
-    # TempFile for garbage-less forwarding
-    with NamedTemporaryFile("w+b") as tmp:
-        download_gdrive_large_contents(id_gdrive_contents, Path(tmp.name), size_gb)
-        tmp.seek(0)
-        print("Forward: Writing to the adress...")
-        with fsspec.open(adress_cache_target, "wb") as archive:
-            archive.write(tmp.read())
-        print("Forward: Written.")
+
+def _upload_staging(source_adress: str, target_adress: str, num_workers: int) -> None:
+    """Upload the staging file to the remote target, then remove the staging (nothing to do for local target)."""
+    if get_protocol(target_adress) == "file":
+        print("Forward: Written")
+        return
+    path_staging = _download_path(target_adress)
+    print("Forward: Writing to the adress...")
+    with measure("forward", source_adress) as forwarding:
+        with open(path_staging, "rb") as source:
+            forwarding.nbytes = write_stream(source, target_adress, num_workers)
+    path_staging.unlink()
+    print("Forward: Written")
 
 
 if __name__ == "__main__":
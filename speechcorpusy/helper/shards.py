@@ -0,0 +1,137 @@
+"""Sharded mirror helpers"""
+
+
+from __future__ import annotations
+from typing import Optional
+from pathlib import Path
+import json
+
+import fsspec
+from fsspec.core import url_to_fs
+
+from speechcorpusy.interface import AbstractCorpus
+from speechcorpusy.components.archive import acquire_shards, save_archive
+from speechcorpusy.components.checksum import Digest
+
+
+# Sharded mirror layout:
+# ```
+# {archive}.shards/
+#     manifest.json
+#     {shard_name}.zip
+#     ...
+# ```
+# manifest.json: {"version": 1, "shards": {shard_name: {"archive": file_name, "members": [...], "sha256": str, "size": int}}}
+
+# Files which belong to no item (e.g. transcripts, readme)
+COMMON_SHARD = "_common"
+
+
+def shards_adress(adress_archive_file: str) -> str:
+    """Adress of the sharded mirror directory of the archive."""
+    return f"{adress_archive_file}.shards"
+
+
+def load_manifest(adress_archive_file: str) -> Optional[dict]:
+    """Load the shard manifest of the archive, if the sharded mirror exists.
+
+    Args:
+        adress_archive_file: Archive file adress.
+    Returns:
+        Shard manifest, or None if the mirror is not sharded.
+    """
+    adress_manifest = f"{shards_adress(adress_archive_file)}/manifest.json"
+    file_system, path_manifest = url_to_fs(adress_manifest)
+    if not file_system.exists(path_manifest):
+        return None
+    with fsspec.open(adress_manifest, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def get_sharded_contents(
+    adress_archive_file: str,
+    adress_contents_dir: Path,
+    manifest: dict,
+    members: Optional[list[str]] = None,
+    stream: bool = True,
+) -> None:
+    """Pull and extract only the shards which contain the needed members, in parallel.
+
+    Args:
+        adress_archive_file: Archive file adress, beside which the sharded mirror is placed.
+        adress_contents_dir: Contents directory, into which shards are extracted.
+        manifest: Shard manifest.
+        members: Archive member names to be acquired (default: all members).
+        stream: Whether to extract directly from the archive stream, without local archive copy.
+    """
+    root = shards_adress(adress_archive_file)
+    shards = manifest["shards"]
+
+    # Member -> shard
+    if members is None:
+        needed = {name: shard["members"] for name, shard in shards.items()}
+    else:
+        shard_of = {member: name for name, shard in shards.items() for member in shard["members"]}
+        needed = {}
+        for member in members:
+            if member not in shard_of:
+                raise RuntimeError(f"`{member}` is not in the sharded archive ({root}).")
+            needed.setdefault(shard_of[member], []).append(member)
+
+    print(f"Acquiring {len(needed)}/{len(shards)} shards...")
+    acquire_shards(
+        {
+            name: (f"{root}/{shards[name]['archive']}", shard_members, Digest(shards[name].get("sha256"), shards[name].get("size")))
+            for name, shard_members in needed.items()
+        },
+        adress_contents_dir,
+        full=members is None,
+        stream=stream,
+    )
+    print("Acquired.")
+
+
+def save_shards(corpus: AbstractCorpus, attribute: str = "speaker", num_workers: int = 8) -> None:
+    """Repack the corpus contents into the sharded mirror, one archive per item attribute (e.g. speaker, subtype).
+
+    Once the sharded mirror exists beside the archive, `get_contents` acquires only the shards which contain the needed items.
+    Files which belong to no item are packed into the common shard, which is acquired with the full contents.
+
+    Args:
+        corpus: Preset corpus handler, whose contents are acquired first.
+        attribute: ItemId attribute by which items are sharded.
+        num_workers: The number of concurrent member reads and part uploads.
+    """
+
+    # Design Notes:
+    #   The manifest is written last, so half-built shards are never used.
+    #   Nested archive (e.g. VCTK's inner zip) is repacked as its items, so it is not included.
+    # pylint: disable=protected-access
+    corpus.get_contents()
+    path_contents: Path = corpus._path_contents # type: ignore
+    root = shards_adress(corpus._adress_archive) # type: ignore
+
+    groups: dict[str, list[str]] = {}
+    for value, items in corpus.get_identities_by(attribute).items():
+        members = [corpus.get_item_path(item).relative_to(path_contents).as_posix() for item in items]
+        members = [member for member in members if (path_contents / member).is_file()]
+        if members:
+            groups[value] = members
+    assigned = {member for group in groups.values() for member in group}
+    excluded = {getattr(corpus, "_inner_archive_name", None)}
+    common = sorted(
+        member
+        for member in (path.relative_to(path_contents).as_posix() for path in path_contents.rglob("*") if path.is_file())
+        if member not in assigned and member not in excluded
+    )
+    if common:
+        groups[COMMON_SHARD] = common
+
+    shards = {}
+    for name, members in groups.items():
+        print(f"Sharding `{name}` ({len(members)} files)...")
+        digest = save_archive(path_contents, f"{root}/{name}.zip", num_workers, members)
+        shards[name] = {"archive": f"{name}.zip", "members": members, "sha256": digest.sha256, "size": digest.size}
+    with fsspec.open(f"{root}/manifest.json", "w", encoding="utf-8") as file:
+        json.dump({"version": 1, "shards": shards}, file)
+    print(f"Sharded into {len(shards)} archives.")
@@ -1,11 +1,23 @@
 """speechcorpusy Interface"""
 
 from __future__ import annotations
-from typing import Optional, List
+import sys
+from typing import TYPE_CHECKING, Callable, Dict, List, Mapping, Optional, Iterable, Iterator, BinaryIO, Tuple, TypeVar, Union
 from abc import ABC, abstractmethod
+from functools import wraps
+from itertools import chain
+from operator import attrgetter
+from types import MappingProxyType
 from pathlib import Path
 from dataclasses import dataclass
 
+from speechcorpusy.helper.adress import extract_name_and_variant
+from speechcorpusy.components.checksum import Digest
+
+if TYPE_CHECKING:
+    import numpy as np
+    from speechcorpusy.components.itemtable import ItemTable
+
 
 @dataclass(frozen=True)
 class ItemId:
@@ -23,6 +35,44 @@ class ItemId:
     name:    str
     # Design Note: Audio Length
     #   Why not audio length? -> 'Effective' length differ case by case.
+    # Design Note: Compactness
+    #   ItemId is used as dict/set key for millions of lookups, and corpus has 100k+ items.
+    #   Slots remove per-instance `__dict__`, and the hash is computed once.
+    #   corpus/subtype/speaker are shared by many items, so they are interned (one string object per value, identity-fast equality).
+    __slots__ = ("corpus", "subtype", "speaker", "name", "_hash")
+
+    def __post_init__(self) -> None:
+        # Frozen, so attributes are set through `object`
+        object.__setattr__(self, "corpus", sys.intern(self.corpus))
+        object.__setattr__(self, "subtype", sys.intern(self.subtype))
+        object.__setattr__(self, "speaker", sys.intern(self.speaker))
+        object.__setattr__(self, "_hash", hash((self.corpus, self.subtype, self.speaker, self.name)))
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __eq__(self, other: object) -> bool:
+        if self is other:
+            return True
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return (
+            self._hash == other._hash # type: ignore
+            and self.name == other.name # type: ignore
+            and self.speaker == other.speaker # type: ignore
+            and self.subtype == other.subtype # type: ignore
+            and self.corpus == other.corpus # type: ignore
+        )
+
+    def __reduce__(self) -> tuple:
+        # Re-made through `__init__`, so strings are re-interned and hash is re-computed in the loading process (str hash is per-process).
+        return (self.__class__, (self.corpus, self.subtype, self.speaker, self.name))
+
+    def __setstate__(self, state: dict) -> None:
+        # Pickles of the former plain dataclass (e.g. cached datasets) carry `__dict__` state, which slots cannot take as-is.
+        for field in ("corpus", "subtype", "speaker", "name"):
+            object.__setattr__(self, field, state[field])
+        self.__post_init__()
 
 
 @dataclass
@@ -33,6 +83,11 @@ class ConfCorpus:
         name: Corpus name
         root: Adress of the directory under which the corpus archive is found or downloaded
         download: Whether to download original corpus if it is not found in `root`
+        num_workers: The number of processes for archive extraction
+        extract: Whether to extract the archive into contents. If False, supported (zip-based) presets
+                 keep the archive as-is and serve items by `open_item` through seeking into the archive.
+        pull_archive: Whether to pull the remote archive into local when `extract==False`.
+                      If False, items are fetched on demand from the remote archive with range requests.
     """
 
     # Design Notes:
@@ -42,11 +97,57 @@ class ConfCorpus:
     name: str = ""
     root: Optional[str] = None
     download: bool = False
+    num_workers: int = 1
+    extract: bool = True
+    pull_archive: bool = True
+
+_C = TypeVar("_C", bound="AbstractCorpus")
+_T = TypeVar("_T")
+# Instance attribute name of the memoized identities
+_IDENTITIES_MEMO = "_identities_memo"
+# Instance attribute name of the memoized group-by indices
+_GROUPS_MEMO = "_groups_memo"
+# Instance attribute name of the memoized merges in MergedCorpus
+_MERGED_MEMO = "_merged_memo"
+# Groupable ItemId attributes
+_ATTRIBUTES = ("corpus", "subtype", "speaker", "name")
+# Identity getters, either of which should be implemented by handler
+_IDENTITY_METHODS = ("get_identities", "iter_identities")
+
+
+def cached_identities(get_identities: Callable[[_C], Tuple[ItemId, ...]]) -> Callable[[_C], Tuple[ItemId, ...]]:
+    """Memoize the handler's `get_identities` per instance.
+
+    Identities are computed in the first call, then the same immutable tuple is returned.
+    The memo is cleared by `AbstractCorpus.invalidate_identities` (e.g. when AdHoc contents are changed).
+    """
+    @wraps(get_identities)
+    def memoized(self: _C) -> Tuple[ItemId, ...]:
+        identities = self.__dict__.get(_IDENTITIES_MEMO)
+        if identities is None:
+            identities = tuple(get_identities(self))
+            self.__dict__[_IDENTITIES_MEMO] = identities
+        return identities
+    return memoized
+
 
 class AbstractCorpus(ABC):
     """Interface of corpus archive/contents handler.
     """
 
+    # Expected archive digest, overridden by the handler which knows it (default: unknown, so not checked)
+    _archive_digest: Digest = Digest()
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        # `get_identities` and `iter_identities` are derived from each other, so implementing either of them is enough.
+        # The other one gets its default here (before abstract methods are collected), and handler with neither stays abstract.
+        implemented = {name for name in _IDENTITY_METHODS if not getattr(getattr(cls, name), "__isabstractmethod__", False)}
+        if implemented == {"iter_identities"}:
+            cls.get_identities = _get_identities_from_iter # type: ignore
+        elif implemented == {"get_identities"}:
+            cls.iter_identities = _iter_identities_from_get # type: ignore
+
     @abstractmethod
     def __init__(self, conf: ConfCorpus) -> None:
         """Initialization without contents download/extraction.
@@ -76,8 +177,11 @@ class AbstractCorpus(ABC):
         return [self]
 
     @abstractmethod
-    def get_contents(self) -> None:
+    def get_contents(self, items: Optional[Iterable[ItemId]] = None) -> None:
         """Get corpus contents into local.
+
+        Args:
+            items: Items whose contents are acquired (default: all items). e.g. `filter(lambda i: i.subtype == "mic2", ids)`
         """
 
         # Helpers:
@@ -92,13 +196,28 @@ class AbstractCorpus(ABC):
         #         `forward_from_GDrive` is a function in `speechcorpusy.helper.forward` module.
         #         This helper forward an big (>1GB) archive file
         #         in Google Drive to any your private adress.
+        #    `to_members`:
+        #         `to_members` is a function in `speechcorpusy.helper.contents` module.
+        #         This helper convert `items` into archive members for selective acquisition.
 
     @abstractmethod
-    def get_identities(self) -> List[ItemId]:
+    def get_identities(self) -> Tuple[ItemId, ...]:
         """Get corpus item identities.
 
         Returns:
-            Full item identity list.
+            Full item identities, which is immutable and shared over calls.
+        """
+
+        # Implementation Notes:
+        #   Implement `iter_identities` (generator) or this method (decorated with `cached_identities`).
+        #   If only `iter_identities` is implemented, identities are collected from it, and memoized.
+
+    @abstractmethod
+    def iter_identities(self) -> Iterator[ItemId]:
+        """Iterate corpus item identities lazily, which enables streaming consumers to start immediately with constant memory.
+
+        Returns:
+            Iterator of full item identities, in `get_identities` order.
         """
 
         # Design Notes:
@@ -114,6 +233,46 @@ class AbstractCorpus(ABC):
         #   Corpus handler can be used without corpus itself.
         #   (e.g. Get item identities for a preprocessed dataset).
         #   Hard-coded identity list enable contents-independent identity acquisition.
+        #   Identities are requested repeatedly (e.g. per epoch, per split, per worker),
+        #   so `get_identities` is memoized, which computes them once per instance.
+        #   If only `get_identities` is implemented, identities are iterated from it.
+
+    def get_item_table(self) -> ItemTable:
+        """Get corpus item identities as a columnar table, which needs numpy.
+
+        Returns:
+            Full item identities, which support vectorized filter/group/slice.
+        """
+        from speechcorpusy.components.itemtable import ItemTable # pylint: disable=import-outside-toplevel,redefined-outer-name
+        # Identities are streamed, so ItemId objects are not kept.
+        return ItemTable.from_items(self.iter_identities())
+
+    def invalidate_identities(self) -> None:
+        """Clear the memoized identities, so that the next `get_identities` call re-computes them (e.g. after AdHoc contents change)."""
+        self.__dict__.pop(_IDENTITIES_MEMO, None)
+        self.__dict__.pop(_GROUPS_MEMO, None)
+
+    def get_identities_by(self, attribute: str) -> Mapping[str, Tuple[ItemId, ...]]:
+        """Get corpus item identities, grouped by the attribute.
+
+        The index is built in a single pass and memoized, and is cleared with `invalidate_identities`.
+        Args:
+            attribute: ItemId attribute, `corpus` | `subtype` | `speaker` | `name`
+        Returns:
+            Attribute value -> item identities (in `get_identities` order), ordered by the value. Immutable.
+        """
+
+        memo: Dict[str, Mapping[str, Tuple[ItemId, ...]]] = self.__dict__.setdefault(_GROUPS_MEMO, {})
+        groups = memo.get(attribute)
+        if groups is None:
+            _validate_attribute(attribute)
+            value_of = attrgetter(attribute)
+            grouped: Dict[str, List[ItemId]] = {}
+            for item in self.get_identities():
+                grouped.setdefault(value_of(item), []).append(item)
+            groups = MappingProxyType({value: tuple(grouped[value]) for value in sorted(grouped)})
+            memo[attribute] = groups
+        return groups
 
     def get_identities_per_speaker(self) -> list[list[ItemId]]:
         """Get corpus item identities, grouped by `.speaker` attribute.
@@ -122,11 +281,7 @@ class AbstractCorpus(ABC):
             - Utterance identities, grouped by speaker. e.g. [[spk0_uttr0, spk0_uttr1, ...], [spk2_uttr0, spk2_uttr1, ...]]
         """
 
-        utterances = self.get_identities()
-        speakers = sorted(list(set(map(lambda utter_id: utter_id.speaker, utterances))))
-        utters_per_spks = [list(filter(lambda utter_id: utter_id.speaker == spk, utterances)) for spk in speakers] # pylint: disable = cell-var-from-loop
-
-        return utters_per_spks
+        return [list(utterances) for utterances in self.get_identities_by("speaker").values()]
 
     @abstractmethod
     def get_item_path(self, item_id: ItemId) -> Path:
@@ -142,6 +297,48 @@ class AbstractCorpus(ABC):
         #   This is corpus-specific part, so this is your responsibility.
         #   In most cases, simply making Path based on ID argument is enough.
 
+    def get_item_paths(self, items: Iterable[ItemId], as_str: bool = True, as_array: bool = False) -> Union[List[str], List[Path], np.ndarray]:
+        """Get paths of the items at once, which is faster than `get_item_path` per item.
+
+        Args:
+            items: Identities of target items.
+            as_str: Whether to return paths as `str` (else `Path`).
+            as_array: Whether to return paths as NumPy string array, which needs numpy.
+        Returns:
+            Paths of the items, in the order of `items`.
+        """
+
+        paths = self._format_item_paths(items)
+        if as_array:
+            import numpy # pylint: disable=import-outside-toplevel
+            return numpy.array(paths, dtype=str)
+        return paths if as_str else [Path(path) for path in paths]
+
+    def _format_item_paths(self, items: Iterable[ItemId]) -> List[str]:
+        """Format paths of the items as `str`.
+
+        Implementation Notes:
+            By default, paths come from `get_item_path`.
+            Override this with string formatting on prefixes precomputed per call (see `speechcorpusy.helper.adress.to_prefix`),
+            so that no `Path` is made per item. Results should be equal to `str(self.get_item_path(item))`.
+        """
+        return [str(self.get_item_path(item)) for item in items]
+
+    def open_item(self, item_id: ItemId) -> BinaryIO:
+        """Open the item as a binary file object.
+
+        Args:
+            item_id: Identity of target item.
+        Returns:
+            Binary file object of the item, which should be closed by caller.
+        """
+
+        # Implementation Notes:
+        #   By default, the extracted item is opened.
+        #   If handler serves items directly from the archive (`conf.extract==False`), override this.
+        #   `ZipIndex` in `speechcorpusy.components.zipindex` module serves zip member bytes.
+        return open(self.get_item_path(item_id), "rb") # pylint: disable=consider-using-with
+
 
 class MergedCorpus(AbstractCorpus):
     """A corpus which is composed of multiple corpuses.
@@ -152,24 +349,92 @@ class MergedCorpus(AbstractCorpus):
         """
         self._corpuses = courpuses
 
+        # Routing - ItemId.corpus -> corpus, built once for constant-time item routing.
+        #   Instances of the same (name, variant) serve the same items, so the first instance serves them.
+        #   Items of different variants of the same corpus cannot be distinguished by ItemId, so they are not routed.
+        self._routes: Dict[str, AbstractCorpus] = {}
+        self._ambiguous: Dict[str, List[str]] = {}
+        variants: Dict[str, str] = {}
+        for corpus in self._corpuses:
+            name, variant = corpus.__class__.__name__, _variant_of(corpus)
+            if name not in self._routes:
+                self._routes[name], variants[name] = corpus, variant
+            elif variant != variants[name]:
+                self._ambiguous.setdefault(name, [variants[name]]).append(variant)
+
     def get_corpuses(self) -> list[AbstractCorpus]:
         """Get corpuses wrapped in this instance."""
         return self._corpuses
 
-    def get_contents(self) -> None:
+    def get_contents(self, items: Optional[Iterable[ItemId]] = None) -> None:
         """Get corpus contents into local.
+
+        Args:
+            items: Items whose contents are acquired (default: all items).
+        """
+        if items is None:
+            for corpus in self._corpuses:
+                corpus.get_contents()
+        else:
+            items_per_corpus: Dict[str, List[ItemId]] = {}
+            for item in items:
+                items_per_corpus.setdefault(item.corpus, []).append(item)
+            for corpus in self._corpuses:
+                corpus_items = items_per_corpus.get(corpus.__class__.__name__)
+                if corpus_items:
+                    corpus.get_contents(corpus_items)
+
+    def get_identities(self) -> Tuple[ItemId, ...]:
+        """Get corpus item identities.
+
+        Returns:
+            Full item identities, which is immutable.
+        """
+
+        parts = tuple(corpus.get_identities() for corpus in self._corpuses)
+        return self._merge_memoized("identities", parts, lambda: tuple(chain.from_iterable(parts)))
+
+    def iter_identities(self) -> Iterator[ItemId]:
+        """Iterate corpus item identities lazily, corpus by corpus.
+
+        Returns:
+            Iterator of full item identities, in `get_identities` order.
         """
+
+        return chain.from_iterable(corpus.iter_identities() for corpus in self._corpuses)
+
+    def invalidate_identities(self) -> None:
+        """Clear the memoized identities of this merge and all the corpuses."""
+        self.__dict__.pop(_MERGED_MEMO, None)
         for corpus in self._corpuses:
-            corpus.get_contents()
+            corpus.invalidate_identities()
 
-    def get_identities(self) -> list[ItemId]:
-        """Get corpus item identities.
+    def _merge_memoized(self, key: str, parts: tuple, merge: Callable[[], _T]) -> _T:
+        """Memoize the merge of the corpuses' memoized results.
+
+        Each corpus returns the same result object until it is invalidated, so the merge is re-computed only when any part is changed
+        (e.g. a corpus is invalidated directly, not through this merge).
+        """
+        memo: Dict[str, Tuple[tuple, _T]] = self.__dict__.setdefault(_MERGED_MEMO, {})
+        cached = memo.get(key)
+        if cached is None or any(part is not cached_part for part, cached_part in zip(parts, cached[0])):
+            cached = (parts, merge())
+            memo[key] = cached
+        return cached[1]
+
+    def get_identities_by(self, attribute: str) -> Mapping[str, Tuple[ItemId, ...]]:
+        """Get corpus item identities, grouped by the attribute.
 
+        Args:
+            attribute: ItemId attribute, `corpus` | `subtype` | `speaker` | `name`
         Returns:
-            Full item identity list.
+            Attribute value -> item identities (in `get_identities` order), ordered by the value. Immutable.
         """
 
-        return sum(list(map(lambda corpus: corpus.get_identities(), self._corpuses)), [])
+        # Indices of each corpus are memoized (and invalidated by itself), so only the merge runs here, once per their change.
+        _validate_attribute(attribute)
+        parts = tuple(corpus.get_identities_by(attribute) for corpus in self._corpuses)
+        return self._merge_memoized(f"by:{attribute}", parts, lambda: _merge_groups(parts))
 
     def get_identities_per_speaker(self) -> list[list[ItemId]]:
         """Get corpus item identities, grouped by `.speaker` attribute.
@@ -178,7 +443,8 @@ class MergedCorpus(AbstractCorpus):
             - Utterance identities, grouped by speaker. e.g. [[spk0_uttr0, spk0_uttr1, ...], [spk2_uttr0, spk2_uttr1, ...]]
         """
 
-        return sum(list(map(lambda corpus: corpus.get_identities_per_speaker(), self._corpuses)), [])
+        # Speakers are grouped per corpus, so same-name speakers in different corpuses are not mixed.
+        return list(chain.from_iterable(corpus.get_identities_per_speaker() for corpus in self._corpuses))
 
     def get_item_path(self, item_id: ItemId) -> Path:
         """Get a path of the item.
@@ -189,9 +455,84 @@ class MergedCorpus(AbstractCorpus):
             Path of the specified item.
         """
 
-        the_corpus = next(filter(lambda corpus: corpus.__class__.__name__ == item_id.corpus, self._corpuses), None)
+        return self._route(item_id).get_item_path(item_id)
+
+    def _format_item_paths(self, items: Iterable[ItemId]) -> List[str]:
+        """Format paths of the items as `str`, batched per corpus."""
+
+        items = list(items)
+        positions: Dict[str, List[int]] = {}
+        for position, item in enumerate(items):
+            positions.setdefault(item.corpus, []).append(position)
+        paths: List[str] = [""] * len(items)
+        for corpus_positions in positions.values():
+            corpus = self._route(items[corpus_positions[0]])
+            # pylint: disable=protected-access
+            for position, path in zip(corpus_positions, corpus._format_item_paths([items[position] for position in corpus_positions])):
+                paths[position] = path
+        return paths
+
+    def open_item(self, item_id: ItemId) -> BinaryIO:
+        """Open the item as a binary file object.
+
+        Args:
+            item_id: Identity of target item.
+        Returns:
+            Binary file object of the item, which should be closed by caller.
+        """
+
+        return self._route(item_id).open_item(item_id)
+
+    def _route(self, item_id: ItemId) -> AbstractCorpus:
+        """Get the corpus to which the item belongs."""
+
+        the_corpus = self._routes.get(item_id.corpus)
 
         if the_corpus is None:
             raise RuntimeError(f"Corresponding corpus is not found, {item_id.corpus} not in {list(map(lambda corpus: corpus.__class__.__name__, self._corpuses))}")
-        else:
-            return the_corpus.get_item_path(item_id)
+        if item_id.corpus in self._ambiguous:
+            raise RuntimeError(f"Corresponding corpus is ambiguous, {item_id.corpus} is merged with different variants {self._ambiguous[item_id.corpus]}")
+        return the_corpus
+
+
+def _merge_groups(parts: Iterable[Mapping[str, Tuple[ItemId, ...]]]) -> Mapping[str, Tuple[ItemId, ...]]:
+    """Merge the group-by indices of corpuses, keeping the corpus order in each group."""
+    merged: Dict[str, List[ItemId]] = {}
+    for groups in parts:
+        for value, items in groups.items():
+            merged.setdefault(value, []).extend(items)
+    return MappingProxyType({value: tuple(merged[value]) for value in sorted(merged)})
+
+
+@cached_identities
+def _get_identities_from_iter(self: AbstractCorpus) -> Tuple[ItemId, ...]:
+    """Get corpus item identities, collected from `iter_identities` and memoized.
+
+    Returns:
+        Full item identities, which is immutable and shared over calls.
+    """
+    return tuple(self.iter_identities())
+
+
+def _iter_identities_from_get(self: AbstractCorpus) -> Iterator[ItemId]:
+    """Iterate corpus item identities from `get_identities`.
+
+    Returns:
+        Iterator of full item identities, in `get_identities` order.
+    """
+    return iter(self.get_identities())
+
+
+def _validate_attribute(attribute: str) -> None:
+    """Validate the groupable ItemId attribute."""
+    if attribute not in _ATTRIBUTES:
+        raise RuntimeError(f"ItemId has no attribute `{attribute}`, should be one of {list(_ATTRIBUTES)}")
+
+
+def _variant_of(corpus: AbstractCorpus) -> str:
+    """Variant of the corpus, specified by `{name}=={variant}` or the default one."""
+    conf: Optional[ConfCorpus] = getattr(corpus, "conf", None)
+    default_variant: str = getattr(corpus, "_variant", "")
+    if conf is None:
+        return default_variant
+    return extract_name_and_variant(conf.name, default_variant)[1]
@@ -1,9 +1,14 @@
 """Test interface methods."""
 
+import dataclasses
+import pickle
+from pathlib import Path
+
 import pytest
 
 from .loader import load_preset
-from .interface import ItemId
+from .interface import AbstractCorpus, ConfCorpus, ItemId
+from .helper.adress import ENV_CONTENTS_ROOT
 
 
 def test_get_identities_per_speaker(): # pylint: disable=invalid-name
@@ -49,3 +54,211 @@ def test_merge():
     assert len(item_ids_per_spk) == 6
     for item_ids_spk in item_ids_per_spk:
         assert len(item_ids_spk) == 4
+
+
+def test_identities_memo(tmp_path, monkeypatch):
+    """Test identity memoization and its invalidation."""
+
+    monkeypatch.setenv(ENV_CONTENTS_ROOT, str(tmp_path))
+    corpus = load_preset("AdHoc")
+    dir_speaker = corpus._path_contents / "sub1" / "spk1" # pylint: disable=protected-access
+    dir_speaker.mkdir(parents=True)
+    (dir_speaker / "uttr1.wav").touch()
+
+    ids = corpus.get_identities()
+    assert ids == (ItemId("AdHoc", "sub1", "spk1", "uttr1"),)
+    # Memoized - Same immutable object, even after contents change
+    (dir_speaker / "uttr2.wav").touch()
+    assert corpus.get_identities() is ids
+    # Invalidated - Re-computed
+    corpus.invalidate_identities()
+    assert len(corpus.get_identities()) == 2
+
+
+def test_merged_identities_memo(tmp_path, monkeypatch):
+    """Test identity memoization of merged corpus, which follows the invalidation of its corpuses."""
+
+    monkeypatch.setenv(ENV_CONTENTS_ROOT, str(tmp_path))
+    corpus = load_preset("AdHoc")
+    dir_speaker = corpus._path_contents / "sub1" / "spk1" # pylint: disable=protected-access
+    dir_speaker.mkdir(parents=True)
+    (dir_speaker / "uttr1.wav").touch()
+    other = load_preset("AdHoc==other")
+    (other._path_contents / "sub1" / "spk1").mkdir(parents=True) # pylint: disable=protected-access
+    (other._path_contents / "sub1" / "spk1" / "uttr1.wav").touch() # pylint: disable=protected-access
+    merged = corpus + other
+
+    ids = merged.get_identities()
+    assert len(ids) == 2
+    assert merged.get_identities() is ids
+    (dir_speaker / "uttr2.wav").touch()
+    # Invalidated through the merge, or directly
+    merged.invalidate_identities()
+    assert len(merged.get_identities()) == 3
+    (dir_speaker / "uttr3.wav").touch()
+    corpus.invalidate_identities()
+    assert len(merged.get_identities()) == 4
+
+
+def test_merged_selective_contents(tmp_path, monkeypatch):
+    """Test selective acquisition of merged corpus, which passes only its own items to each corpus."""
+
+    monkeypatch.setenv(ENV_CONTENTS_ROOT, str(tmp_path))
+    adhoc = load_preset("AdHoc")
+    dir_speaker = adhoc._path_contents / "sub1" / "spk1" # pylint: disable=protected-access
+    dir_speaker.mkdir(parents=True)
+    (dir_speaker / "uttr1.wav").touch()
+    jsut = load_preset("JSUT")
+    merged = adhoc + jsut
+
+    # AdHoc accepts the items, JSUT (nothing selected) is not acquired at all
+    merged.get_contents(adhoc.get_identities())
+    assert not jsut._path_contents.exists() # pylint: disable=protected-access
+
+
+def test_item_id():
+    """Test compact ItemId, which keeps value semantics."""
+
+    item = ItemId("TEST", "sub1", "spk" + "1", "uttr1")
+    same = ItemId("TEST", "sub1", "spk1", "uttr1")
+
+    assert item == same and hash(item) == hash(same)
+    assert item != ItemId("TEST", "sub1", "spk1", "uttr2")
+    assert {item: 0}[same] == 0
+    # Shared strings
+    assert item.speaker is same.speaker
+    # Immutable and picklable
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        item.name = "uttr2" # type: ignore
+    assert pickle.loads(pickle.dumps(item)) == item
+    assert not hasattr(item, "__dict__")
+
+
+def test_item_id_legacy_pickle():
+    """Test loading of ItemId pickled before slots (plain dataclass with `__dict__` state)."""
+
+    legacy = {
+        2: b"\x80\x02cspeechcorpusy.interface\nItemId\nq\x00)\x81q\x01}q\x02(X\x06\x00\x00\x00corpusq\x03X\x03\x00\x00\x00JVSq\x04"
+           b"X\x07\x00\x00\x00subtypeq\x05X\x0b\x00\x00\x00parallel100q\x06X\x07\x00\x00\x00speakerq\x07X\x06\x00\x00\x00jvs001q\x08"
+           b"X\x04\x00\x00\x00nameq\tX\x03\x00\x00\x00001q\nub.",
+        4: b"\x80\x04\x95u\x00\x00\x00\x00\x00\x00\x00\x8c\x17speechcorpusy.interface\x94\x8c\x06ItemId\x94\x93\x94)\x81\x94}\x94("
+           b"\x8c\x06corpus\x94\x8c\x03JVS\x94\x8c\x07subtype\x94\x8c\x0bparallel100\x94\x8c\x07speaker\x94\x8c\x06jvs001\x94"
+           b"\x8c\x04name\x94\x8c\x03001\x94ub.",
+    }
+    item = ItemId("JVS", "parallel100", "jvs001", "001")
+    for data in legacy.values():
+        loaded = pickle.loads(data)
+        assert loaded == item and hash(loaded) == hash(item)
+        assert loaded.speaker is item.speaker
+        # Round trip in the current format
+        assert pickle.loads(pickle.dumps(loaded)) == item
+
+
+def test_identities_by(tmp_path, monkeypatch):
+    """Test memoized group-by index."""
+
+    monkeypatch.setenv(ENV_CONTENTS_ROOT, str(tmp_path))
+    corpus = load_preset("AdHoc")
+    for subtype, speaker, name in [("sub1", "spk2", "uttr1"), ("sub1", "spk1", "uttr1"), ("sub2", "spk1", "uttr2")]:
+        (corpus._path_contents / subtype / speaker).mkdir(parents=True, exist_ok=True) # pylint: disable=protected-access
+        (corpus._path_contents / subtype / speaker / f"{name}.wav").touch() # pylint: disable=protected-access
+
+    per_speaker = corpus.get_identities_by("speaker")
+    assert list(per_speaker) == ["spk1", "spk2"]
+    assert per_speaker["spk1"] == tuple(item for item in corpus.get_identities() if item.speaker == "spk1")
+    assert sum(map(len, per_speaker.values())) == 3
+    assert corpus.get_identities_by("speaker") is per_speaker
+    assert corpus.get_identities_per_speaker() == [list(items) for items in per_speaker.values()]
+    with pytest.raises(RuntimeError):
+        corpus.get_identities_by("unknown")
+
+    # Merged - Memoized until invalidation
+    other = load_preset("AdHoc==other")
+    other._path_contents.mkdir(parents=True) # pylint: disable=protected-access
+    merged = corpus + other
+    merged_per_speaker = merged.get_identities_by("speaker")
+    assert merged_per_speaker == per_speaker
+    assert merged.get_identities_by("speaker") is merged_per_speaker
+    merged.invalidate_identities()
+    assert merged.get_identities_by("speaker") is not merged_per_speaker
+
+
+def test_merge_variants(tmp_path, monkeypatch):
+    """Test item routing of merged corpus with the same corpus."""
+
+    monkeypatch.setenv(ENV_CONTENTS_ROOT, str(tmp_path))
+    item = ItemId("AdHoc", "sub1", "spk1", "uttr1")
+
+    # Same variant - Routed to the first instance
+    merged_same = load_preset("AdHoc") + load_preset("AdHoc==default")
+    assert merged_same.get_item_path(item) == load_preset("AdHoc").get_item_path(item)
+
+    # Different variants - Items cannot be routed
+    merged_diff = load_preset("AdHoc==a") + load_preset("AdHoc==b")
+    with pytest.raises(RuntimeError) as err:
+        merged_diff.get_item_path(item)
+    assert str(err.value) == "Corresponding corpus is ambiguous, AdHoc is merged with different variants ['a', 'b']"
+
+
+def test_iter_identities(tmp_path, monkeypatch):
+    """Test lazy identity iteration, consistent with `get_identities`."""
+
+    monkeypatch.setenv(ENV_CONTENTS_ROOT, str(tmp_path))
+    corpus = load_preset("AdHoc")
+    (corpus._path_contents / "sub1" / "spk1").mkdir(parents=True) # pylint: disable=protected-access
+    for name in ["uttr1", "uttr2"]:
+        (corpus._path_contents / "sub1" / "spk1" / f"{name}.wav").touch() # pylint: disable=protected-access
+
+    iterator = corpus.iter_identities()
+    assert next(iterator) in corpus.get_identities()
+    assert tuple(corpus.iter_identities()) == corpus.get_identities()
+
+    merged = corpus + load_preset("AdHoc")
+    assert tuple(merged.iter_identities()) == merged.get_identities()
+    assert len(merged.get_identities()) == 4
+
+
+def test_get_item_paths(tmp_path, monkeypatch):
+    """Test batched item paths, equal to per-item `get_item_path`."""
+
+    monkeypatch.setenv(ENV_CONTENTS_ROOT, str(tmp_path))
+    merged = load_preset("JVS&LJ&VCTK&LiTTSR100", root=str(tmp_path / "mirror"))
+    items = [item for corpus_items in merged.get_identities_by("corpus").values() for item in corpus_items[:50]][::-1]
+
+    expected = [merged.get_item_path(item) for item in items]
+    assert merged.get_item_paths(items) == [str(path) for path in expected]
+    assert merged.get_item_paths(items, as_str=False) == expected
+    assert merged.get_item_paths([]) == []
+
+    np = pytest.importorskip("numpy")
+    assert np.array_equal(merged.get_item_paths(items, as_array=True), np.array([str(path) for path in expected]))
+
+
+def test_identities_contract():
+    """Test that handler should implement either `get_identities` or `iter_identities`."""
+
+    class _Handler(AbstractCorpus):
+        def __init__(self, conf: ConfCorpus) -> None: # pylint: disable=super-init-not-called
+            pass
+        def get_contents(self, items=None) -> None:
+            pass
+        def get_item_path(self, item_id: ItemId) -> Path:
+            return Path(item_id.name)
+
+    # Neither - Abstract
+    with pytest.raises(TypeError):
+        _Handler(ConfCorpus())
+
+    # Only `iter_identities` - `get_identities` is derived and memoized
+    class _IterHandler(_Handler):
+        def iter_identities(self):
+            yield ItemId("Iter", "sub", "spk", "uttr")
+    handler = _IterHandler(ConfCorpus())
+    assert handler.get_identities() == (ItemId("Iter", "sub", "spk", "uttr"),)
+    assert handler.get_identities() is handler.get_identities()
+
+    # Only `get_identities` - `iter_identities` is derived
+    class _GetHandler(_Handler):
+        def get_identities(self):
+            return (ItemId("Get", "sub", "spk", "uttr"),)
+    assert list(_GetHandler(ConfCorpus()).iter_identities()) == [ItemId("Get", "sub", "spk", "uttr")]
@@ -1,13 +1,14 @@
 """Act100TKYM corpus handler"""
 
 
-from typing import List
+from typing import BinaryIO, Optional, Iterable, Tuple, List
 from pathlib import Path
 
-from speechcorpusy.interface import AbstractCorpus, ConfCorpus, ItemId
-from speechcorpusy.helper.adress import get_adress, extract_name_and_variant
-from speechcorpusy.helper.contents import get_contents
+from speechcorpusy.interface import AbstractCorpus, ConfCorpus, ItemId, cached_identities
+from speechcorpusy.helper.adress import get_adress, extract_name_and_variant, to_prefix
+from speechcorpusy.helper.contents import get_contents, get_archive, to_members
 from speechcorpusy.helper.forward import forward
+from speechcorpusy.components.zipindex import ZipIndex
 
 
 # Act100TKYM: 'voiceactress100 (sub) corpus by つくよみちゃん/Tsukuyomi-chan'
@@ -36,6 +37,8 @@ class Act100TKYM(AbstractCorpus):
     _variant: str = "ver1_0_0"
     _archive_name: str = "sozai-tyc-corpus1.zip"
     _adress_origin: str = "https://tyc.rei-yumesaki.net/files/sozai-tyc-corpus1.zip"
+    # Wav directory in the contents
+    _dir_wav: Path = Path("é┬é¡éµé▌é┐éßé±âRü[âpâX Vol.1 É║ùDô¥îvâRü[âpâXüiJVSâRü[âpâXÅÇïÆüj", "01 WAVüiÄ√ÿ^Ä₧é╠ë╣ù╩é╠é▄é▄üj")
 
     def __init__(self, conf: ConfCorpus) -> None:
         """Initialization without corpus contents acquisition.
@@ -50,26 +53,44 @@ class Act100TKYM(AbstractCorpus):
             variant,
             self._archive_name,
         )
+        self._archive: Optional[ZipIndex] = None
 
-    def get_contents(self) -> None:
+    def get_contents(self, items: Optional[Iterable[ItemId]] = None) -> None:
         """Get corpus contents into local.
-        """
 
-        get_contents(
-            self._adress_archive,
-            self._path_contents,
-            self.conf.download,
-            lambda: forward(self._adress_origin, self._adress_archive),
-        )
+        Args:
+            items: Items whose contents are acquired (default: all items).
+        """
 
-    def get_identities(self) -> List[ItemId]:
+        if self.conf.extract:
+            get_contents(
+                self._adress_archive,
+                self._path_contents,
+                self.conf.download,
+                lambda: forward(self._adress_origin, self._adress_archive, digest=self._archive_digest),
+                num_workers=self.conf.num_workers,
+                members=to_members(items, self.get_item_path, self._path_contents),
+                digest=self._archive_digest,
+            )
+        else:
+            self._archive = get_archive(
+                self._adress_archive,
+                self._path_contents,
+                self.conf.download,
+                lambda: forward(self._adress_origin, self._adress_archive, digest=self._archive_digest),
+                pull=self.conf.pull_archive,
+                digest=self._archive_digest,
+            )
+
+    @cached_identities
+    def get_identities(self) -> Tuple[ItemId, ...]:
         """Get corpus item identities.
 
         Returns:
-            Full item identity list.
+            Full item identities.
         """
 
-        return [ItemId(self.__class__.__name__, "default", "act100tkym", str(i).zfill(3)) for i in range(1, 101)]
+        return tuple(ItemId(self.__class__.__name__, "default", "act100tkym", str(i).zfill(3)) for i in range(1, 101))
 
     def get_item_path(self, item_id: ItemId) -> Path:
         """Get path of the item.
@@ -79,7 +100,21 @@ class Act100TKYM(AbstractCorpus):
         Returns:
             Path of the target item.
         """
-        root = self._path_contents
-        d_1 = "é┬é¡éµé▌é┐éßé±âRü[âpâX Vol.1 É║ùDô¥îvâRü[âpâXüiJVSâRü[âpâXÅÇïÆüj"
-        d_2 = "01 WAVüiÄ√ÿ^Ä₧é╠ë╣ù╩é╠é▄é▄üj"
-        return root / d_1 / d_2 / f"VOICEACTRESS100_{item_id.name}.wav"
+        return self._path_contents / self._dir_wav / f"VOICEACTRESS100_{item_id.name}.wav"
+
+    def _format_item_paths(self, items: Iterable[ItemId]) -> List[str]:
+        """Format paths of the items as `str`, on the single wav directory prefix."""
+        prefix = to_prefix(self._path_contents / self._dir_wav)
+        return [f"{prefix}VOICEACTRESS100_{item_id.name}.wav" for item_id in items]
+
+    def open_item(self, item_id: ItemId) -> BinaryIO:
+        """Open the item as a binary file object, directly from the archive if not extracted.
+
+        Args:
+            item_id: Identity of target item.
+        Returns:
+            Binary file object of the item.
+        """
+        if self._archive is None:
+            return super().open_item(item_id)
+        return self._archive.open(to_members([item_id], self.get_item_path, self._path_contents)[0])
@@ -1,11 +1,11 @@
 """LJ corpus handler"""
 
 
-from typing import List
+from typing import Iterator, Dict, Iterable, List, Optional, Tuple
 from pathlib import Path
 
 from speechcorpusy.interface import AbstractCorpus, ConfCorpus, ItemId
-from speechcorpusy.helper.adress import get_adress, extract_name_and_variant
+from speechcorpusy.helper.adress import get_adress, extract_name_and_variant, to_prefix
 
 
 # AdHoc: A local directory which is recognized as a corpus ad hoc.
@@ -59,25 +59,26 @@ class AdHoc(AbstractCorpus):
             self._archive_name,
         )
 
-    def get_contents(self) -> None:
+    def get_contents(self, items: Optional[Iterable[ItemId]] = None) -> None:
         """Get corpus contents into local.
+
+        Args:
+            items: Items whose contents are acquired (ignored, contents are always local).
         """
 
-    def get_identities(self) -> List[ItemId]:
-        """Get corpus item identities.
+    def iter_identities(self) -> Iterator[ItemId]:
+        """Iterate corpus item identities lazily, walking the directories.
 
+        `get_identities` walks the directories only in the first call. Call `invalidate_identities` after the contents change.
         Returns:
-            Full item identity list.
+            Iterator of full item identities.
         """
 
         # List up data information from local directories and files.
-        ids: List[ItemId] = []
         for subtype in filter(lambda p: p.is_dir(), self._path_contents.iterdir()):
             for speaker in filter(lambda p: p.is_dir(), subtype.iterdir()):
                 for uttr in filter(lambda p: p.is_file(), speaker.iterdir()):
-                    ids.append(ItemId(self.__class__.__name__, subtype.name, speaker.name, uttr.stem))
-
-        return ids
+                    yield ItemId(self.__class__.__name__, subtype.name, speaker.name, uttr.stem)
 
     def get_item_path(self, item_id: ItemId) -> Path:
         """Get path of the item.
@@ -88,3 +89,14 @@ class AdHoc(AbstractCorpus):
             Path of the target item.
         """
         return self._path_contents / item_id.subtype / item_id.speaker / f"{item_id.name}.wav"
+
+    def _format_item_paths(self, items: Iterable[ItemId]) -> List[str]:
+        """Format paths of the items as `str`, on the prefixes precomputed per subtype/speaker."""
+        prefixes: Dict[Tuple[str, str], str] = {}
+        paths = []
+        for item_id in items:
+            prefix = prefixes.get((item_id.subtype, item_id.speaker))
+            if prefix is None:
+                prefix = prefixes[(item_id.subtype, item_id.speaker)] = to_prefix(self._path_contents / item_id.subtype / item_id.speaker)
+            paths.append(f"{prefix}{item_id.name}.wav")
+        return paths
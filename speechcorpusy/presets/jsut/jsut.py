@@ -1,13 +1,14 @@
 """LJ corpus handler"""
 
 
-from typing import List
+from typing import BinaryIO, Iterator, Optional, Iterable, Dict, List
 from pathlib import Path
 
 from speechcorpusy.interface import AbstractCorpus, ConfCorpus, ItemId
-from speechcorpusy.helper.adress import get_adress, extract_name_and_variant
-from speechcorpusy.helper.contents import get_contents
+from speechcorpusy.helper.adress import get_adress, extract_name_and_variant, to_prefix
+from speechcorpusy.helper.contents import get_contents, get_archive, to_members
 from speechcorpusy.helper.forward import forward
+from speechcorpusy.components.zipindex import ZipIndex
 
 
 # JSUT: 'Japanese speech corpus of Saruwatari-lab., University of Tokyo'
@@ -44,29 +45,44 @@ class JSUT(AbstractCorpus):
             variant,
             self._archive_name,
         )
+        self._archive: Optional[ZipIndex] = None
 
-    def get_contents(self) -> None:
+    def get_contents(self, items: Optional[Iterable[ItemId]] = None) -> None:
         """Get corpus contents into local.
-        """
 
-        get_contents(
-            self._adress_archive,
-            self._path_contents,
-            self.conf.download,
-            lambda: forward(self._adress_origin, self._adress_archive),
-        )
+        Args:
+            items: Items whose contents are acquired (default: all items).
+        """
 
-    def get_identities(self) -> List[ItemId]:
-        """Get corpus item identities.
+        if self.conf.extract:
+            get_contents(
+                self._adress_archive,
+                self._path_contents,
+                self.conf.download,
+                lambda: forward(self._adress_origin, self._adress_archive, digest=self._archive_digest),
+                num_workers=self.conf.num_workers,
+                members=to_members(items, self.get_item_path, self._path_contents),
+                digest=self._archive_digest,
+            )
+        else:
+            self._archive = get_archive(
+                self._adress_archive,
+                self._path_contents,
+                self.conf.download,
+                lambda: forward(self._adress_origin, self._adress_archive, digest=self._archive_digest),
+                pull=self.conf.pull_archive,
+                digest=self._archive_digest,
+            )
+
+    def iter_identities(self) -> Iterator[ItemId]:
+        """Iterate corpus item identities lazily.
 
         Returns:
-            Full item identity list.
+            Iterator of full item identities.
         """
 
-        return [
-            ItemId(self.__class__.__name__, "basic5000", "jsut_default", f"BASIC5000_{str(i).zfill(4)}")
-            for i in range(1, 5001)
-        ]
+        for i in range(1, 5001):
+            yield ItemId(self.__class__.__name__, "basic5000", "jsut_default", f"BASIC5000_{str(i).zfill(4)}")
 
     def get_item_path(self, item_id: ItemId) -> Path:
         """Get path of the item.
@@ -78,3 +94,27 @@ class JSUT(AbstractCorpus):
         """
         root = self._path_contents / self._archive_base
         return root / item_id.subtype / "wav" / f"{item_id.name}.wav"
+
+    def _format_item_paths(self, items: Iterable[ItemId]) -> List[str]:
+        """Format paths of the items as `str`, on the prefixes precomputed per subtype."""
+        root = self._path_contents / self._archive_base
+        prefixes: Dict[str, str] = {}
+        paths = []
+        for item_id in items:
+            prefix = prefixes.get(item_id.subtype)
+            if prefix is None:
+                prefix = prefixes[item_id.subtype] = to_prefix(root / item_id.subtype / "wav")
+            paths.append(f"{prefix}{item_id.name}.wav")
+        return paths
+
+    def open_item(self, item_id: ItemId) -> BinaryIO:
+        """Open the item as a binary file object, directly from the archive if not extracted.
+
+        Args:
+            item_id: Identity of target item.
+        Returns:
+            Binary file object of the item.
+        """
+        if self._archive is None:
+            return super().open_item(item_id)
+        return self._archive.open(to_members([item_id], self.get_item_path, self._path_contents)[0])
@@ -1,12 +1,13 @@
 """JVS corpus handler"""
 
-from typing import List, Tuple
+from typing import BinaryIO, Set, Tuple, Optional, Iterable, Dict, List
 from pathlib import Path
 
-from speechcorpusy.interface import AbstractCorpus, ItemId, ConfCorpus
-from speechcorpusy.helper.adress import get_adress, extract_name_and_variant
-from speechcorpusy.helper.contents import get_contents
+from speechcorpusy.interface import AbstractCorpus, ItemId, ConfCorpus, cached_identities
+from speechcorpusy.helper.adress import get_adress, extract_name_and_variant, to_prefix
+from speechcorpusy.helper.contents import get_contents, get_archive, to_members
 from speechcorpusy.helper.forward import forward_from_gdrive
+from speechcorpusy.components.zipindex import ZipIndex
 
 
 # JVS: 'Japanese versatile speech corpus'
@@ -54,42 +55,56 @@ class JVS(AbstractCorpus):
             variant,
             self._archive_name,
         )
+        self._archive: Optional[ZipIndex] = None
 
-    def get_contents(self) -> None:
+    def get_contents(self, items: Optional[Iterable[ItemId]] = None) -> None:
         """Get corpus contents into local.
-        """
 
-        get_contents(
-            self._adress_archive,
-            self._path_contents,
-            self.conf.download,
-            lambda: forward_from_gdrive(self._origin_content_id, self._adress_archive, 3.29),
-        )
+        Args:
+            items: Items whose contents are acquired (default: all items).
+        """
 
-    def get_identities(self) -> List[ItemId]:
+        if self.conf.extract:
+            get_contents(
+                self._adress_archive,
+                self._path_contents,
+                self.conf.download,
+                lambda: forward_from_gdrive(self._origin_content_id, self._adress_archive, 3.29, digest=self._archive_digest),
+                num_workers=self.conf.num_workers,
+                members=to_members(items, self.get_item_path, self._path_contents),
+                digest=self._archive_digest,
+            )
+        else:
+            self._archive = get_archive(
+                self._adress_archive,
+                self._path_contents,
+                self.conf.download,
+                lambda: forward_from_gdrive(self._origin_content_id, self._adress_archive, 3.29, digest=self._archive_digest),
+                pull=self.conf.pull_archive,
+                digest=self._archive_digest,
+            )
+
+    @cached_identities
+    def get_identities(self) -> Tuple[ItemId, ...]:
         """Get corpus item identities.
 
         Currently only 'parallel100' is provided.
         Returns:
-            Full item identity list.
+            Full item identities.
         """
 
         # Items which should be excluded. (spk, name)
-        excluded: List[Tuple[int, int]] = [
+        excluded: Set[Tuple[str, str]] = {
             ("jvs030", "45"), ("jvs074", "94"), ("jvs089", "19"), # Missing
             ("jvs009", "95"), # 0sec length
             ("jvs098", "60"), ("jvs098", "99"), # contain cough
-        ]
-        candidates: List[ItemId] = [
+        }
+        return tuple(
             ItemId(self.__class__.__name__, "parallel100", f"jvs{str(spk).zfill(3)}", str(utt))
             for utt in range(1, 101)
             for spk in range(1, 101)
-        ]
-        # Remove `excluded` from `candidates`
-        ids = list(filter(lambda candidate: all([
-            not (candidate.speaker == rm[0] and candidate.name == rm[1]) for rm in excluded
-        ]), candidates))
-        return ids
+            if (f"jvs{str(spk).zfill(3)}", str(utt)) not in excluded
+        )
 
     def get_item_path(self, item_id: ItemId) -> Path:
         """Get path of the item.
@@ -102,3 +117,27 @@ class JVS(AbstractCorpus):
         root = self._path_contents / self._archive_base
         f_name = f"VOICEACTRESS100_{item_id.name.zfill(3)}.wav"
         return root / item_id.speaker / "parallel100" / "wav24kHz16bit" / f_name
+
+    def _format_item_paths(self, items: Iterable[ItemId]) -> List[str]:
+        """Format paths of the items as `str`, on the prefixes precomputed per speaker."""
+        root = self._path_contents / self._archive_base
+        prefixes: Dict[str, str] = {}
+        paths = []
+        for item_id in items:
+            prefix = prefixes.get(item_id.speaker)
+            if prefix is None:
+                prefix = prefixes[item_id.speaker] = to_prefix(root / item_id.speaker / "parallel100" / "wav24kHz16bit")
+            paths.append(f"{prefix}VOICEACTRESS100_{item_id.name.zfill(3)}.wav")
+        return paths
+
+    def open_item(self, item_id: ItemId) -> BinaryIO:
+        """Open the item as a binary file object, directly from the archive if not extracted.
+
+        Args:
+            item_id: Identity of target item.
+        Returns:
+            Binary file object of the item.
+        """
+        if self._archive is None:
+            return super().open_item(item_id)
+        return self._archive.open(to_members([item_id], self.get_item_path, self._path_contents)[0])
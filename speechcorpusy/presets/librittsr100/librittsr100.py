@@ -1,10 +1,12 @@
 """JVS corpus handler"""
 
+from typing import Iterator, Optional, Iterable, List
 from pathlib import Path
+import os
 
 from speechcorpusy.interface import AbstractCorpus, ItemId, ConfCorpus
-from speechcorpusy.helper.adress import get_adress, extract_name_and_variant
-from speechcorpusy.helper.contents import get_contents
+from speechcorpusy.helper.adress import get_adress, extract_name_and_variant, to_prefix
+from speechcorpusy.helper.contents import get_contents, to_members
 from speechcorpusy.helper.forward import forward
 from speechcorpusy.presets.librittsr100.items import items
 
@@ -46,23 +48,29 @@ class LiTTSR100(AbstractCorpus):
         _, variant = extract_name_and_variant(conf.name, self._variant)
         self._adress_archive, self._path_contents = get_adress(conf.root, self.__class__.__name__, variant, self._archive_name)
 
-    def get_contents(self) -> None:
+    def get_contents(self, items: Optional[Iterable[ItemId]] = None) -> None: # pylint: disable=redefined-outer-name
         """Get corpus contents into local.
+
+        Args:
+            items: Items whose contents are acquired (default: all items).
         """
 
         get_contents(
             self._adress_archive, self._path_contents, self.conf.download,
-            lambda: forward(self._adress_origin, self._adress_archive),
+            lambda: forward(self._adress_origin, self._adress_archive, digest=self._archive_digest),
+            num_workers=self.conf.num_workers,
+            members=to_members(items, self.get_item_path, self._path_contents),
+            digest=self._archive_digest,
         )
 
-    def get_identities(self) -> list[ItemId]:
-        """Get corpus item identities.
+    def iter_identities(self) -> Iterator[ItemId]:
+        """Iterate corpus item identities lazily.
 
         Returns:
-            Full item identity list.
+            Iterator of full item identities.
         """
-        #                                                                                      spk                     cptr      name1     name2
-        return list(map(lambda item: ItemId(self.__class__.__name__, "clean100", f"LiTTSR{str(item[0]).zfill(4)}", f"{item[1]}_{item[2]}_{item[3]}"), items))
+        for spk, chapter, name1, name2 in items:
+            yield ItemId(self.__class__.__name__, "clean100", f"LiTTSR{str(spk).zfill(4)}", f"{chapter}_{name1}_{name2}")
 
     def get_item_path(self, item_id: ItemId) -> Path:
         """Get path of the item.
@@ -78,3 +86,14 @@ class LiTTSR100(AbstractCorpus):
         f_name = f"{spk}_{cptr}_{name1.zfill(6)}_{name2.zfill(6)}.wav"
 
         return self._path_contents / "LibriTTS_R" / "train-clean-100" / str(spk) / str(cptr) / f_name
+
+    def _format_item_paths(self, items: Iterable[ItemId]) -> List[str]:
+        """Format paths of the items as `str`, on the prefix precomputed per call."""
+        prefix = to_prefix(self._path_contents / "LibriTTS_R" / "train-clean-100")
+        sep = os.sep
+        paths = []
+        for item_id in items:
+            spk = int(item_id.speaker[-4:])
+            cptr, name1, name2 = item_id.name.split("_")
+            paths.append(f"{prefix}{spk}{sep}{cptr}{sep}{spk}_{cptr}_{name1.zfill(6)}_{name2.zfill(6)}.wav")
+        return paths
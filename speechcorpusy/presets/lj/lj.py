@@ -1,12 +1,12 @@
 """LJ corpus handler"""
 
 
-from typing import List
+from typing import Dict, Iterator, List, Optional, Iterable, Set
 from pathlib import Path
 
 from speechcorpusy.interface import AbstractCorpus, ConfCorpus, ItemId
-from speechcorpusy.helper.adress import get_adress, extract_name_and_variant
-from speechcorpusy.helper.contents import get_contents
+from speechcorpusy.helper.adress import get_adress, extract_name_and_variant, to_prefix
+from speechcorpusy.helper.contents import get_contents, to_members
 from speechcorpusy.helper.forward import forward
 
 
@@ -53,22 +53,28 @@ class LJ(AbstractCorpus):
             self._archive_name,
         )
 
-    def get_contents(self) -> None:
+    def get_contents(self, items: Optional[Iterable[ItemId]] = None) -> None:
         """Get corpus contents into local.
+
+        Args:
+            items: Items whose contents are acquired (default: all items).
         """
 
         get_contents(
             self._adress_archive,
             self._path_contents,
             self.conf.download,
-            lambda: forward(self._adress_origin, self._adress_archive),
+            lambda: forward(self._adress_origin, self._adress_archive, digest=self._archive_digest),
+            num_workers=self.conf.num_workers,
+            members=to_members(items, self.get_item_path, self._path_contents),
+            digest=self._archive_digest,
         )
 
-    def get_identities(self) -> List[ItemId]:
-        """Get corpus item identities.
+    def iter_identities(self) -> Iterator[ItemId]:
+        """Iterate corpus item identities lazily.
 
         Returns:
-            Full item identity list.
+            Iterator of full item identities.
         """
 
         # Maximum serial number of each groups
@@ -76,24 +82,19 @@ class LJ(AbstractCorpus):
              296, 268, 340, 314, 446, 284, 398, 399, 108, 210, 203, 141, 143, 176,
              166, 180, 519, 213, 255, 233, 275, 214, 219, 210, 218, 269, 306, 248,
              240, 203, 251, 188, 239, 250, 254, 250, 289, 230, 278]
-        group_info = {i+1: list(range(1, num+1)) for i, num in enumerate(maxes)}
 
         # patch: Missing utterances
-        # [index, missings]
-        missings = [(2, [115]), (3, [272]), (4, [53]), (5, [81]), (6, [37]), (8, [179]),
-        (14, [145, 270, 284, 319]), (16, [83, 269, 270, 345, 372, 437]), (17, [275, 279]),
-        (21, [13]), (27, [140]), (28, [135]), (34, [139]), (38, [195, 196]),
-        (42, [34, 243]), (44, [46, 216]), (48, [108]), (49, [131])]
-        for msg in missings:
-            group_info[msg[0]] = list(filter(lambda i: i not in msg[1], group_info[msg[0]])) # pylint: disable = cell-var-from-loop
-
-
-        ids: List[ItemId] = []
-        for group in range(1,51):
-            for num in group_info[group]:
-                name = f"LJ{str(group).zfill(3)}-{str(num).zfill(4)}"
-                ids.append(ItemId(self.__class__.__name__, "default", "lj_default", name))
-        return ids
+        # {index: missings}
+        missings: Dict[int, Set[int]] = {2: {115}, 3: {272}, 4: {53}, 5: {81}, 6: {37}, 8: {179},
+        14: {145, 270, 284, 319}, 16: {83, 269, 270, 345, 372, 437}, 17: {275, 279},
+        21: {13}, 27: {140}, 28: {135}, 34: {139}, 38: {195, 196},
+        42: {34, 243}, 44: {46, 216}, 48: {108}, 49: {131}}
+
+        for group, num_max in enumerate(maxes, start=1):
+            missings_group = missings.get(group, set())
+            for num in range(1, num_max+1):
+                if num not in missings_group:
+                    yield ItemId(self.__class__.__name__, "default", "lj_default", f"LJ{str(group).zfill(3)}-{str(num).zfill(4)}")
 
     def get_item_path(self, item_id: ItemId) -> Path:
         """Get path of the item.
@@ -105,3 +106,8 @@ class LJ(AbstractCorpus):
         """
         root = self._path_contents / self._archive_base
         return root / "wavs" / f"{item_id.name}.wav"
+
+    def _format_item_paths(self, items: Iterable[ItemId]) -> List[str]:
+        """Format paths of the items as `str`, on the single wav directory prefix."""
+        prefix = to_prefix(self._path_contents / self._archive_base / "wavs")
+        return [f"{prefix}{item_id.name}.wav" for item_id in items]
@@ -1,13 +1,14 @@
 """RHN46ZND corpus handler"""
 
 
-from typing import List
+from typing import BinaryIO, Iterator, Optional, Iterable, List
 from pathlib import Path
 
 from speechcorpusy.interface import AbstractCorpus, ConfCorpus, ItemId
-from speechcorpusy.helper.adress import get_adress, extract_name_and_variant
-from speechcorpusy.helper.contents import get_contents
+from speechcorpusy.helper.adress import get_adress, extract_name_and_variant, to_prefix
+from speechcorpusy.helper.contents import get_contents, get_archive, to_members
 from speechcorpusy.helper.forward import forward
+from speechcorpusy.components.zipindex import ZipIndex
 
 
 # RHN46ZND: 'ROHAN4600 corpus by ずんだもん (CV：伊藤ゆいな)'
@@ -49,26 +50,44 @@ class RHN46ZND(AbstractCorpus):
             variant,
             self._archive_name,
         )
+        self._archive: Optional[ZipIndex] = None
 
-    def get_contents(self) -> None:
+    def get_contents(self, items: Optional[Iterable[ItemId]] = None) -> None:
         """Get corpus contents into local.
-        """
 
-        get_contents(
-            self._adress_archive,
-            self._path_contents,
-            self.conf.download,
-            lambda: forward(self._adress_origin, self._adress_archive),
-        )
+        Args:
+            items: Items whose contents are acquired (default: all items).
+        """
 
-    def get_identities(self) -> List[ItemId]:
-        """Get corpus item identities.
+        if self.conf.extract:
+            get_contents(
+                self._adress_archive,
+                self._path_contents,
+                self.conf.download,
+                lambda: forward(self._adress_origin, self._adress_archive, digest=self._archive_digest),
+                num_workers=self.conf.num_workers,
+                members=to_members(items, self.get_item_path, self._path_contents),
+                digest=self._archive_digest,
+            )
+        else:
+            self._archive = get_archive(
+                self._adress_archive,
+                self._path_contents,
+                self.conf.download,
+                lambda: forward(self._adress_origin, self._adress_archive, digest=self._archive_digest),
+                pull=self.conf.pull_archive,
+                digest=self._archive_digest,
+            )
+
+    def iter_identities(self) -> Iterator[ItemId]:
+        """Iterate corpus item identities lazily.
 
         Returns:
-            Full item identity list.
+            Iterator of full item identities.
         """
 
-        return [ItemId(self.__class__.__name__, "default", "zundamon", str(i).zfill(4)) for i in range(1, 4601)]
+        for i in range(1, 4601):
+            yield ItemId(self.__class__.__name__, "default", "zundamon", str(i).zfill(4))
 
     def get_item_path(self, item_id: ItemId) -> Path:
         """Get path of the item.
@@ -80,3 +99,20 @@ class RHN46ZND(AbstractCorpus):
         """
         root = self._path_contents
         return root / "ROHAN4600_zundamon_voice" / f"ROHAN4600_{item_id.name}.wav"
+
+    def _format_item_paths(self, items: Iterable[ItemId]) -> List[str]:
+        """Format paths of the items as `str`, on the single wav directory prefix."""
+        prefix = to_prefix(self._path_contents / "ROHAN4600_zundamon_voice")
+        return [f"{prefix}ROHAN4600_{item_id.name}.wav" for item_id in items]
+
+    def open_item(self, item_id: ItemId) -> BinaryIO:
+        """Open the item as a binary file object, directly from the archive if not extracted.
+
+        Args:
+            item_id: Identity of target item.
+        Returns:
+            Binary file object of the item.
+        """
+        if self._archive is None:
+            return super().open_item(item_id)
+        return self._archive.open(to_members([item_id], self.get_item_path, self._path_contents)[0])
@@ -2,10 +2,10 @@
 
 
 from __future__ import annotations
-from typing import List
+from typing import Iterable, Optional, Tuple
 from pathlib import Path
 
-from speechcorpusy.interface import AbstractCorpus, ConfCorpus, ItemId
+from speechcorpusy.interface import AbstractCorpus, ConfCorpus, ItemId, cached_identities
 
 
 # TEST: 'test corpus'
@@ -40,23 +40,27 @@ class TEST(AbstractCorpus):
         # Hack for test
         self._ver = ""
 
-    def get_contents(self) -> None:
+    def get_contents(self, items: Optional[Iterable[ItemId]] = None) -> None:
         """Get corpus contents into local.
+
+        Args:
+            items: Items whose contents are acquired (ignored, contents are always local).
         """
 
-    def get_identities(self) -> List[ItemId]:
+    @cached_identities
+    def get_identities(self) -> Tuple[ItemId, ...]:
         """Get corpus item identities.
 
         Returns:
-            Full item identity list.
+            Full item identities.
         """
 
-        return [
+        return tuple(
             ItemId(self.__class__.__name__, subcorpus, speaker, name)
             for subcorpus in [f"sub1{self._ver}", f"sub2{self._ver}"]
             for speaker in [f"spk1{self._ver}", f"spk2{self._ver}"]
             for name in [f"uttr1{self._ver}", f"uttr2{self._ver}"]
-        ]
+        )
 
     def get_item_path(self, _: ItemId) -> Path:
         """Get path of the item.
@@ -71,6 +75,7 @@ class TEST(AbstractCorpus):
     def switch_version(self, ver: str) -> TEST:
         """Switch corpus item version for test/debug."""
         self._ver = ver
+        self.invalidate_identities()
         return self
 
 
@@ -104,23 +109,27 @@ class TESTbeta(AbstractCorpus):
         # Hack for test
         self._ver = ""
 
-    def get_contents(self) -> None:
+    def get_contents(self, items: Optional[Iterable[ItemId]] = None) -> None:
         """Get corpus contents into local.
+
+        Args:
+            items: Items whose contents are acquired (ignored, contents are always local).
         """
 
-    def get_identities(self) -> List[ItemId]:
+    @cached_identities
+    def get_identities(self) -> Tuple[ItemId, ...]:
         """Get corpus item identities.
 
         Returns:
-            Full item identity list.
+            Full item identities.
         """
 
-        return [
+        return tuple(
             ItemId(self.__class__.__name__, subcorpus, speaker, name)
             for subcorpus in [f"subb1{self._ver}", f"subb2{self._ver}"]
             for speaker in [f"spkb1{self._ver}", f"spkb2{self._ver}"]
             for name in [f"uttrb1{self._ver}", f"uttrb2{self._ver}"]
-        ]
+        )
 
     def get_item_path(self, _: ItemId) -> Path:
         """Get path of the item.
@@ -135,4 +144,5 @@ class TESTbeta(AbstractCorpus):
     def switch_version(self, ver: str) -> TEST:
         """Switch corpus item version for test/debug."""
         self._ver = ver
+        self.invalidate_identities()
         return self
@@ -1,14 +1,14 @@
 """VCC2020 corpus handler"""
 
 
-from typing import List
+from typing import Optional, Iterable, Tuple, Dict, List
 from pathlib import Path
-import zipfile
 
-from speechcorpusy.interface import AbstractCorpus, ConfCorpus, ItemId
-from speechcorpusy.helper.adress import get_adress, extract_name_and_variant
-from speechcorpusy.helper.contents import get_contents
+from speechcorpusy.interface import AbstractCorpus, ConfCorpus, ItemId, cached_identities
+from speechcorpusy.helper.adress import get_adress, extract_name_and_variant, to_prefix
+from speechcorpusy.helper.contents import get_contents, lock_contents, track_contents
 from speechcorpusy.helper.forward import forward
+from speechcorpusy.components.archive import extract_archive_staged, is_acquired
 
 from .ids import item_ids
 
@@ -115,30 +115,59 @@ class VCC20(AbstractCorpus):
             self._archive_name,
         )
 
-    def get_contents(self) -> None:
+    def get_contents(self, items: Optional[Iterable[ItemId]] = None) -> None:
         """Get corpus contents into local.
+
+        Args:
+            items: Items whose contents are acquired (default: all items).
         """
 
+        root = self._path_contents / self._archive_base
+        # Subcorpus zip name -> its members to be acquired (None: all members)
+        inner_members: Dict[str, Optional[List[str]]] = dict.fromkeys(SUBCORPUSES_ZIP)
+        if items is not None:
+            selected: Dict[str, List[str]] = {}
+            for item_id in items:
+                zip_name = SUBCORPUSES_ZIP[SUBCORPUSES.index(item_id.subtype)]
+                selected.setdefault(zip_name, []).append(self.get_item_path(item_id).relative_to(root).as_posix())
+            inner_members = dict(selected)
+
+        # Outer archive contains the subcorpus archives, which contain items.
         get_contents(
             self._adress_archive,
             self._path_contents,
             self.conf.download,
-            lambda: forward(self._adress_origin, self._adress_archive),
+            lambda: forward(self._adress_origin, self._adress_archive, digest=self._archive_digest),
+            num_workers=self.conf.num_workers,
+            members=None if items is None else [f"{self._archive_base}/{zip_name}" for zip_name in inner_members],
+            digest=self._archive_digest,
         )
-        root = self._path_contents / self._archive_base
-        # Only when there are only zip files, extract them.
-        if all(map(lambda child: child.is_file(), root.iterdir())):
-            for zip_name in SUBCORPUSES_ZIP:
-                with zipfile.ZipFile(root / zip_name) as zip_f:
-                    zip_f.extractall(root)
-
-    def get_identities(self) -> List[ItemId]:
+        # Extraction of zip in tar
+        with lock_contents(self._path_contents):
+            extracted = False
+            for zip_name, members in inner_members.items():
+                tag = f".{zip_name}"
+                inner_acquired = is_acquired(root, members, tag)
+                if members is None:
+                    subcorpus = SUBCORPUSES[SUBCORPUSES_ZIP.index(zip_name)]
+                    inner_acquired = inner_acquired and (root / SUBCORPUSES_DIR[subcorpus]).exists()
+                if not inner_acquired:
+                    print(f"Extracting #2 ({zip_name})...")
+                    extract_archive_staged(str(root / zip_name), root, self.conf.num_workers, members, tag)
+                    print("Finally extracted.")
+                    extracted = True
+            # Registry measured the contents before the nested extraction, so re-measure it.
+            if extracted:
+                track_contents(self._path_contents, True)
+
+    @cached_identities
+    def get_identities(self) -> Tuple[ItemId, ...]:
         """Get corpus item identities.
 
         Returns:
-            Full item identity list.
+            Full item identities.
         """
-        return item_ids
+        return tuple(item_ids)
 
     def get_item_path(self, item_id: ItemId) -> Path:
         """Get path of the item.
@@ -151,3 +180,15 @@ class VCC20(AbstractCorpus):
 
         root = self._path_contents / self._archive_base
         return root / SUBCORPUSES_DIR[item_id.subtype] / item_id.speaker[6:] / f"{item_id.name}.wav"
+
+    def _format_item_paths(self, items: Iterable[ItemId]) -> List[str]:
+        """Format paths of the items as `str`, on the prefixes precomputed per subtype/speaker."""
+        root = self._path_contents / self._archive_base
+        prefixes: Dict[Tuple[str, str], str] = {}
+        paths = []
+        for item_id in items:
+            prefix = prefixes.get((item_id.subtype, item_id.speaker))
+            if prefix is None:
+                prefix = prefixes[(item_id.subtype, item_id.speaker)] = to_prefix(root / SUBCORPUSES_DIR[item_id.subtype] / item_id.speaker[6:])
+            paths.append(f"{prefix}{item_id.name}.wav")
+        return paths
@@ -1,13 +1,15 @@
 """VCTK corpus handler"""
 
 
+from typing import Iterator, Optional, Iterable, Dict, List
 from pathlib import Path
 
 from speechcorpusy.interface import AbstractCorpus, ConfCorpus, ItemId
-from speechcorpusy.helper.adress import get_adress, extract_name_and_variant
-from speechcorpusy.helper.contents import get_contents
+from speechcorpusy.helper.adress import get_adress, extract_name_and_variant, to_prefix
+from speechcorpusy.helper.contents import get_contents, lock_contents, to_members, track_contents
 from speechcorpusy.helper.forward import forward
-from speechcorpusy.components.taudio import extract_archive
+from speechcorpusy.helper.shards import load_manifest
+from speechcorpusy.components.archive import extract_archive_staged, is_acquired
 from .missings import MISSINGS_MIC2
 
 
@@ -104,37 +106,76 @@ class VCTK(AbstractCorpus):
             self._archive_name,
         )
 
-    def get_contents(self) -> None:
+    def get_contents(self, items: Optional[Iterable[ItemId]] = None) -> None:
         """Get corpus contents into local.
+
+        Args:
+            items: Items whose contents are acquired (default: all items).
         """
 
+        inner_members = to_members(items, self.get_item_path, self._path_contents)
+        # Acquired contents are reused without any archive access (e.g. offline).
+        with lock_contents(self._path_contents):
+            acquired = self._is_acquired(inner_members)
+        if acquired:
+            track_contents(self._path_contents, False)
+            return
+
+        # Sharded mirror is repacked from the inner archive, so it directly contains items.
+        if load_manifest(self._adress_archive) is not None:
+            get_contents(
+                self._adress_archive,
+                self._path_contents,
+                self.conf.download,
+                lambda: forward(self._adress_origin, self._adress_archive, digest=self._archive_digest),
+                num_workers=self.conf.num_workers,
+                members=inner_members,
+            )
+            return
+
+        # Outer archive contains the inner archive, which contains items.
         get_contents(
             self._adress_archive,
             self._path_contents,
             self.conf.download,
-            lambda: forward(self._adress_origin, self._adress_archive),
+            lambda: forward(self._adress_origin, self._adress_archive, digest=self._archive_digest),
+            num_workers=self.conf.num_workers,
+            members=None if inner_members is None else [self._inner_archive_name],
+            digest=self._archive_digest,
         )
         # Extraction of zip in zip
-        if not (self._path_contents / "wav48_silence_trimmed").exists():
-            print("Extracting #2 ...")
-            extract_archive(str(self._path_contents / self._inner_archive_name), self._path_contents)
-            print("Finally extracted.")
-
-    def get_identities(self) -> list[ItemId]:
-        """Get corpus item identities.
+        with lock_contents(self._path_contents):
+            tag = f".{self._inner_archive_name}"
+            inner_acquired = is_acquired(self._path_contents, inner_members, tag)
+            if inner_members is None:
+                inner_acquired = inner_acquired and (self._path_contents / "wav48_silence_trimmed").exists()
+            if not inner_acquired:
+                print("Extracting #2 ...")
+                extract_archive_staged(str(self._path_contents / self._inner_archive_name), self._path_contents, self.conf.num_workers, inner_members, tag)
+                print("Finally extracted.")
+                # Registry measured the contents before the nested extraction, so re-measure it.
+                track_contents(self._path_contents, True)
+
+    def _is_acquired(self, inner_members: Optional[List[str]]) -> bool:
+        """Whether the items (all, or specified members) are already acquired, from either the archive or the sharded mirror."""
+        if inner_members is not None:
+            return is_acquired(self._path_contents, inner_members)
+        tag = f".{self._inner_archive_name}"
+        return is_acquired(self._path_contents) and is_acquired(self._path_contents, None, tag) and (self._path_contents / "wav48_silence_trimmed").exists()
+
+    def iter_identities(self) -> Iterator[ItemId]:
+        """Iterate corpus item identities lazily.
 
         Returns:
-            Full item identity list.
+            Iterator of full item identities.
         """
 
-        ids: list[ItemId] = []
-
         for spk, num_max, spk_missings in zip(SPKS_MIC2, MAX_UTTR_MIC2, MISSINGS_MIC2):
+            missings = set(spk_missings)
+            speaker = f"vctk_{spk}"
             for serial in range(1, num_max+1):
-                if serial not in spk_missings:
-                    ids.append(ItemId(self.__class__.__name__, "mic2", f"vctk_{spk}", str(serial).zfill(3)))
-
-        return ids
+                if serial not in missings:
+                    yield ItemId(self.__class__.__name__, "mic2", speaker, str(serial).zfill(3))
 
     def get_item_path(self, item_id: ItemId) -> Path:
         """Get path of the item.
@@ -145,3 +186,15 @@ class VCTK(AbstractCorpus):
             Path of the target item.
         """
         return self._path_contents / "wav48_silence_trimmed" / item_id.speaker[5:] / f"{item_id.speaker[5:]}_{item_id.name}_mic2.flac"
+
+    def _format_item_paths(self, items: Iterable[ItemId]) -> List[str]:
+        """Format paths of the items as `str`, on the prefixes precomputed per speaker."""
+        root = self._path_contents / "wav48_silence_trimmed"
+        prefixes: Dict[str, str] = {}
+        paths = []
+        for item_id in items:
+            prefix = prefixes.get(item_id.speaker)
+            if prefix is None:
+                prefix = prefixes[item_id.speaker] = f"{to_prefix(root / item_id.speaker[5:])}{item_id.speaker[5:]}_"
+            paths.append(f"{prefix}{item_id.name}_mic2.flac")
+        return paths
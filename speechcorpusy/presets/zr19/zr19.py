@@ -1,12 +1,12 @@
 """ZR19 corpus handler"""
 
 
-from typing import List
+from typing import List, Optional, Iterable, Tuple, Dict
 from pathlib import Path
 
-from speechcorpusy.interface import AbstractCorpus, ItemId, ConfCorpus
-from speechcorpusy.helper.adress import get_adress, extract_name_and_variant
-from speechcorpusy.helper.contents import get_contents
+from speechcorpusy.interface import AbstractCorpus, ItemId, ConfCorpus, cached_identities
+from speechcorpusy.helper.adress import get_adress, extract_name_and_variant, to_prefix
+from speechcorpusy.helper.contents import get_contents, to_members
 from speechcorpusy.helper.forward import forward
 
 from .zr19_items_unit import utterances_unit
@@ -89,32 +89,39 @@ class ZR19(AbstractCorpus):
             self._archive_name,
         )
 
-    def get_contents(self) -> None:
+    def get_contents(self, items: Optional[Iterable[ItemId]] = None) -> None:
         """Get corpus contents into local.
+
+        Args:
+            items: Items whose contents are acquired (default: all items).
         """
 
         get_contents(
             self._adress_archive,
             self._path_contents,
             self.conf.download,
-            lambda: forward(self._adress_origin, self._adress_archive),
+            lambda: forward(self._adress_origin, self._adress_archive, digest=self._archive_digest),
+            num_workers=self.conf.num_workers,
+            members=to_members(items, self.get_item_path, self._path_contents),
+            digest=self._archive_digest,
         )
 
-    def get_identities(self) -> List[ItemId]:
+    @cached_identities
+    def get_identities(self) -> Tuple[ItemId, ...]:
         """Get corpus item identities.
 
         Currently, train/unit & train/voice are provided.
         Returns:
-            Full item identity list.
+            Full item identities.
         """
 
         # No pattern in file name, so need hard-coded file name list
         ids: List[ItemId] = []
         for item in utterances_unit:
-            ids.append(ItemId("train-unit", f"zr19_{item[0:4]}", item))
+            ids.append(ItemId(self.__class__.__name__, "train-unit", f"zr19_{item[0:4]}", item))
         for item in utterances_voice:
-            ids.append(ItemId("train-voice", f"zr19_{item[0:4]}", item))
-        return ids
+            ids.append(ItemId(self.__class__.__name__, "train-voice", f"zr19_{item[0:4]}", item))
+        return tuple(ids)
 
     def get_item_path(self, item_id: ItemId) -> Path:
         """Get path of the item.
@@ -127,3 +134,15 @@ class ZR19(AbstractCorpus):
         root = self._path_contents / self._archive_base
         sub_dirs = Path(item_id.subtype.replace('-', '/'))
         return root / sub_dirs / f"{item_id.name}.wav"
+
+    def _format_item_paths(self, items: Iterable[ItemId]) -> List[str]:
+        """Format paths of the items as `str`, on the prefixes precomputed per subtype."""
+        root = self._path_contents / self._archive_base
+        prefixes: Dict[str, str] = {}
+        paths = []
+        for item_id in items:
+            prefix = prefixes.get(item_id.subtype)
+            if prefix is None:
+                prefix = prefixes[item_id.subtype] = to_prefix(root / Path(item_id.subtype.replace('-', '/')))
+            paths.append(f"{prefix}{item_id.name}.wav")
+        return paths
@@ -1,8 +1,17 @@
 """Test Preset testing"""
 
+import io
+import json
+import tarfile
+import zipfile
+from pathlib import Path
+
 import librosa
 
 from .loader import load_preset
+from .interface import ConfCorpus
+from .helper.adress import ENV_CONTENTS_ROOT
+from .presets.vcc2020.vcc20 import SUBCORPUSES, SUBCORPUSES_ZIP
 
 
 def test_TEST_preset(): # pylint: disable=invalid-name
@@ -17,3 +26,86 @@ def test_TEST_preset(): # pylint: disable=invalid-name
     # Data access
     wave = librosa.load(test_corpus.get_item_path(ids[0]), sr=None)
     assert len(wave) > 0
+
+
+def _write_vcc20_archive(corpus, items) -> None:
+    """Write the VCC20-layout archive (tar.gz of subcorpus zips) which contains the items."""
+    # pylint: disable=protected-access
+    root = corpus._path_contents / corpus._archive_base
+    inner = {zip_name: io.BytesIO() for zip_name in SUBCORPUSES_ZIP}
+    zfiles = {zip_name: zipfile.ZipFile(buffer, "w") for zip_name, buffer in inner.items()}
+    for item in items:
+        zip_name = SUBCORPUSES_ZIP[SUBCORPUSES.index(item.subtype)]
+        zfiles[zip_name].writestr(corpus.get_item_path(item).relative_to(root).as_posix(), item.name.encode("utf-8"))
+    for zfile in zfiles.values():
+        zfile.close()
+    path_archive = Path(corpus._adress_archive)
+    path_archive.parent.mkdir(parents=True)
+    with tarfile.open(path_archive, "w:gz") as tar:
+        for zip_name, buffer in inner.items():
+            info = tarfile.TarInfo(f"{corpus._archive_base}/{zip_name}")
+            info.size = len(buffer.getvalue())
+            tar.addfile(info, io.BytesIO(buffer.getvalue()))
+
+
+def test_VCC20_nested_archive(tmp_path, monkeypatch): # pylint: disable=invalid-name
+    """Test selective then full acquisition of 'VCC20' preset, whose items are in the nested zips."""
+
+    monkeypatch.setenv(ENV_CONTENTS_ROOT, str(tmp_path / "contents"))
+    corpus = load_preset("VCC20", root=str(tmp_path / "mirror"))
+    # One item per subcorpus
+    items = [next(item for item in corpus.get_identities() if item.subtype == subtype) for subtype in SUBCORPUSES]
+    _write_vcc20_archive(corpus, items)
+
+    # Selective - only the requested items
+    corpus.get_contents(items[:1])
+    assert corpus.get_item_path(items[0]).read_bytes() == items[0].name.encode("utf-8")
+    assert not any(corpus.get_item_path(item).exists() for item in items[1:])
+
+    # Full
+    corpus.get_contents()
+    for item in items:
+        assert corpus.get_item_path(item).read_bytes() == item.name.encode("utf-8")
+    # Contents registry is re-measured after the nested extraction
+    path_contents = corpus._path_contents # pylint: disable=protected-access
+    registry = json.loads((tmp_path / "contents" / "cache.json").read_text(encoding="utf-8"))
+    size = sum(path.stat().st_size for path in path_contents.rglob("*") if path.is_file())
+    assert registry[path_contents.parent.relative_to(tmp_path / "contents").as_posix()]["size"] == size
+
+
+def test_JSUT_open_item_without_extraction(tmp_path, monkeypatch): # pylint: disable=invalid-name
+    """Test direct item access of 'JSUT' preset from the stored zip archive, without extraction."""
+
+    monkeypatch.setenv(ENV_CONTENTS_ROOT, str(tmp_path / "contents"))
+    corpus = load_preset(conf=ConfCorpus("JSUT", str(tmp_path / "mirror"), extract=False))
+    items = corpus.get_identities()[:3]
+    # pylint: disable=protected-access
+    path_archive = Path(corpus._adress_archive)
+    path_archive.parent.mkdir(parents=True)
+    with zipfile.ZipFile(path_archive, "w", zipfile.ZIP_STORED) as zfile:
+        for item in items:
+            zfile.writestr(corpus.get_item_path(item).relative_to(corpus._path_contents).as_posix(), item.name.encode("utf-8") * 100)
+
+    corpus.get_contents()
+    for item in items:
+        with corpus.open_item(item) as file:
+            assert file.read() == item.name.encode("utf-8") * 100
+    assert not corpus._path_contents.exists()
+
+
+def test_VCTK_acquired_offline(tmp_path, monkeypatch): # pylint: disable=invalid-name
+    """Test that acquired 'VCTK' contents are reused without any archive access."""
+
+    monkeypatch.setenv(ENV_CONTENTS_ROOT, str(tmp_path / "contents"))
+    corpus = load_preset("VCTK", root="memory://offline")
+    items = corpus.get_identities()[:3]
+    for item in items:
+        corpus.get_item_path(item).parent.mkdir(parents=True, exist_ok=True)
+        corpus.get_item_path(item).write_bytes(b"flac")
+
+    def no_access(_):
+        raise ConnectionError("Archive is accessed.")
+    monkeypatch.setattr("speechcorpusy.presets.vctk.vctk.load_manifest", no_access)
+    corpus.get_contents(items)
+    # Unmarked contents directory is full contents
+    corpus.get_contents()